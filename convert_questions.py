@@ -1,5 +1,9 @@
 import json
-import re
+import sys
+
+# Unchanged "Aufgabe" blocks are reused from .cache/; pass --no-cache to reparse everything.
+from question_bank.parse_cache import parse_questions
+from question_bank.jsonstream import write_bank
 
 # The 100 questions provided by the user
 questions_data = """
@@ -803,92 +807,10 @@ Was gehört nicht zur gesetzlichen Sozialversicherung?
 Correct answer: die Lebensversicherung
 """
 
-def parse_questions(text):
-    questions = []
-    # Split by "Aufgabe"
-    parts = re.split(r'Aufgabe \d+:', text)
-    
-    for idx, part in enumerate(parts[1:], 1):  # Skip first empty part
-        try:
-            lines = [l.strip() for l in part.strip().split('\n') if l.strip()]
-            if not lines:
-                print(f"Warning: Aufgabe {idx} has no content")
-                continue
-                
-            # Find the question prompt (lines until first bullet)
-            prompt_lines = []
-            i = 0
-            while i < len(lines) and not lines[i].startswith('•'):
-                if not lines[i].startswith('Correct answer'):
-                    prompt_lines.append(lines[i])
-                i += 1
-            
-            prompt = ' '.join(prompt_lines).strip()
-            if not prompt:
-                print(f"Warning: Aufgabe {idx} has no prompt")
-                continue
-            
-            # Get options
-            options = []
-            while i < len(lines) and lines[i].startswith('•'):
-                option_text = lines[i][1:].strip()  # Remove bullet
-                if option_text:
-                    options.append(option_text)
-                i += 1
-            
-            if len(options) != 4:
-                print(f"Warning: Aufgabe {idx} has {len(options)} options instead of 4")
-            
-            # Get correct answer
-            correct_answer = ""
-            while i < len(lines):
-                if 'Correct answer:' in lines[i]:
-                    correct_answer = lines[i].split('Correct answer:')[1].strip()
-                    break
-                i += 1
-            
-            if not correct_answer:
-                print(f"Warning: Aufgabe {idx} has no correct answer")
-                continue
-            
-            # Create options with isCorrect
-            formatted_options = []
-            for opt in options:
-                # Normalize comparison - remove extra spaces
-                is_correct = opt.strip() == correct_answer.strip()
-                formatted_options.append({
-                    "text": opt,
-                    "isCorrect": is_correct
-                })
-            
-            # Verify at least one option is correct
-            if not any(opt["isCorrect"] for opt in formatted_options):
-                print(f"Warning: Aufgabe {idx} - no matching correct answer found. Looking for: '{correct_answer}'")
-                print(f"  Options: {[opt['text'] for opt in formatted_options]}")
-            
-            questions.append({
-                "prompt": prompt,
-                "qType": "mcq",
-                "options": formatted_options,
-                "provider": "leben_in_deutschland",
-                "mainSkill": "leben_test",
-                "usageCategory": "common",
-                "level": "A1",
-                "status": "published",
-                "tags": ["300-Fragen"]
-            })
-        except Exception as e:
-            print(f"Error parsing Aufgabe {idx}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
-    
-    return questions
-
 try:
     # Parse questions
     print("Parsing questions...")
-    new_questions = parse_questions(questions_data)
+    new_questions = parse_questions(questions_data, use_cache='--no-cache' not in sys.argv)
     print(f"Parsed {len(new_questions)} questions")
     
     if len(new_questions) != 100:
@@ -907,8 +829,7 @@ try:
     
     # Write back
     print("Writing updated file...")
-    with open('questions/leben-in-deutschland-300-questions.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_bank('questions/leben-in-deutschland-300-questions.json', data['questions'])
     
     print(f"Successfully replaced first 100 questions. Total questions: {len(data['questions'])}")
 except Exception as e:
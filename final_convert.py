@@ -39,11 +39,10 @@ def main():
         print(f"Error reading convert_questions.py: {e}", flush=True)
         return
     
-    # Parse questions (reuse the function from convert_questions.py)
-    # For now, let's just import it
-    sys.path.insert(0, '.')
+    # Parse questions with the shared parser
     try:
-        from convert_questions import parse_questions
+        from question_bank.aufgabe import parse_questions
+        from question_bank.jsonstream import write_bank
         new_questions = parse_questions(questions_text)
         print(f"Parsed {len(new_questions)} questions", flush=True)
     except Exception as e:
@@ -63,8 +62,7 @@ def main():
         # Replace first 100
         data['questions'] = new_questions + data['questions'][100:]
         
-        with open('questions/leben-in-deutschland-300-questions.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_bank('questions/leben-in-deutschland-300-questions.json', data['questions'])
         
         print(f"Success! Replaced first 100 questions. Total: {len(data['questions'])}", flush=True)
         
@@ -0,0 +1,9 @@
+"""Shared tooling for the Leben-in-Deutschland question bank files.
+
+The modules in this package replace the copy-pasted helpers that used to live
+in the top-level ``replace_*.py`` / ``convert_questions.py`` scripts. Run the
+tools from the repository root, e.g. ``python -m question_bank.aufgabe``.
+"""
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
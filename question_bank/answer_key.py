@@ -0,0 +1,341 @@
+"""Compiled answer key and vectorized bulk grading of Leben attempts.
+
+The answer key is one int8 per bank slot - the index of the correct
+option, -1 if the question has none - compiled from the bank files into
+``.cache/leben-answer-key.npz``. Slots are positions in the concatenated
+bank files. Next to the answers it stores the ``syncKey`` of every slot
+(see ``question_bank.mongo_sync``), which survives splices and answer
+fixes, and a fingerprint of the slot order. The key is rebuilt when a bank
+file changes, so regrading after a fix such as
+``scripts/fix-correct-answer.ts`` always uses the current answers.
+
+Attempts are read from JSONL, one attempt per line::
+
+    {"attempt": "...", "questions": ["<syncKey>", ...], "answers": [2, null, ...]}
+    {"attempt": "...", "answers": {"<questionId>": 2, ...}}
+    {"_id": ..., "items": [{"questionId": ..., "studentAnswerIndexes": [2]}, ...]}
+
+The last form is an attempts export from the app. Question IDs are
+``syncKey``s or Mongo ``_id``s (plain or ``{"$oid": ...}``). ``_id``s are
+mapped through a questions export given with ``--questions`` (JSON array
+or mongoexport JSONL with ``_id`` and ``syncKey``; documents not synced
+yet are keyed the way ``mongo_sync`` adopts them). Integer slots are
+accepted only from a record whose ``bank`` equals the key's fingerprint,
+as in ``exam_draw bulk`` output. A record from another slot order is
+refused rather than graded against whatever now sits in those slots.
+
+``answers`` holds the chosen option index per question (``null`` when
+unanswered; a one-element list as in ``studentAnswerIndexes`` is accepted).
+Lines are parsed in blocks and graded with one gather and one bincount per
+block.
+
+Usage:
+    python -m question_bank.answer_key compile
+    python -m question_bank.answer_key grade attempts.jsonl [--out scores.jsonl]
+    python -m question_bank.answer_key grade attempts.jsonl --questions questions.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from question_bank import REPO_ROOT
+from question_bank.columnar import BANK_PATHS, ColumnarBank, stat_banks
+from question_bank.exam_draw import COMMON_COUNT, STATE_COUNT
+from question_bank.jsonstream import iter_array
+from question_bank.mongo_sync import MAIN_SKILL, PROVIDER, assign_keys, bank_keys, keys_fingerprint
+
+DEFAULT_ARTIFACT = os.path.join(REPO_ROOT, '.cache', 'leben-answer-key.npz')
+EXAM_SIZE = COMMON_COUNT + STATE_COUNT
+PASS_SCORE = 17
+DEFAULT_BLOCK = 1 << 16
+
+# Chosen-option code for unanswered or unusable answers; never equals a key entry.
+_NO_ANSWER = -2
+_PLAIN_TYPES = {int, type(None)}
+
+
+class GradeError(ValueError):
+    pass
+
+
+class AnswerKey:
+    def __init__(self, correct, keys, sources, sizes=None, mtimes=None):
+        self.correct = correct
+        self.keys = [str(k) for k in keys]
+        self.fingerprint = keys_fingerprint(self.keys)
+        self.sources = [str(s) for s in sources]
+        self.sizes = sizes
+        self.mtimes = mtimes
+        # Question ID -> slot: the sync keys, plus Mongo _ids after add_ids.
+        self.slots = {key: slot for slot, key in enumerate(self.keys)}
+        # Mongo _id of each slot, where known.
+        self.ids = [None] * len(self.keys)
+
+    def __len__(self):
+        return len(self.correct)
+
+    @classmethod
+    def compile(cls, paths=BANK_PATHS):
+        sizes, mtimes = stat_banks(paths)
+        bank = ColumnarBank.from_files(paths)
+        return cls(bank.correct, bank_keys(paths), paths, sizes, mtimes)
+
+    def save(self, path=DEFAULT_ARTIFACT):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, correct=self.correct, keys=np.asarray(self.keys),
+                     sources=np.asarray(self.sources), sizes=self.sizes, mtimes=self.mtimes)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_ARTIFACT, paths=BANK_PATHS, rebuild=True):
+        """Load the key, recompiling it if the banks changed since it was built."""
+        try:
+            with np.load(path) as z:
+                if 'keys' in z.files and list(z['sources']) == list(paths):
+                    sizes, mtimes = stat_banks(paths)
+                    if np.array_equal(z['sizes'], sizes) and np.array_equal(z['mtimes'], mtimes):
+                        return cls(z['correct'], z['keys'], z['sources'], z['sizes'], z['mtimes'])
+        except FileNotFoundError:
+            pass
+        if not rebuild:
+            raise GradeError(f"{path} is missing or out of date")
+        key = cls.compile(paths)
+        key.save(path)
+        return key
+
+    def add_ids(self, docs):
+        """Map the Mongo ``_id``s of exported question documents to their slots.
+
+        Documents without a ``syncKey`` get the key ``mongo_sync`` would
+        adopt them under. Returns the number of documents matched.
+        """
+        keyed, legacy = [], []
+        for doc in docs:
+            if not isinstance(doc, dict) or '_id' not in doc:
+                continue
+            if doc.get('syncKey'):
+                keyed.append((_object_id(doc['_id']), doc['syncKey']))
+            elif doc.get('provider') == PROVIDER and doc.get('mainSkill') == MAIN_SKILL:
+                legacy.append((_object_id(doc['_id']), doc))
+        legacy.sort(key=lambda item: item[0])
+        keys = assign_keys((d.get('usageCategory') or '', d.get('state'), d.get('prompt') or '')
+                           for _, d in legacy)
+        keyed += zip([_id for _id, _ in legacy], keys)
+        matched = 0
+        for _id, key in keyed:
+            slot = self.slots.get(key)
+            if slot is not None:
+                self.slots[_id] = slot
+                self.ids[slot] = _id
+                matched += 1
+        return matched
+
+    def question_id(self, slot):
+        """The Mongo ``_id`` of a slot if known, else its ``syncKey``."""
+        return self.ids[slot] or self.keys[slot]
+
+    def resolve(self, qids, bank=None):
+        """Slots of one attempt's question IDs; ``bank`` is the record's fingerprint."""
+        slots = self.slots
+        out = []
+        positional = False
+        for qid in qids:
+            if type(qid) is dict:
+                qid = _object_id(qid)
+            if type(qid) is str:
+                slot = slots.get(qid)
+                if slot is None:
+                    if not qid.isdigit():
+                        raise GradeError(f"Unknown question ID {qid!r}")
+                    positional, slot = True, int(qid)
+            elif type(qid) is int:
+                positional, slot = True, qid
+            else:
+                raise GradeError(f"Question ID {qid!r} is not a string or an integer")
+            out.append(slot)
+        if positional and bank != self.fingerprint:
+            raise GradeError(
+                f"Question positions from bank {bank or '(not recorded)'}, but the banks are now "
+                f"{self.fingerprint}; positions move when questions are added or removed, "
+                f"so give syncKeys or question _ids instead")
+        return out
+
+    def hits(self, qids, chosen):
+        """Boolean array: answer i picked the correct option of question ``qids[i]``."""
+        if len(qids) and (qids.min() < 0 or qids.max() >= len(self.correct)):
+            raise GradeError(f"Question ID out of range 0-{len(self.correct) - 1}")
+        return self.correct[qids] == chosen
+
+    def grade(self, owner, qids, chosen, n_attempts):
+        """Scores for flat answer arrays; ``owner[i]`` is the attempt of answer i.
+
+        Returns ``(scores, totals)`` as int arrays of length ``n_attempts``.
+        """
+        hits = self.hits(qids, chosen)
+        scores = np.bincount(owner, weights=hits, minlength=n_attempts).astype(np.int32)
+        totals = np.bincount(owner, minlength=n_attempts).astype(np.int32)
+        return scores, totals
+
+    def iter_graded(self, lines, block=DEFAULT_BLOCK):
+        """Yield ``(attempt, score, total, passed)`` for every JSONL line."""
+        for names, owner, qids, chosen in iter_answer_blocks(lines, self, block):
+            scores, totals = self.grade(owner, qids, chosen, len(names))
+            passed = scores >= PASS_SCORE
+            yield from zip(names, scores.tolist(), totals.tolist(), passed.tolist())
+
+
+def iter_answer_blocks(lines, key, block=DEFAULT_BLOCK):
+    """Parse attempts JSONL into flat arrays, ``block`` attempts at a time.
+
+    Yields ``(names, owner, qids, chosen)``: the attempt names of the block
+    and, per answer, the attempt it belongs to, the slot of the question in
+    ``key`` and the chosen option (-2 when unanswered).
+    """
+    batch = []
+    for lineno, line in enumerate(lines, 1):
+        if line.strip():
+            batch.append((lineno, line))
+        if len(batch) == block:
+            yield _parse_block(batch, key)
+            batch = []
+    if batch:
+        yield _parse_block(batch, key)
+
+
+def _parse_block(batch, key):
+    names, lengths, qids, answers = [], [], [], []
+    for lineno, line in batch:
+        try:
+            record = json.loads(line)
+            questions, chosen = _answer_lists(record)
+            slots = key.resolve(questions, record.get('bank'))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            raise GradeError(f"Line {lineno}: {e}") from None
+        if 'attempt' in record:
+            names.append(record['attempt'])
+        else:
+            names.append(_object_id(record['_id']) if '_id' in record else lineno)
+        lengths.append(len(chosen))
+        qids.extend(slots)
+        answers.extend(chosen)
+    qids = np.asarray(qids, dtype=np.int64)
+    if set(map(type, answers)) <= _PLAIN_TYPES:
+        chosen = np.array(answers, dtype=object)
+        chosen[np.equal(chosen, None)] = _NO_ANSWER
+        chosen = chosen.astype(np.int64)
+    else:
+        # Bools and lists need a look at each answer.
+        chosen = np.asarray([a if type(a) is int else _chosen_code(a) for a in answers], dtype=np.int64)
+    chosen[chosen < 0] = _NO_ANSWER
+    owner = np.repeat(np.arange(len(batch)), lengths)
+    return names, owner, qids, chosen
+
+
+def _answer_lists(record):
+    """``(question_ids, answers)`` of one attempt record."""
+    if 'answers' not in record and isinstance(record.get('items'), list):
+        items = record['items']
+        return [item['questionId'] for item in items], [item.get('studentAnswerIndexes') for item in items]
+    answers = record['answers']
+    if isinstance(answers, dict):
+        return list(answers), list(answers.values())
+    questions = record['questions']
+    if len(questions) != len(answers):
+        raise ValueError(f"{len(questions)} questions but {len(answers)} answers")
+    return questions, answers
+
+
+def _object_id(value):
+    """A Mongo ``_id`` as a string; mongoexport writes ObjectIds as ``{"$oid": ...}``."""
+    if isinstance(value, dict) and '$oid' in value:
+        return value['$oid']
+    return str(value)
+
+
+def read_export(path):
+    """Documents of a JSON array file or a JSONL file (e.g. from mongoexport)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(64).lstrip('\ufeff \t\r\n')[:1]
+        f.seek(0)
+        if first == '[':
+            yield from iter_array(f)
+            return
+        for lineno, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise GradeError(f"{path} line {lineno}: {e}") from None
+
+
+def load_key(paths=BANK_PATHS, artifact=DEFAULT_ARTIFACT, questions=None):
+    """``AnswerKey.load`` plus the ``_id``s of a questions export, if given."""
+    key = AnswerKey.load(artifact, paths)
+    if questions:
+        try:
+            key.add_ids(read_export(questions))
+        except (OSError, ValueError) as e:
+            raise GradeError(f"{questions}: {e}") from None
+    return key
+
+
+def _chosen_code(answer):
+    if isinstance(answer, list) and len(answer) == 1:
+        answer = answer[0]
+    if type(answer) is int:
+        return answer
+    return _NO_ANSWER
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile the Leben answer key and grade attempts in bulk.')
+    parser.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    parser.add_argument('--bank', action='append', help='bank file (repeatable, default: both Leben banks)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('compile', help='(re)build the answer key')
+    p = sub.add_parser('grade', help='grade an attempts JSONL file')
+    p.add_argument('attempts')
+    p.add_argument('--out', help='write per-attempt scores as JSONL here')
+    p.add_argument('--questions', metavar='EXPORT',
+                   help='questions export (JSON or JSONL) to map question _ids to the bank')
+    args = parser.parse_args(argv)
+
+    paths = tuple(args.bank or BANK_PATHS)
+    if args.command == 'compile':
+        key = AnswerKey.compile(paths)
+        key.save(args.artifact)
+        missing = int((key.correct < 0).sum())
+        print(f"{len(key)} questions, {missing} without a correct option")
+        print(f"Wrote {args.artifact}")
+        return
+
+    count = passed_count = 0
+    out = open(args.out, 'w', encoding='utf-8') if args.out else None
+    try:
+        key = load_key(paths, args.artifact, args.questions)
+        with open(args.attempts, 'r', encoding='utf-8') as f:
+            for attempt, score, total, passed in key.iter_graded(f):
+                count += 1
+                passed_count += passed
+                if out is not None:
+                    out.write('{"attempt": %s, "score": %d, "total": %d, "passed": %s}\n' % (
+                        attempt if type(attempt) is int else json.dumps(attempt, ensure_ascii=False),
+                        score, total, 'true' if passed else 'false'))
+    except GradeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if out is not None:
+            out.close()
+    rate = passed_count / count * 100 if count else 0
+    print(f"{count} attempts graded, {passed_count} passed ({rate:.2f}%), "
+          f"pass mark {PASS_SCORE}/{EXAM_SIZE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""Byte-offset sidecar index for the question bank files.
+
+The bank files are written by ``json.dump(data, f, ensure_ascii=False,
+indent=2)``, so every question occupies a fixed, predictable byte span. The
+``.idx`` sidecar next to the bank records ``(start, end)`` for each question,
+which lets a tool read question N with one seek and lets a range replacement
+serialize only the new questions and copy the rest of the file as bytes
+into an atomically replaced bank.
+
+The sidecar stores the bank's size and mtime; a stale sidecar is rebuilt
+automatically on load.
+
+Usage:
+    python -m question_bank.bank_index build BANK.json
+    python -m question_bank.bank_index show BANK.json NUMBER
+"""
+import argparse
+import json
+import os
+import shutil
+import struct
+import sys
+from array import array
+
+from question_bank.jsonstream import dumps_question, replace_file
+
+BANK_PATH = 'questions/leben-in-deutschland-300-questions.json'
+
+INDEX_SUFFIX = '.idx'
+_MAGIC = b'QBIDX1\0\0'
+# magic, question count, bank size, bank mtime_ns
+_HEADER = struct.Struct('<8sQQQ')
+
+# Byte layout of a bank written with indent=2. Questions sit at depth 2.
+BANK_HEAD = b'{\n  "questions": [\n'
+BANK_TAIL = b'\n  ]\n}'
+SEPARATOR = b',\n'
+_EMPTY_BANK = b'{\n  "questions": []\n}'
+
+
+class StaleIndexError(Exception):
+    """The bank file does not have the layout the index relies on."""
+
+
+def index_path(bank_path):
+    return bank_path + INDEX_SUFFIX
+
+
+def serialize_question(question):
+    """Bytes of one question exactly as json.dump(indent=2) writes it in a bank."""
+    return dumps_question(question).encode('utf-8')
+
+
+def serialize_questions(questions):
+    return SEPARATOR.join(serialize_question(q) for q in questions)
+
+
+class BankIndex:
+    """Question byte spans of one bank file, ``starts[i]:ends[i]``."""
+
+    def __init__(self, bank_path, starts, ends, size, mtime_ns):
+        self.bank_path = bank_path
+        self.starts = starts
+        self.ends = ends
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, bank_path):
+        """Scan the bank once and record each question's byte span."""
+        with open(bank_path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        starts, ends = array('Q'), array('Q')
+        if raw != _EMPTY_BANK:
+            if not raw.startswith(BANK_HEAD) or not raw.endswith(BANK_TAIL):
+                raise StaleIndexError(f"{bank_path} is not in the indent=2 bank layout")
+            pos = len(BANK_HEAD)
+            for question in data['questions']:
+                chunk = serialize_question(question)
+                if raw[pos:pos + len(chunk)] != chunk:
+                    raise StaleIndexError(
+                        f"{bank_path}: question {len(starts) + 1} is not in the indent=2 bank layout")
+                starts.append(pos)
+                ends.append(pos + len(chunk))
+                pos += len(chunk) + len(SEPARATOR)
+        st = os.stat(bank_path)
+        return cls(bank_path, starts, ends, st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def load(cls, bank_path, rebuild=True):
+        """Load the sidecar, rebuilding and saving it when missing or stale."""
+        st = os.stat(bank_path)
+        try:
+            with open(index_path(bank_path), 'rb') as f:
+                magic, count, size, mtime_ns = _HEADER.unpack(f.read(_HEADER.size))
+                if magic == _MAGIC and size == st.st_size and mtime_ns == st.st_mtime_ns:
+                    starts, ends = array('Q'), array('Q')
+                    starts.fromfile(f, count)
+                    ends.fromfile(f, count)
+                    return cls(bank_path, starts, ends, size, mtime_ns)
+        except (OSError, EOFError, struct.error):
+            pass
+        if not rebuild:
+            raise StaleIndexError(f"{index_path(bank_path)} is missing or stale")
+        index = cls.build(bank_path)
+        index.save()
+        return index
+
+    def save(self):
+        def write(f):
+            f.write(_HEADER.pack(_MAGIC, len(self.starts), self.size, self.mtime_ns))
+            self.starts.tofile(f)
+            self.ends.tofile(f)
+
+        replace_file(index_path(self.bank_path), write)
+
+    def read_raw(self, i):
+        with open(self.bank_path, 'rb') as f:
+            f.seek(self.starts[i])
+            return f.read(self.ends[i] - self.starts[i])
+
+    def read_question(self, i):
+        return json.loads(self.read_raw(i))
+
+    def read_range(self, start, end):
+        """Questions ``[start:end]`` with a single seek and read."""
+        start, end, _ = slice(start, end).indices(len(self))
+        if start >= end:
+            return []
+        with open(self.bank_path, 'rb') as f:
+            f.seek(self.starts[start])
+            raw = f.read(self.ends[end - 1] - self.starts[start])
+        return json.loads(b'[' + raw + b']')
+
+    def replace_range(self, start, end, new_questions):
+        """Equivalent of ``data['questions'][start:end] = new_questions``.
+
+        The new bank is the head of the old file up to the range, the new
+        questions and the old tail, written to a temporary file that is
+        ``os.replace``d over the bank, so a crash never leaves a partial
+        bank. Only the spans of the new questions are serialized; the index
+        of the tail is shifted rather than rebuilt.
+        """
+        n = len(self)
+        start, end, _ = slice(start, end).indices(n)
+        end = max(start, end)
+        chunks = [serialize_question(q) for q in new_questions]
+        if not chunks and start == end:
+            return
+        if not chunks and start == 0 and end == n:
+            self._rewrite_all(_EMPTY_BANK)
+            return
+        if n == 0:
+            self._rewrite_all(BANK_HEAD + SEPARATOR.join(chunks) + BANK_TAIL)
+            return
+
+        payload = SEPARATOR.join(chunks)
+        if start < n:
+            # Splice in front of question `start` (or over start..end-1).
+            cut_from = self.starts[start]
+            if start < end:
+                cut_to = self.ends[end - 1]
+                if not chunks:
+                    # Drop the separator that followed / preceded the range.
+                    if end < n:
+                        cut_to = self.starts[end]
+                    else:
+                        cut_from = self.ends[start - 1]
+            else:
+                cut_to = cut_from
+                payload += SEPARATOR
+        else:
+            # Append after the last question.
+            cut_from = cut_to = self.ends[n - 1]
+            payload = SEPARATOR + payload
+
+        def write(out):
+            with open(self.bank_path, 'rb') as f:
+                _copy_bytes(f, out, cut_from)
+                out.write(payload)
+                f.seek(cut_to)
+                shutil.copyfileobj(f, out)
+
+        replace_file(self.bank_path, write)
+
+        # Offsets of the new questions, then shift everything after the range.
+        delta = len(payload) - (cut_to - cut_from)
+        base = cut_from + (len(SEPARATOR) if start >= n else 0)
+        new_starts, new_ends = array('Q'), array('Q')
+        for chunk in chunks:
+            new_starts.append(base)
+            new_ends.append(base + len(chunk))
+            base += len(chunk) + len(SEPARATOR)
+        tail_starts = array('Q', (s + delta for s in self.starts[end:]))
+        tail_ends = array('Q', (e + delta for e in self.ends[end:]))
+        self.starts = self.starts[:start] + new_starts + tail_starts
+        self.ends = self.ends[:start] + new_ends + tail_ends
+        self._restat()
+        self.save()
+
+    def _rewrite_all(self, raw):
+        replace_file(self.bank_path, lambda f: f.write(raw))
+        rebuilt = BankIndex.build(self.bank_path)
+        self.starts, self.ends = rebuilt.starts, rebuilt.ends
+        self._restat()
+        self.save()
+
+    def _restat(self):
+        st = os.stat(self.bank_path)
+        self.size, self.mtime_ns = st.st_size, st.st_mtime_ns
+
+
+def _copy_bytes(src, dst, count, chunk=1 << 20):
+    """Copy the next ``count`` bytes of ``src`` to ``dst``."""
+    while count > 0:
+        data = src.read(min(chunk, count))
+        if not data:
+            raise StaleIndexError(f"{src.name} is shorter than its index")
+        dst.write(data)
+        count -= len(data)
+
+
+def replace_range(bank_path, start, end, new_questions):
+    """Load (or build) the sidecar for ``bank_path`` and splice one range."""
+    index = BankIndex.load(bank_path)
+    index.replace_range(start, end, new_questions)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Byte-offset index for a question bank file.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='(re)build the .idx sidecar')
+    build.add_argument('bank', nargs='?', default=BANK_PATH)
+    show = sub.add_parser('show', help='print question NUMBER (1-based)')
+    show.add_argument('bank')
+    show.add_argument('number', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        index = BankIndex.build(args.bank)
+        index.save()
+        print(f"Indexed {len(index)} questions into {index_path(args.bank)}")
+    else:
+        index = BankIndex.load(args.bank)
+        if not 1 <= args.number <= len(index):
+            print(f"Question {args.number} is out of range (1-{len(index)})", file=sys.stderr)
+            sys.exit(1)
+        sys.stdout.write(index.read_raw(args.number - 1).decode('utf-8').strip() + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""Columnar in-memory view of the question banks for analytics passes.
+
+Instead of a list of dicts, ``ColumnarBank`` keeps parallel NumPy arrays:
+
+* ``prompt_offsets`` into one ``prompt_text`` string buffer,
+* ``q_type``, ``state``, ``level`` as small integer codes with
+  their name tables (``state`` code 0 means "no state", i.e. common),
+* ``correct`` - index of the first correct option, -1 if there is none,
+* ``n_options`` / ``n_correct`` per question,
+* ``tags`` - one bit per distinct tag in a uint64 mask,
+* ``has_media`` - question carries ``media`` or ``images``,
+* ``source`` / ``position`` - which file the question came from and its
+  index in that file's ``questions`` list.
+
+Counting per state/level/tag or finding questions with no correct option
+are then single vectorized expressions. Requires numpy.
+
+Usage: python -m question_bank.columnar [BANK.json ...]
+"""
+import argparse
+import os
+
+import numpy as np
+
+from question_bank.jsonstream import iter_bank_questions
+
+BANK_PATHS = (
+    'questions/leben-in-deutschland-300-questions.json',
+    'questions/leben-in-deutschland-state-questions.json',
+)
+
+
+def stat_banks(paths):
+    """Sizes and mtimes of the bank files, to tell whether a compiled artifact is stale."""
+    stats = [os.stat(p) for p in paths]
+    return (np.asarray([s.st_size for s in stats], dtype=np.int64),
+            np.asarray([s.st_mtime_ns for s in stats], dtype=np.int64))
+
+
+class _Codes:
+    """Assigns small integer codes to strings in first-seen order."""
+
+    def __init__(self, reserved=()):
+        self.names = list(reserved)
+        self.codes = {name: i for i, name in enumerate(self.names)}
+
+    def code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+class ColumnarBank:
+    def __init__(self, columns, prompt_text, names, sources):
+        self.prompt_text = prompt_text
+        self.sources = sources
+        self.q_type_names = names['q_type']
+        self.state_names = names['state']
+        self.level_names = names['level']
+        self.tag_names = names['tags']
+        for key, value in columns.items():
+            setattr(self, key, value)
+
+    def __len__(self):
+        return len(self.correct)
+
+    @classmethod
+    def from_questions(cls, questions, sources=None):
+        """Build from an iterable of bank dicts (or ``(source_code, dict)`` pairs)."""
+        q_types, states, levels, tags = _Codes(), _Codes([None]), _Codes([None]), _Codes()
+        prompt_parts = []
+        offsets = [0]
+        cols = {k: [] for k in ('q_type', 'state', 'level', 'correct', 'n_options',
+                                'n_correct', 'tags', 'has_media', 'source', 'position')}
+        per_source = {}
+        pos = 0
+        for item in questions:
+            source, q = item if sources is not None else (0, item)
+            prompt = q.get('prompt') or ''
+            prompt_parts.append(prompt)
+            pos += len(prompt)
+            offsets.append(pos)
+
+            options = q.get('options') or []
+            flags = [bool(o.get('isCorrect')) for o in options]
+            mask = 0
+            for tag in q.get('tags') or ():
+                bit = tags.code(tag)
+                if bit >= 64:
+                    raise ValueError("ColumnarBank supports at most 64 distinct tags")
+                mask |= 1 << bit
+
+            cols['q_type'].append(q_types.code(q.get('qType')))
+            cols['state'].append(states.code(q.get('state')))
+            cols['level'].append(levels.code(q.get('level')))
+            cols['correct'].append(flags.index(True) if True in flags else -1)
+            cols['n_options'].append(len(options))
+            cols['n_correct'].append(sum(flags))
+            cols['tags'].append(mask)
+            cols['has_media'].append(bool(q.get('media') or q.get('images')))
+            cols['source'].append(source)
+            cols['position'].append(per_source.get(source, 0))
+            per_source[source] = per_source.get(source, 0) + 1
+
+        columns = {
+            'prompt_offsets': np.asarray(offsets, dtype=np.int64),
+            'q_type': np.asarray(cols['q_type'], dtype=np.uint8),
+            'state': np.asarray(cols['state'], dtype=np.uint8),
+            'level': np.asarray(cols['level'], dtype=np.uint8),
+            'correct': np.asarray(cols['correct'], dtype=np.int8),
+            'n_options': np.asarray(cols['n_options'], dtype=np.uint8),
+            'n_correct': np.asarray(cols['n_correct'], dtype=np.uint8),
+            'tags': np.asarray(cols['tags'], dtype=np.uint64),
+            'has_media': np.asarray(cols['has_media'], dtype=bool),
+            'source': np.asarray(cols['source'], dtype=np.uint8),
+            'position': np.asarray(cols['position'], dtype=np.int32),
+        }
+        names = {'q_type': q_types.names, 'state': states.names,
+                 'level': levels.names, 'tags': tags.names}
+        return cls(columns, ''.join(prompt_parts), names, list(sources or ['<memory>']))
+
+    @classmethod
+    def from_files(cls, paths=BANK_PATHS):
+        def items():
+            for code, path in enumerate(paths):
+                for q in iter_bank_questions(path):
+                    yield code, q
+        return cls.from_questions(items(), sources=list(paths))
+
+    def prompt(self, i):
+        return self.prompt_text[self.prompt_offsets[i]:self.prompt_offsets[i + 1]]
+
+    # -- masks -------------------------------------------------------------
+
+    def state_mask(self, name):
+        """Questions of one state; ``None`` selects the common questions."""
+        try:
+            return self.state == self.state_names.index(name)
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+
+    def tag_mask(self, name):
+        try:
+            bit = np.uint64(1) << np.uint64(self.tag_names.index(name))
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return (self.tags & bit) != 0
+
+    def no_correct_mask(self):
+        return self.correct < 0
+
+    # -- aggregations ------------------------------------------------------
+
+    def _count(self, codes, names, mask):
+        if mask is not None:
+            codes = codes[mask]
+        counts = np.bincount(codes, minlength=len(names))
+        return {name: int(c) for name, c in zip(names, counts)}
+
+    def count_by_state(self, mask=None):
+        return self._count(self.state, self.state_names, mask)
+
+    def count_by_level(self, mask=None):
+        return self._count(self.level, self.level_names, mask)
+
+    def count_by_q_type(self, mask=None):
+        return self._count(self.q_type, self.q_type_names, mask)
+
+    def count_by_tag(self, mask=None):
+        tags = self.tags if mask is None else self.tags[mask]
+        bits = np.uint64(1) << np.arange(len(self.tag_names), dtype=np.uint64)
+        counts = ((tags[:, None] & bits[None, :]) != 0).sum(axis=0)
+        return {name: int(c) for name, c in zip(self.tag_names, counts)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summary counts over the question banks.')
+    parser.add_argument('banks', nargs='*', default=list(BANK_PATHS))
+    args = parser.parse_args(argv)
+
+    bank = ColumnarBank.from_files(args.banks)
+    print(f"{len(bank)} questions from {len(args.banks)} files")
+    for title, counts in (('State', bank.count_by_state()), ('Level', bank.count_by_level()),
+                          ('Type', bank.count_by_q_type()), ('Tag', bank.count_by_tag())):
+        print(f"{title}:")
+        for name, count in counts.items():
+            if count:
+                print(f"  {name if name is not None else '(common)'}: {count}")
+    missing = np.flatnonzero(bank.no_correct_mask())
+    print(f"No correct option: {len(missing)}")
+    for i in missing:
+        print(f"  {bank.sources[bank.source[i]]} #{bank.position[i] + 1}: {bank.prompt(i)[:60]}")
+    print(f"With media: {int(bank.has_media.sum())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+"""Near-duplicate question detection with MinHash and LSH.
+
+``scripts/find-duplicate-state-questions.ts`` only catches prompts that are
+byte-for-byte equal, and only within one state. This tool also finds
+reworded copies such as the two "Wann waren die Nationalsozialisten ... an
+der Macht?" questions (#152 and #155, similarity 0.53, found with the default
+``--threshold`` of 0.5), across any number of bank files.
+
+Each question becomes a set of character shingles (``k`` consecutive
+characters) taken from its normalized prompt and from each option text
+separately, so option order does not matter. The whole corpus is encoded
+as one code point array and hashed in a few vectorized passes. A MinHash
+signature of ``perms`` values per question estimates Jaccard similarity.
+LSH splits the signature into bands: questions sharing all values of any
+band land in the same bucket and become candidate pairs. Only candidates
+are compared, with the exact Jaccard similarity of their shingle sets, so
+the cost grows with the number of questions and not with its square.
+Pairs at or above ``--threshold`` are merged into clusters.
+
+Questions of two different states never share an exam, so pairs between
+them (the 16 "Welches Wappen gehört zum Bundesland ...?" items) are skipped
+unless ``--cross-state`` is given. Questions with media are marked in the
+report, as their texts may match while the images differ.
+
+Usage:
+    python -m question_bank.dedupe [BANK.json ...] [--threshold 0.5] [--out clusters.json]
+"""
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+from question_bank.columnar import BANK_PATHS
+from question_bank.jsonstream import iter_bank_questions
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_SHINGLE = 5
+DEFAULT_PERMS = 256
+# Buckets larger than this are compared against their first member only.
+MAX_BUCKET = 64
+RECALL = 0.95
+# About 4 standard deviations of a 256-value estimate at the default
+# threshold: 4 * sqrt(0.5 * 0.5 / 256) = 0.125.
+ESTIMATE_SLACK = 0.125
+_SEED = 0x5EED
+_PAIR_BLOCK = 1 << 23
+_DENSIFY_ROWS = 1 << 12
+_EMPTY = np.uint64(np.iinfo(np.uint64).max)
+_EMPTY32 = np.uint32(np.iinfo(np.uint32).max)
+_NON_WORD = re.compile(r'[\W_]+')
+_M64 = np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize(text):
+    """Casefolded text with punctuation and runs of whitespace as one space."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def question_fields(q):
+    """Prompt and option texts of a bank question."""
+    return [q.get('prompt') or ''] + [o.get('text') or '' for o in q.get('options') or ()]
+
+
+def choose_bands(perms, threshold, recall=RECALL):
+    """``(bands, rows)`` for LSH over ``perms`` signature values.
+
+    Picks the most rows per band (fewest chance candidates) for which a pair
+    exactly at ``threshold`` still shares a bucket with probability ``recall``.
+    """
+    for rows in range(perms, 0, -1):
+        bands = perms // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return perms, 1
+
+
+def _mix(x):
+    """splitmix64 finalizer, vectorized over uint64 arrays (modifies ``x``)."""
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+class Shingles:
+    """Shingle hashes per question, as one flat array with offsets."""
+
+    def __init__(self, hashes, offsets):
+        self.hashes = hashes
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def of(self, i):
+        """Distinct shingle hashes of question ``i``, sorted."""
+        return np.unique(self.hashes[self.offsets[i]:self.offsets[i + 1]])
+
+    @classmethod
+    def from_texts(cls, field_lists, k=DEFAULT_SHINGLE):
+        """Shingle every question given as a list of its field texts."""
+        parts, owners = [], []
+        for owner, fields in enumerate(field_lists):
+            for text in fields:
+                text = normalize(text)
+                if text:
+                    # Pad short fields ("ja", "1949") so they still yield one shingle.
+                    parts.append(text.ljust(k))
+                    owners.append(owner)
+        n = len(field_lists)
+        if not parts:
+            return cls(np.zeros(0, dtype=np.uint64), np.zeros(n + 1, dtype=np.int64))
+        # NUL separates fields; windows containing it are dropped.
+        corpus = '\0'.join(parts) + '\0'
+        codes = np.frombuffer(corpus.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        starts = len(codes) - k + 1
+        h = codes[:starts].copy()
+        for j in range(1, k):
+            h *= _M64
+            h += codes[j:j + starts]
+        nuls = np.concatenate(([0], np.cumsum(codes == 0)))
+        sep = nuls[k:k + starts] != nuls[:starts]
+        lengths = np.fromiter((len(p) + 1 for p in parts), dtype=np.int64, count=len(parts))
+        owner = np.repeat(np.asarray(owners, dtype=np.int64), lengths)[:starts]
+        keep = ~sep
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner[keep], minlength=n), out=offsets[1:])
+        return cls(_mix(h[keep]), offsets)
+
+    def jaccard(self, i, j):
+        a, b = self.of(i), self.of(j)
+        if not len(a) and not len(b):
+            return 1.0
+        common = len(np.intersect1d(a, b, assume_unique=True))
+        return common / (len(a) + len(b) - common)
+
+
+def minhash(shingles, perms=DEFAULT_PERMS, seed=_SEED):
+    """(questions, perms) uint32 one-permutation MinHash signatures.
+
+    The high half of a shingle hash picks one of ``perms`` bins, the low
+    half is its value, and each bin keeps its minimum: one pass over the
+    shingles instead of ``perms``. Short questions leave bins empty; each
+    empty bin copies the value of the first filled bin in its own fixed
+    random probe order ("optimal densification"), which keeps bins
+    independent enough for LSH and the collision probability equal to the
+    Jaccard similarity. Values are then rehashed to 32 bits to halve the
+    memory. Questions without shingles get all-ones rows.
+    """
+    n = len(shingles)
+    owner = np.repeat(np.arange(n, dtype=np.int64), np.diff(shingles.offsets))
+    h = shingles.hashes
+    bins = (((h >> np.uint64(32)) * np.uint64(perms)) >> np.uint64(32)).astype(np.int64)
+    sig = np.full(n * perms, _EMPTY, dtype=np.uint64)
+    np.minimum.at(sig, owner * perms + bins, h & np.uint64(0xFFFFFFFF))
+    sig = sig.reshape(n, perms)
+    probes = np.argsort(np.random.default_rng(seed).random((perms, perms)), axis=1)
+    for lo in range(0, n, _DENSIFY_ROWS):
+        block = sig[lo:lo + _DENSIFY_ROWS]
+        filled = block != _EMPTY
+        rows, cols = np.nonzero(~filled & filled.any(axis=1)[:, None])
+        src = np.empty(len(rows), dtype=np.int64)
+        pending = np.arange(len(rows))
+        for step in range(perms):
+            if not len(pending):
+                break
+            probe = probes[cols[pending], step]
+            hit = filled[rows[pending], probe]
+            src[pending[hit]] = probe[hit]
+            pending = pending[~hit]
+        block[rows, cols] = block[rows, src]
+    empty = sig[:, 0] == _EMPTY
+    sig = (_mix(sig) >> np.uint64(32)).astype(np.uint32)
+    sig[empty] = _EMPTY32
+    return sig
+
+
+def candidate_pairs(sig, bands, rows, max_bucket=MAX_BUCKET):
+    """Sorted unique ``(i, j)`` pairs, i < j, that share a bucket in some band."""
+    n = len(sig)
+    ids = np.flatnonzero((sig != _EMPTY32).any(axis=1))
+    found = []
+    for band in range(bands):
+        key = np.zeros(len(ids), dtype=np.uint64)
+        # Strided columns: neighbouring bins of short questions are less independent.
+        for col in sig[ids, band::bands][:, :rows].T:
+            key = key * _M64 + col.astype(np.uint64)
+        order = np.argsort(key, kind='stable')
+        keys = key[order]
+        members = ids[order]
+        bounds = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1], [True])))
+        starts, sizes = bounds[:-1], np.diff(bounds)
+        # Buckets of one size at a time, all their pairs in one indexing step.
+        present = np.flatnonzero(np.bincount(sizes))
+        for size in present[present > 1].tolist():
+            first = starts[sizes == size][:, None]
+            if size > max_bucket:
+                left = np.broadcast_to(first, (len(first), size - 1))
+                right = first + np.arange(1, size)
+            else:
+                li, ri = np.triu_indices(size, 1)
+                left, right = first + li, first + ri
+            a, b = members[left.ravel()], members[right.ravel()]
+            found.append(np.minimum(a, b) * n + np.maximum(a, b))
+    if not found:
+        return np.zeros((0, 2), dtype=np.int64)
+    codes = np.concatenate(found)
+    codes.sort()
+    codes = codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+    return np.stack((codes // n, codes % n), axis=1)
+
+
+def estimate_similarity(sig, pairs):
+    """MinHash estimate of the Jaccard similarity of each pair.
+
+    Compares only the low byte of every value (b-bit MinHash): a quarter of
+    the memory traffic, for a bias of at most 1/256 upwards.
+    """
+    low = sig.astype(np.uint8)
+    out = np.empty(len(pairs))
+    step = max(1, _PAIR_BLOCK // sig.shape[1])
+    for lo in range(0, len(pairs), step):
+        i, j = pairs[lo:lo + step].T
+        out[lo:lo + step] = np.count_nonzero(low[i] == low[j], axis=1) / sig.shape[1]
+    return out
+
+
+def clusters_from_pairs(pairs, n):
+    """Connected components (lists of at least two question indices) of the pair graph."""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    groups = {}
+    for i, j in pairs:
+        root = find(i)
+        groups.setdefault(root, set()).update((i, j))
+    return [sorted(members) for _, members in sorted(groups.items())]
+
+
+class Entry:
+    __slots__ = ('source', 'position', 'state', 'prompt', 'has_media')
+
+    def __init__(self, source, position, q):
+        self.source = source
+        self.position = position
+        self.state = q.get('state')
+        self.prompt = q.get('prompt') or ''
+        self.has_media = bool(q.get('media') or q.get('images'))
+
+    def to_dict(self):
+        return {'source': self.source, 'number': self.position + 1, 'state': self.state,
+                'prompt': self.prompt, 'hasMedia': self.has_media}
+
+
+def find_duplicates(paths, threshold=DEFAULT_THRESHOLD, k=DEFAULT_SHINGLE,
+                    perms=DEFAULT_PERMS, cross_state=False):
+    """``(entries, clusters)``; each cluster is ``(members, [(i, j, jaccard), ...])``."""
+    entries, fields = [], []
+    for path in paths:
+        for pos, q in enumerate(iter_bank_questions(path)):
+            entries.append(Entry(path, pos, q))
+            fields.append(question_fields(q))
+    shingles = Shingles.from_texts(fields, k)
+    sig = minhash(shingles, perms)
+    bands, rows = choose_bands(perms, threshold)
+    pairs = candidate_pairs(sig, bands, rows)
+    # Drop candidates whose estimate is far below the threshold before the exact check.
+    pairs = pairs[estimate_similarity(sig, pairs) >= threshold - ESTIMATE_SLACK]
+    similar = []
+    for i, j in pairs.tolist():
+        si, sj = entries[i].state, entries[j].state
+        if not cross_state and si and sj and si != sj:
+            continue
+        score = shingles.jaccard(i, j)
+        if score >= threshold:
+            similar.append((i, j, score))
+    clusters = []
+    for members in clusters_from_pairs([(i, j) for i, j, _ in similar], len(entries)):
+        inside = set(members)
+        clusters.append((members, [p for p in similar if p[0] in inside]))
+    return entries, clusters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find near-duplicate questions with MinHash/LSH.')
+    parser.add_argument('banks', nargs='*', default=list(BANK_PATHS))
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='minimum Jaccard similarity of shingle sets (default: %(default)s)')
+    parser.add_argument('--shingle', type=int, default=DEFAULT_SHINGLE, help='characters per shingle')
+    parser.add_argument('--perms', type=int, default=DEFAULT_PERMS, help='MinHash signature length')
+    parser.add_argument('--cross-state', action='store_true',
+                        help='also report pairs from two different states')
+    parser.add_argument('--out', help='write the clusters as JSON here')
+    args = parser.parse_args(argv)
+    if not 0 < args.threshold <= 1:
+        print("Error: --threshold must be in (0, 1]", file=sys.stderr)
+        sys.exit(1)
+    if args.shingle < 1 or args.perms < 1:
+        print("Error: --shingle and --perms must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    entries, clusters = find_duplicates(args.banks, args.threshold, args.shingle,
+                                        args.perms, args.cross_state)
+    elapsed = time.perf_counter() - start
+
+    for n, (members, pairs) in enumerate(clusters, 1):
+        top = max(score for _, _, score in pairs)
+        print(f"Cluster {n} ({len(members)} questions, similarity up to {top:.2f}):")
+        for i in members:
+            e = entries[i]
+            where = f"{e.source} #{e.position + 1}"
+            extra = ''.join((f" [{e.state}]" if e.state else '', ' [media]' if e.has_media else ''))
+            print(f"  {where}{extra}: {e.prompt[:70]}")
+    print(f"{len(clusters)} clusters among {len(entries)} questions in {elapsed:.2f}s")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump([{'questions': [entries[i].to_dict() for i in members],
+                        'pairs': [[members.index(i), members.index(j), round(score, 3)]
+                                  for i, j, score in pairs]}
+                       for members, pairs in clusters], f, ensure_ascii=False, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""Draw Leben in Deutschland exams from a precompiled bank artifact.
+
+Mirrors ``AttemptsService.startLebenExam``: 30 questions sampled from the
+published common pool plus 3 from the chosen state's published
+``state_specific`` pool, common first, without replacement. Instead of two
+Mongo ``$sample`` aggregations per exam, the pools are compiled once into
+index arrays (``.cache/leben-exam-draw.npz``) and exams are drawn with a
+seeded NumPy generator.
+
+Question IDs are positions in the concatenation of the bank files, in the
+order they were compiled (the same order ``ColumnarBank.from_files`` uses),
+so ``ExamDraw.locate(qid)`` gives back ``(bank_path, index)``. Positions
+shift when questions are added or removed, so bulk lines carry the
+fingerprint of the slot order (``"bank"``, see ``mongo_sync.keys_fingerprint``)
+and ``answer_key`` only grades positions whose fingerprint still matches.
+
+Bulk draws run a partial Fisher-Yates shuffle over a whole batch of exams at
+once and format the JSONL lines with one vectorized gather, which is what
+makes pre-generating millions of exam sheets cheap.
+
+Usage:
+    python -m question_bank.exam_draw compile
+    python -m question_bank.exam_draw draw --state Bayern --seed 7
+    python -m question_bank.exam_draw bulk 1000000 --out exams.jsonl --seed 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from question_bank import REPO_ROOT
+from question_bank.columnar import BANK_PATHS, stat_banks
+from question_bank.jsonstream import iter_bank_questions
+from question_bank.mongo_sync import bank_keys, keys_fingerprint
+
+DEFAULT_ARTIFACT = os.path.join(REPO_ROOT, '.cache', 'leben-exam-draw.npz')
+COMMON_COUNT = 30
+STATE_COUNT = 3
+DEFAULT_BATCH = 8192
+
+# Defaults of startLebenExam when the exam document does not set them.
+DEFAULT_PROVIDER = 'leben_in_deutschland'
+DEFAULT_MAIN_SKILL = 'leben_test'
+
+
+class ExamDrawError(ValueError):
+    pass
+
+
+class ExamDraw:
+    """Compiled draw pools: common IDs and one ID array per state."""
+
+    def __init__(self, sources, bank, source, position, common, state_names, state_offsets,
+                 state_ids, provider=DEFAULT_PROVIDER, main_skill=DEFAULT_MAIN_SKILL,
+                 sizes=None, mtimes=None):
+        self.sources = [str(s) for s in sources]
+        self.bank = str(bank)
+        self.source = source
+        self.position = position
+        self.common = common
+        self.state_names = [str(s) for s in state_names]
+        self.state_offsets = state_offsets
+        self.state_ids = state_ids
+        self.provider = provider
+        self.main_skill = main_skill
+        self.sizes = sizes
+        self.mtimes = mtimes
+
+    @classmethod
+    def compile(cls, paths=BANK_PATHS, provider=DEFAULT_PROVIDER, main_skill=DEFAULT_MAIN_SKILL):
+        """Scan the bank files once and build the pools."""
+        sizes, mtimes = stat_banks(paths)
+        source, position, common = [], [], []
+        by_state = {}
+        qid = 0
+        for code, path in enumerate(paths):
+            for i, q in enumerate(iter_bank_questions(path)):
+                source.append(code)
+                position.append(i)
+                # Same $match as startLebenExam.
+                if (q.get('provider') == provider and q.get('mainSkill') == main_skill
+                        and q.get('status') == 'published'):
+                    if q.get('usageCategory') == 'common':
+                        common.append(qid)
+                    elif q.get('usageCategory') == 'state_specific' and q.get('state'):
+                        by_state.setdefault(q['state'], []).append(qid)
+                qid += 1
+        names = sorted(by_state)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(by_state[n]) for n in names])
+        state_ids = np.asarray([i for n in names for i in by_state[n]], dtype=np.int32)
+        return cls(paths, keys_fingerprint(bank_keys(paths)),
+                   np.asarray(source, dtype=np.uint8), np.asarray(position, dtype=np.int32),
+                   np.asarray(common, dtype=np.int32), names, offsets, state_ids,
+                   provider, main_skill, sizes, mtimes)
+
+    def save(self, path=DEFAULT_ARTIFACT):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, sources=np.asarray(self.sources), bank=np.asarray(self.bank), source=self.source,
+                     position=self.position, common=self.common,
+                     state_names=np.asarray(self.state_names), state_offsets=self.state_offsets,
+                     state_ids=self.state_ids, match=np.asarray([self.provider, self.main_skill]),
+                     sizes=self.sizes, mtimes=self.mtimes)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_ARTIFACT, paths=BANK_PATHS, provider=DEFAULT_PROVIDER,
+             main_skill=DEFAULT_MAIN_SKILL, rebuild=True):
+        """Load the artifact, recompiling it if the banks changed since it was built."""
+        try:
+            with np.load(path) as z:
+                fresh = ('bank' in z.files and list(z['sources']) == list(paths)
+                         and list(z['match']) == [provider, main_skill])
+                if fresh:
+                    sizes, mtimes = stat_banks(paths)
+                    fresh = (np.array_equal(z['sizes'], sizes)
+                             and np.array_equal(z['mtimes'], mtimes))
+                if fresh:
+                    return cls(z['sources'], z['bank'], z['source'], z['position'], z['common'],
+                               z['state_names'], z['state_offsets'], z['state_ids'],
+                               provider, main_skill, z['sizes'], z['mtimes'])
+        except FileNotFoundError:
+            pass
+        if not rebuild:
+            raise ExamDrawError(f"{path} is missing or out of date")
+        draw = cls.compile(paths, provider, main_skill)
+        draw.save(path)
+        return draw
+
+    def __len__(self):
+        return len(self.source)
+
+    def locate(self, qid):
+        """``(bank_path, index_in_bank)`` of a question ID."""
+        return self.sources[self.source[qid]], int(self.position[qid])
+
+    def state_pool(self, state):
+        try:
+            code = self.state_names.index(state)
+        except ValueError:
+            raise ExamDrawError(f"No published state questions for {state!r}") from None
+        return self.state_ids[self.state_offsets[code]:self.state_offsets[code + 1]]
+
+    # -- drawing -----------------------------------------------------------
+
+    def draw(self, state, seed=None):
+        """One exam: a list of 30 common then 3 state question IDs."""
+        rng = np.random.default_rng(seed)
+        common = _sample_rows(self.common, COMMON_COUNT, 1, rng)[0]
+        local = _sample_rows(self.state_pool(state), STATE_COUNT, 1, rng)[0]
+        ids = np.concatenate([common, local])
+        if not len(ids):
+            raise ExamDrawError("No questions available for this exam")
+        return ids.tolist()
+
+    def draw_batch(self, state_codes, rng):
+        """IDs for one exam per entry of ``state_codes``, shape (n, 33).
+
+        Rows are padded with -1 where a pool holds fewer questions than the
+        exam asks for (``$sample`` then just returns fewer documents).
+        """
+        n = len(state_codes)
+        ids = np.full((n, COMMON_COUNT + STATE_COUNT), -1, dtype=np.int32)
+        common = _sample_rows(self.common, COMMON_COUNT, n, rng)
+        ids[:, :common.shape[1]] = common
+        for code in np.unique(state_codes):
+            rows = np.flatnonzero(state_codes == code)
+            pool = self.state_ids[self.state_offsets[code]:self.state_offsets[code + 1]]
+            local = _sample_rows(pool, STATE_COUNT, len(rows), rng)
+            ids[rows, COMMON_COUNT:COMMON_COUNT + local.shape[1]] = local
+        return ids
+
+    def iter_batches(self, count, states=None, seed=None, batch=DEFAULT_BATCH):
+        """Yield ``(state_codes, ids)`` batches for ``count`` exams.
+
+        ``states`` is cycled through in order; by default every exam picks
+        a state uniformly at random. Same seed and batch size, same exams.
+        """
+        rng = np.random.default_rng(seed)
+        if states:
+            cycle = np.asarray([self.state_names.index(s) if s in self.state_names else -1
+                                for s in states], dtype=np.int32)
+            if (cycle < 0).any():
+                missing = [s for s in states if s not in self.state_names]
+                raise ExamDrawError(f"No published state questions for {missing[0]!r}")
+        done = 0
+        while done < count:
+            n = min(batch, count - done)
+            if states:
+                codes = cycle[(done + np.arange(n)) % len(cycle)]
+            else:
+                codes = rng.integers(0, len(self.state_names), n, dtype=np.int32)
+            yield codes, self.draw_batch(codes, rng)
+            done += n
+
+    def write_jsonl(self, out, count, states=None, seed=None, batch=DEFAULT_BATCH):
+        """Write ``count`` exams as ``{"state": ..., "bank": ..., "questions": [...]}`` lines.
+
+        ``out`` is a binary file object. Each line equals
+        ``json.dumps(record, ensure_ascii=False)``.
+        """
+        formatter = _LineFormatter(len(self), self.state_names, self.bank)
+        for codes, ids in self.iter_batches(count, states, seed, batch):
+            out.write(formatter.format(codes, ids))
+
+
+def _sample_rows(pool, k, n, rng):
+    """``n`` independent samples of ``min(k, len(pool))`` items without replacement.
+
+    A partial Fisher-Yates shuffle run on all rows at once over a flat
+    (n * len(pool)) array; only the first k swap steps are needed.
+    """
+    size = len(pool)
+    k = min(k, size)
+    if k == 0:
+        return np.empty((n, 0), dtype=np.int32)
+    perm = np.tile(np.arange(size, dtype=np.int32), n)
+    base = np.arange(n, dtype=np.intp) * size
+    for step in range(k):
+        i = base + step
+        j = i + (rng.random(n) * (size - step)).astype(np.intp)
+        held = perm[i]
+        perm[i] = perm[j]
+        perm[j] = held
+    return pool[perm.reshape(n, size)[:, :k]]
+
+
+class _LineFormatter:
+    """Turns ID matrices into JSONL bytes without a Python loop per exam.
+
+    Every line is a sequence of byte tokens: the state prefix, ``"id, "`` for
+    each question but the last and ``"id]}\\n"`` for the last one. All tokens
+    live in one buffer; a batch is a single fancy-index gather from it.
+    """
+
+    def __init__(self, n_ids, state_names, bank):
+        tokens = [b'']
+        tokens += [f'{i}, '.encode() for i in range(n_ids)]
+        tokens += [f'{i}]}}\n'.encode() for i in range(n_ids)]
+        self.last = 1 + n_ids
+        self.prefix = len(tokens)
+        tokens += [('{"state": ' + json.dumps(name, ensure_ascii=False) + ', "bank": ' + json.dumps(bank)
+                    + ', "questions": [').encode('utf-8') for name in state_names]
+        self.empty_tail = len(tokens)
+        tokens.append(b']}\n')
+        lengths = np.asarray([len(t) for t in tokens], dtype=np.int64)
+        self.lengths = lengths
+        self.starts = np.cumsum(lengths) - lengths
+        self.blob = np.frombuffer(b''.join(tokens), dtype=np.uint8)
+
+    def format(self, codes, ids):
+        n, width = ids.shape
+        seq = np.zeros((n, width + 2), dtype=np.int64)
+        seq[:, 0] = self.prefix + codes
+        valid = ids >= 0
+        seq[:, 1:-1] = np.where(valid, 1 + ids, 0)
+        # Column of each row's last real ID; rows without any get "]}\n".
+        has_any = valid.any(axis=1)
+        last_col = width - 1 - np.argmax(valid[:, ::-1], axis=1)
+        rows = np.flatnonzero(has_any)
+        seq[rows, 1 + last_col[rows]] = self.last + ids[rows, last_col[rows]]
+        seq[~has_any, -1] = self.empty_tail
+
+        seq = seq.ravel()
+        lengths = self.lengths[seq]
+        out_starts = np.cumsum(lengths) - lengths
+        total = int(out_starts[-1] + lengths[-1]) if len(seq) else 0
+        index = np.arange(total, dtype=np.int64)
+        index += np.repeat(self.starts[seq] - out_starts, lengths)
+        return self.blob[index].tobytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Draw Leben in Deutschland exams from the compiled bank.')
+    parser.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    parser.add_argument('--bank', action='append', help='bank file (repeatable, default: both Leben banks)')
+    parser.add_argument('--provider', default=DEFAULT_PROVIDER)
+    parser.add_argument('--main-skill', default=DEFAULT_MAIN_SKILL)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('compile', help='(re)build the artifact and print the pool sizes')
+    p = sub.add_parser('draw', help='draw one exam and print its questions')
+    p.add_argument('--state', required=True)
+    p.add_argument('--seed', type=int)
+    p = sub.add_parser('bulk', help='write many exams as JSONL')
+    p.add_argument('count', type=int)
+    p.add_argument('--out', help='output file (default: stdout)')
+    p.add_argument('--state', action='append', help='cycle through these states (default: random)')
+    p.add_argument('--seed', type=int)
+    p.add_argument('--batch', type=int, default=DEFAULT_BATCH)
+    args = parser.parse_args(argv)
+
+    paths = tuple(args.bank or BANK_PATHS)
+    try:
+        if args.command == 'compile':
+            draw = ExamDraw.compile(paths, args.provider, args.main_skill)
+            draw.save(args.artifact)
+            print(f"{len(draw)} questions, {len(draw.common)} common")
+            for name in draw.state_names:
+                print(f"  {name}: {len(draw.state_pool(name))}")
+            print(f"Wrote {args.artifact}")
+            return
+
+        draw = ExamDraw.load(args.artifact, paths, args.provider, args.main_skill)
+        if args.command == 'draw':
+            ids = draw.draw(args.state, args.seed)
+            banks = {}
+            for n, qid in enumerate(ids, 1):
+                path, index = draw.locate(qid)
+                if path not in banks:
+                    banks[path] = list(iter_bank_questions(path))
+                print(f"{n:2}. [{qid}] {banks[path][index]['prompt']}")
+            return
+
+        start = time.perf_counter()
+        if args.out:
+            with open(args.out, 'wb') as f:
+                draw.write_jsonl(f, args.count, args.state, args.seed, args.batch)
+        else:
+            draw.write_jsonl(sys.stdout.buffer, args.count, args.state, args.seed, args.batch)
+        elapsed = time.perf_counter() - start
+        print(f"{args.count} exams in {elapsed:.2f}s", file=sys.stderr)
+    except ExamDrawError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Parse several question sources in parallel and merge them into the bank.
+
+The layout of each source is detected by ``question_bank.sniff``. "Aufgabe
+N:" sources are cut into byte chunks that start on a block header; any
+other layout is one chunk. The chunks are parsed in a
+``ProcessPoolExecutor``.
+
+Only "Aufgabe N:" numbers name bank slots: their questions are merged in
+number order, question N goes to bank slot N, and contiguous runs of
+numbers become the splice operations of ``question_bank.splice``. The
+numbers of other layouts (Postman payloads, TSV rows, ``1.`` lists) only
+count questions within one dump, so those questions are appended after the
+numbered ones in source order and need ``--out``; they are never spliced
+into the bank.
+
+A source may be limited to a number range with ``FILE:FIRST-LAST``; for
+layouts other than "Aufgabe N:" the range counts questions in that dump.
+
+Usage:
+    python -m question_bank.ingest q1_100.txt q101_200.txt q201_300.txt:226-300
+    python -m question_bank.ingest --out merged.json --workers 8 provider_*.txt
+"""
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from question_bank import aufgabe, sniff
+from question_bank.bank_index import BANK_PATH
+from question_bank.jsonstream import write_bank
+from question_bank.splice import SpliceOp, format_report, splice_bank
+
+DEFAULT_CHUNK_BYTES = 4 << 20
+
+# Layouts whose question numbers are bank slots.
+SLOT_FORMATS = ('aufgabe',)
+
+_HEADER_BYTES_RE = re.compile(rb'Aufgabe (\d+):')
+_SCAN_BYTES = 1 << 16
+
+Source = namedtuple('Source', 'path first last')
+Chunk = namedtuple('Chunk', 'path start end first last fmt')
+
+
+class IngestConflictError(ValueError):
+    pass
+
+
+def parse_source_spec(spec):
+    """``"file.txt"`` or ``"file.txt:226-300"`` -> Source."""
+    path, sep, rng = spec.rpartition(':')
+    if sep and re.fullmatch(r'\d+-\d+', rng) and not os.path.exists(spec):
+        first, last = (int(x) for x in rng.split('-'))
+        return Source(path, first, last)
+    return Source(spec, None, None)
+
+
+def _next_header(f, offset):
+    """Byte offset of the first block header at or after ``offset``."""
+    f.seek(offset)
+    carry = b''
+    base = offset
+    while True:
+        data = f.read(_SCAN_BYTES)
+        if not data:
+            return None
+        buf = carry + data
+        match = _HEADER_BYTES_RE.search(buf)
+        if match:
+            return base - len(carry) + match.start()
+        carry = buf[-32:]
+        base += len(data)
+
+
+def split_source(source, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Cut a source file into chunks that each start on a block header."""
+    size = os.path.getsize(source.path)
+    with open(source.path, 'r', encoding='utf-8', newline='') as f:
+        fmt = sniff.sniff(f.read(sniff.SNIFF_CHARS))
+    if fmt != 'aufgabe':
+        return [Chunk(source.path, 0, size, source.first, source.last, fmt)]
+    cuts = [0]
+    with open(source.path, 'rb') as f:
+        target = chunk_bytes
+        while target < size:
+            cut = _next_header(f, target)
+            if cut is None:
+                break
+            if cut > cuts[-1]:
+                cuts.append(cut)
+            target = cut + chunk_bytes
+    cuts.append(size)
+    return [Chunk(source.path, a, b, source.first, source.last, fmt)
+            for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def _parse_chunk(chunk):
+    """Worker: parse one chunk, return ``(numbered_questions, warnings)``."""
+    warnings = []
+    questions = []
+    if chunk.fmt == 'aufgabe':
+        with open(chunk.path, 'rb') as f:
+            f.seek(chunk.start)
+            text = f.read(chunk.end - chunk.start).decode('utf-8')
+        parsed = aufgabe.iter_questions(text, warn=warnings.append)
+    else:
+        parsed = sniff.iter_source(chunk.path, warn=warnings.append, fmt=chunk.fmt)
+    for number, question in parsed:
+        if chunk.first is None or chunk.first <= number <= chunk.last:
+            questions.append((number, question))
+    return questions, warnings
+
+
+def ingest(specs, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES, warn=print):
+    """Parse every source and return ``(numbered, appended)``.
+
+    ``numbered`` is ``[(number, question)]`` from the ``SLOT_FORMATS``
+    sources, sorted by number; ``appended`` holds the questions of all other
+    sources in source order. Raises IngestConflictError if two blocks claim
+    the same slot.
+    """
+    sources = [parse_source_spec(s) if isinstance(s, str) else s for s in specs]
+    chunks = [c for source in sources for c in split_source(source, chunk_bytes)]
+    numbered, appended = [], []
+    pool = None
+    if workers != 1 and len(chunks) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for chunk, (questions, warnings) in zip(chunks, (pool.map if pool else map)(_parse_chunk, chunks)):
+            for message in warnings:
+                warn(message)
+            if chunk.fmt in SLOT_FORMATS:
+                numbered.extend(questions)
+            else:
+                appended.extend(q for _, q in questions)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Chunks come back in source order; merge them by question number.
+    numbered.sort(key=lambda item: item[0])
+    for (a, _), (b, _) in zip(numbered, numbered[1:]):
+        if a == b:
+            raise IngestConflictError(f"Aufgabe {a} appears in more than one source")
+    return numbered, appended
+
+
+def to_splice_ops(numbered):
+    """Group consecutive question numbers into SpliceOps on the bank."""
+    ops = []
+    run = []
+    for number, question in numbered:
+        if run and number != run_start + len(run):
+            ops.append(SpliceOp(run_start - 1, run_start - 1 + len(run), run))
+            run = []
+        if not run:
+            run_start = number
+        run.append(question)
+    if run:
+        ops.append(SpliceOp(run_start - 1, run_start - 1 + len(run), run))
+    return ops
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parse question sources in parallel and merge them into the bank.')
+    parser.add_argument('sources', nargs='+', metavar='FILE[:FIRST-LAST]')
+    parser.add_argument('--bank', default=BANK_PATH)
+    parser.add_argument('--out', help='write the merged questions here instead of splicing the bank')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES)
+    parser.add_argument('--dry-run', action='store_true', help='report the bank diff without writing')
+    args = parser.parse_args(argv)
+
+    def warn(msg):
+        print(msg, file=sys.stderr)
+
+    try:
+        numbered, appended = ingest(args.sources, args.workers, args.chunk_bytes, warn)
+    except (IngestConflictError, sniff.SniffError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Parsed {len(numbered) + len(appended)} questions from {len(args.sources)} sources")
+
+    if args.out:
+        write_bank(args.out, [q for _, q in numbered] + appended)
+        print(f"Wrote {args.out}")
+        return
+    if appended:
+        print(f"Error: {len(appended)} questions come from sources that are not \"Aufgabe N:\" dumps; "
+              f"their numbers are not bank slots, so write them with --out", file=sys.stderr)
+        sys.exit(1)
+
+    diffs, before, after = splice_bank(to_splice_ops(numbered), args.bank, dry_run=args.dry_run)
+    print(format_report(diffs, before, after))
+    if args.dry_run:
+        print("Dry run, nothing written.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""Compiled templates for INTERACTIVE_TEXT questions with blanks.
+
+The ``text`` of such a question holds ``{{a}}`` placeholders, one per entry
+of ``interactiveBlanks`` (see ``questions/example-interactive-text-*.json``).
+``compile_question`` scans the text once into a tuple of literal segments
+and ``Blank`` entries, and cross-checks it against the blanks:
+
+* every placeholder has a blank and every blank has exactly one placeholder,
+* blank ids are unique and every blank has a correct answer,
+* a dropdown's correct answers are among its choices.
+
+All problems are collected into one ``TemplateError``. The compiled
+``Template`` renders the text and grades answers without looking at the
+template string again. Grading follows ``gradeInteractiveBlanks`` in
+``attempts.service.ts``: an answer is right when it equals a correct answer
+after ``normalizeAnswer``, and the score is the fraction of right blanks.
+Correct answers are normalized once, at compile time.
+
+``load`` keeps the compiled templates of a question file until the file
+changes (size or mtime), so a server can call it on every request.
+
+Usage:
+    python -m question_bank.interactive [FILE ...]          (check)
+    python -m question_bank.interactive FILE --render
+    python -m question_bank.interactive FILE --answers '{"a": "ist", "b": "bin"}'
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sys
+from collections import namedtuple
+
+from question_bank import REPO_ROOT
+
+CHOICE_TYPES = ('dropdown', 'select')
+
+_PLACEHOLDER_RE = re.compile(r'\{\{([^{}]*)\}\}')
+# The same steps as normalizeAnswer in src/common/utils/normalize.util.ts.
+_CONTROL_RE = re.compile(r'[\n\r\t]')
+_AR_DIACRITICS_RE = re.compile('[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]')
+_SPACES_RE = re.compile(r'\s+')
+
+# ``answers`` are the normalized correct answers.
+Blank = namedtuple('Blank', 'id type choices answers hint')
+Grade = namedtuple('Grade', 'correct total wrong')
+
+# path -> ((mtime_ns, size), [(position, template, problems)])
+_loaded = {}
+
+
+class TemplateError(ValueError):
+    def __init__(self, problems):
+        super().__init__('; '.join(problems))
+        self.problems = problems
+
+
+def normalize_for_grading(text):
+    """``normalizeAnswer`` with its default options."""
+    text = _CONTROL_RE.sub('', str(text)).strip()
+    text = _AR_DIACRITICS_RE.sub('', text)
+    return _SPACES_RE.sub(' ', text).lower()
+
+
+def _check_blank(blank, problems):
+    """A ``Blank`` for one ``interactiveBlanks`` entry, adding its problems."""
+    blank_id = blank.get('id')
+    correct = blank.get('correctAnswers')
+    if not isinstance(correct, list) or not correct:
+        problems.append(f"blank {blank_id!r} has no correctAnswers")
+        correct = []
+    answers = frozenset(normalize_for_grading(a) for a in correct if isinstance(a, str))
+    choices = ()
+    if blank.get('type') in CHOICE_TYPES:
+        choices = blank.get('choices') or blank.get('options')
+        if not isinstance(choices, list) or not choices:
+            problems.append(f"blank {blank_id!r} of type {blank.get('type')} has no choices")
+            choices = []
+        choices = tuple(choices)
+        offered = {normalize_for_grading(c) for c in choices}
+        for answer in correct:
+            if isinstance(answer, str) and choices and normalize_for_grading(answer) not in offered:
+                problems.append(f"blank {blank_id!r}: correct answer {answer!r} is not among its choices")
+    return Blank(blank_id, blank.get('type'), choices, answers, blank.get('hint'))
+
+
+def compile_template(text, blanks):
+    """The ``Template`` for ``text`` and its ``interactiveBlanks``; raises TemplateError."""
+    problems = []
+    if not isinstance(text, str):
+        raise TemplateError(['text must be a string with {{id}} placeholders'])
+    if not isinstance(blanks, list) or not blanks:
+        raise TemplateError(['interactiveBlanks must be a non-empty array'])
+    by_id = {}
+    for blank in blanks:
+        if not isinstance(blank, dict) or not isinstance(blank.get('id'), str):
+            problems.append(f"blank without a string id: {blank!r}")
+            continue
+        if blank['id'] in by_id:
+            problems.append(f"duplicate blank id {blank['id']!r}")
+            continue
+        by_id[blank['id']] = _check_blank(blank, problems)
+
+    segments, used = [], set()
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(text):
+        if match.start() > pos:
+            segments.append(text[pos:match.start()])
+        pos = match.end()
+        blank_id = match.group(1)
+        blank = by_id.get(blank_id)
+        if blank is None:
+            problems.append(f"placeholder {match.group()} has no blank")
+        elif blank_id in used:
+            problems.append(f"placeholder {match.group()} appears more than once")
+        else:
+            used.add(blank_id)
+            segments.append(blank)
+    if pos < len(text):
+        segments.append(text[pos:])
+    for blank_id in by_id:
+        if blank_id not in used:
+            problems.append(f"blank {blank_id!r} has no {{{{{blank_id}}}}} placeholder")
+    if problems:
+        raise TemplateError(problems)
+    return Template(tuple(segments))
+
+
+def compile_question(q):
+    """The ``Template`` of an INTERACTIVE_TEXT question with blanks."""
+    return compile_template(q.get('text'), q.get('interactiveBlanks'))
+
+
+def _blank_placeholder(blank):
+    if blank.choices:
+        return f"[{blank.id}: {' / '.join(map(str, blank.choices))}]"
+    return f"[{blank.id}: ____]"
+
+
+class Template:
+    """Literal segments (str) and ``Blank`` entries in text order."""
+
+    __slots__ = ('segments', 'blanks')
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.blanks = tuple(s for s in segments if isinstance(s, Blank))
+
+    def render(self, answers=None, placeholder=_blank_placeholder):
+        """The text with each blank filled from ``answers`` or drawn by ``placeholder``."""
+        answers = answers or {}
+        out = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                out.append(segment)
+            else:
+                answer = answers.get(segment.id)
+                out.append(answer if isinstance(answer, str) else placeholder(segment))
+        return ''.join(out)
+
+    def grade(self, answers):
+        """``Grade`` of ``{blank id: answer}``; unanswered blanks are wrong."""
+        wrong = []
+        for blank in self.blanks:
+            answer = answers.get(blank.id) if isinstance(answers, dict) else None
+            if not answer or not isinstance(answer, str) or normalize_for_grading(answer) not in blank.answers:
+                wrong.append(blank.id)
+        total = len(self.blanks)
+        return Grade(total - len(wrong), total, tuple(wrong))
+
+    def score(self, answers, points):
+        """Points for ``answers``, rounded half up to 3 decimals like the attempts service.
+
+        ``Math.round(x * 1000) / 1000`` rounds half up; Python's ``round``
+        would round half to even.
+        """
+        grade = self.grade(answers)
+        return math.floor(points * grade.correct / grade.total * 1000 + 0.5) / 1000
+
+
+def _compile_all(data):
+    if isinstance(data, dict) and isinstance(data.get('questions'), list):
+        questions = enumerate(data['questions'])
+    else:
+        questions = [(None, data)]
+    results = []
+    for position, q in questions:
+        if not isinstance(q, dict) or q.get('qType') != 'interactive_text' or not q.get('interactiveBlanks'):
+            continue
+        try:
+            results.append((position, compile_question(q), []))
+        except TemplateError as e:
+            results.append((position, None, e.problems))
+    return results
+
+
+def load(path):
+    """``[(position, template, problems)]`` for the blank questions of a file, cached.
+
+    ``position`` is the index in a ``{"questions": [...]}`` bank, None for a
+    single-question file; ``template`` is None when there are problems.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        results = _compile_all(json.load(f))
+    _loaded[path] = (stamp, results)
+    return results
+
+
+def default_paths():
+    return sorted(glob.glob(os.path.join(REPO_ROOT, 'questions', 'example-interactive-text-*.json')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile and check INTERACTIVE_TEXT blank templates.')
+    parser.add_argument('files', nargs='*', help='question or bank files (default: the interactive text examples)')
+    parser.add_argument('--render', action='store_true', help='print each text with its blanks drawn')
+    parser.add_argument('--answers', help='JSON object {blank id: answer} to grade')
+    args = parser.parse_args(argv)
+
+    try:
+        answers = json.loads(args.answers) if args.answers else None
+        results = [(path, load(path)) for path in args.files or default_paths()]
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    failed = 0
+    for path, compiled in results:
+        if not compiled:
+            print(f"{os.path.relpath(path)}: no blank questions")
+        for position, template, problems in compiled:
+            where = os.path.relpath(path) + ('' if position is None else f" questions[{position}]")
+            if problems:
+                failed += 1
+                print(f"{where}: {len(problems)} problems")
+                for problem in problems:
+                    print(f"  {problem}")
+                continue
+            print(f"{where}: {len(template.blanks)} blanks, ok")
+            if args.render:
+                print(template.render())
+            if answers is not None:
+                grade = template.grade(answers)
+                print(f"  {grade.correct}/{grade.total} correct"
+                      + (f", wrong: {', '.join(grade.wrong)}" if grade.wrong else ''))
+    if failed:
+        print(f"Error: {failed} templates with problems", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
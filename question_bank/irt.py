@@ -0,0 +1,264 @@
+"""IRT calibration of question difficulty from attempt responses.
+
+Fits a 1PL or 2PL logistic model, P(correct) = sigmoid(a * (theta - b)),
+by marginal maximum likelihood (Bock-Aitkin EM). Abilities follow N(0, 1)
+and are integrated over a fixed Gauss-Hermite grid.
+
+Each attempt in an attempts JSONL (the ``question_bank.answer_key`` format)
+is one examinee. Unanswered items count as wrong, as in grading. The
+responses form a sparse examinee x item matrix. It is stored as flat
+index arrays in two orders:
+
+* by examinee (CSR-like), for the E-step: each response gathers the
+  log-likelihood row of its item and outcome, and ``np.add.reduceat``
+  sums them per examinee;
+* by (item, outcome) (CSC-like), for the M-step: each response gathers
+  its examinee's posterior over the grid, and ``reduceat`` sums them into
+  the expected counts per item.
+
+The M-step is a few vectorized Newton steps for all items at once, with
+weak normal priors on the intercept and on ``a - 1`` to keep items nobody
+gets wrong finite.
+
+``--write`` stores ``irtDifficulty`` (b), ``irtDiscrimination`` (a) and
+``difficulty`` (the QuestionDifficulty enum: easy/medium/hard, cut at
+``b = -0.5 / 0.5`` by default) on every question with enough responses.
+This is what section quotas such as ``difficultyDistribution`` in
+example-exam-with-quota.json select on.
+
+Usage:
+    python -m question_bank.irt attempts.jsonl [--model 1pl] [--write]
+    python -m question_bank.irt attempts.jsonl --questions questions.jsonl
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from question_bank.answer_key import GradeError, iter_answer_blocks, load_key
+from question_bank.columnar import BANK_PATHS
+from question_bank.jsonstream import iter_bank_questions, write_bank
+
+QUADRATURE_POINTS = 21
+DEFAULT_MAX_ITER = 100
+DEFAULT_TOL = 1e-5
+DEFAULT_MIN_RESPONSES = 30
+DIFFICULTY_CUTS = (-0.5, 0.5)
+# Prior standard deviations (intercept and discrimination).
+_PRIOR_C = 4.0
+_PRIOR_A = 1.0
+_A_RANGE = (0.05, 4.0)
+# Responses per gather; small enough for the (chunk x grid) scratch to stay in cache.
+_CHUNK = 1 << 14
+
+
+class Responses:
+    """Sparse examinee x item 0/1 matrix as flat arrays, examinee-major."""
+
+    def __init__(self, person, item, y, n_persons, n_items):
+        self.person = person
+        self.item = item
+        self.y = y
+        self.n_persons = n_persons
+        self.n_items = n_items
+        # Item-major order for the M-step: group = 2 * item + y.
+        self.group = 2 * item.astype(np.int64) + y
+        self.by_group = np.argsort(self.group, kind='stable')
+        self.group_sorted = self.group[self.by_group]
+        self.person_by_group = person[self.by_group]
+
+    def __len__(self):
+        return len(self.y)
+
+    @classmethod
+    def from_attempts(cls, lines, key):
+        persons, items, ys = [], [], []
+        offset = 0
+        for names, owner, qids, chosen in iter_answer_blocks(lines, key):
+            persons.append((owner + offset).astype(np.int32))
+            items.append(qids.astype(np.int32))
+            ys.append(key.hits(qids, chosen).astype(np.int8))
+            offset += len(names)
+        if not persons:
+            raise GradeError("No attempts to calibrate on")
+        return cls(np.concatenate(persons), np.concatenate(items), np.concatenate(ys),
+                   offset, len(key))
+
+    def counts(self):
+        """Responses and correct responses per item."""
+        n = np.bincount(self.item, minlength=self.n_items)
+        r = np.bincount(self.item, weights=self.y, minlength=self.n_items)
+        return n, r
+
+
+def _segments(keys):
+    """Start offsets of runs of equal values in a sorted (or grouped) array."""
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def _sum_by(keys, rows_of, out, start, stop):
+    """``out[k] += sum of rows_of(i) over i in [start, stop) with keys[i] == k``.
+
+    ``keys`` must be grouped, so each chunk has unique keys per segment.
+    """
+    for lo in range(start, stop, _CHUNK):
+        hi = min(lo + _CHUNK, stop)
+        seg = _segments(keys[lo:hi])
+        out[keys[lo:hi][seg]] += np.add.reduceat(rows_of(lo, hi), seg, axis=0)
+
+
+class IrtModel:
+    def __init__(self, n_items, model='2pl', points=QUADRATURE_POINTS):
+        if model not in ('1pl', '2pl'):
+            raise ValueError(f"Unknown model {model!r}")
+        self.model = model
+        nodes, weights = np.polynomial.hermite_e.hermegauss(points)
+        self.theta = nodes
+        self.log_w = np.log(weights / weights.sum())
+        self.a = np.ones(n_items)
+        self.c = np.zeros(n_items)  # intercept: logit = a * theta + c
+        self.loglik = None
+        self.iterations = 0
+
+    @property
+    def b(self):
+        return -self.c / self.a
+
+    def _log_tables(self):
+        """(2 * items, grid) table: row 2j is log(1 - P_j), row 2j + 1 is log P_j."""
+        z = self.a[:, None] * self.theta[None, :] + self.c[:, None]
+        table = np.empty((2 * len(self.a), len(self.theta)))
+        table[0::2] = -np.logaddexp(0, z)
+        table[1::2] = -np.logaddexp(0, -z)
+        return table
+
+    def e_step(self, data):
+        """Posterior over the grid per examinee, and the marginal log-likelihood."""
+        table = self._log_tables()
+        post = np.zeros((data.n_persons, len(self.theta)))
+        _sum_by(data.person, lambda lo, hi: table[data.group[lo:hi]], post, 0, len(data))
+        post += self.log_w
+        top = post.max(axis=1, keepdims=True)
+        np.exp(post - top, out=post)
+        total = post.sum(axis=1, keepdims=True)
+        post /= total
+        loglik = float((np.log(total) + top).sum())
+        return post, loglik
+
+    def m_step(self, data, post, newton_steps=3):
+        sums = np.zeros((2 * data.n_items, len(self.theta)))
+        # Single precision halves the memory traffic of the gather; sums stay double.
+        post = post.astype(np.float32)
+        _sum_by(data.group_sorted, lambda lo, hi: post[data.person_by_group[lo:hi]],
+                sums, 0, len(data))
+        r = sums[1::2]
+        n = sums[0::2] + r
+        theta = self.theta
+        for _ in range(newton_steps):
+            z = self.a[:, None] * theta + self.c[:, None]
+            p = 1 / (1 + np.exp(-z))
+            e = r - n * p
+            v = n * p * (1 - p)
+            g_c = e.sum(axis=1) - self.c / _PRIOR_C ** 2
+            h_cc = v.sum(axis=1) + 1 / _PRIOR_C ** 2
+            if self.model == '1pl':
+                self.c += g_c / h_cc
+                continue
+            g_a = (e * theta).sum(axis=1) - (self.a - 1) / _PRIOR_A ** 2
+            h_aa = (v * theta ** 2).sum(axis=1) + 1 / _PRIOR_A ** 2
+            h_ac = (v * theta).sum(axis=1)
+            det = h_aa * h_cc - h_ac ** 2
+            self.a = np.clip(self.a + (h_cc * g_a - h_ac * g_c) / det, *_A_RANGE)
+            self.c += (h_aa * g_c - h_ac * g_a) / det
+
+    def fit(self, data, max_iter=DEFAULT_MAX_ITER, tol=DEFAULT_TOL, log=None):
+        """EM until the relative log-likelihood change drops below ``tol``."""
+        previous = None
+        for it in range(1, max_iter + 1):
+            post, loglik = self.e_step(data)
+            self.m_step(data, post)
+            self.loglik, self.iterations = loglik, it
+            if log is not None:
+                log(f"iteration {it}: log-likelihood {loglik:.2f}")
+            if previous is not None and abs(loglik - previous) <= tol * abs(previous):
+                break
+            previous = loglik
+        return self
+
+
+def difficulty_label(b, cuts=DIFFICULTY_CUTS):
+    """QuestionDifficulty value for a calibrated b."""
+    return 'easy' if b < cuts[0] else 'hard' if b > cuts[1] else 'medium'
+
+
+def write_calibration(paths, fit, answered, min_responses=DEFAULT_MIN_RESPONSES,
+                      cuts=DIFFICULTY_CUTS):
+    """Store the fit on every question with at least ``min_responses`` answers.
+
+    Question IDs run over ``paths`` in order. Returns the number updated.
+    """
+    updated = 0
+    qid = 0
+    for path in paths:
+        questions = list(iter_bank_questions(path))
+        for q in questions:
+            if answered[qid] >= min_responses:
+                b = float(fit.b[qid])
+                q['difficulty'] = difficulty_label(b, cuts)
+                q['irtDifficulty'] = round(b, 3)
+                q['irtDiscrimination'] = round(float(fit.a[qid]), 3)
+                updated += 1
+            qid += 1
+        write_bank(path, questions)
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calibrate question difficulty with a 1PL/2PL IRT model.')
+    parser.add_argument('attempts', help='attempts JSONL (see question_bank.answer_key)')
+    parser.add_argument('--bank', action='append', help='bank file (repeatable, default: both Leben banks)')
+    parser.add_argument('--questions', metavar='EXPORT',
+                        help='questions export (JSON or JSONL) to map question _ids to the bank')
+    parser.add_argument('--model', choices=('1pl', '2pl'), default='2pl')
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER)
+    parser.add_argument('--tol', type=float, default=DEFAULT_TOL)
+    parser.add_argument('--min-responses', type=int, default=DEFAULT_MIN_RESPONSES,
+                        help='leave questions with fewer answers uncalibrated')
+    parser.add_argument('--cuts', type=float, nargs=2, default=DIFFICULTY_CUTS, metavar=('EASY', 'HARD'),
+                        help='b below EASY is easy, above HARD is hard (default: %(default)s)')
+    parser.add_argument('--write', action='store_true', help='write the calibration into the bank files')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    paths = tuple(args.bank or BANK_PATHS)
+    try:
+        key = load_key(paths, questions=args.questions)
+        start = time.perf_counter()
+        with open(args.attempts, 'r', encoding='utf-8') as f:
+            data = Responses.from_attempts(f, key)
+    except GradeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    loaded = time.perf_counter()
+    print(f"{len(data)} responses from {data.n_persons} attempts in {loaded - start:.1f}s")
+
+    log = (lambda msg: print(msg, file=sys.stderr)) if args.verbose else None
+    fit = IrtModel(data.n_items, args.model).fit(data, args.max_iter, args.tol, log)
+    print(f"{args.model.upper()} fit: {fit.iterations} EM iterations in "
+          f"{time.perf_counter() - loaded:.1f}s, log-likelihood {fit.loglik:.2f}")
+
+    answered, _ = data.counts()
+    calibrated = answered >= args.min_responses
+    labels = [difficulty_label(b, args.cuts) for b in fit.b[calibrated]]
+    for name in ('easy', 'medium', 'hard'):
+        print(f"  {name}: {labels.count(name)}")
+    print(f"  uncalibrated (< {args.min_responses} answers): {int((~calibrated).sum())}")
+
+    if args.write:
+        updated = write_calibration(paths, fit, answered, args.min_responses, args.cuts)
+        print(f"Wrote difficulty to {updated} questions")
+
+
+if __name__ == '__main__':
+    main()
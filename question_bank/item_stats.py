@@ -0,0 +1,180 @@
+"""Per-question item statistics from one pass over an attempts export.
+
+Replaces the on-request Mongo aggregations behind
+``AnalyticsService.getMostIncorrectQuestions``,
+``getQuestionsNeedingImprovement`` and ``getQuestionAnalytics``. The
+attempts JSONL (same format as ``question_bank.answer_key``) is streamed
+once. Each block adds to three ``numpy.bincount`` counters per bank slot:
+answers, correct answers, and picks per option (A-D plus one column for
+unanswered or out-of-range choices).
+
+The result is a compact JSON artifact for the admin dashboard. It holds the
+per-question columns plus the two ready-made lists in the shape the
+analytics endpoints return (``wrongAnswers`` counts unanswered items as
+wrong, like ``autoScore < points`` does). ``questionId`` is the Mongo
+``_id`` when a questions export is given with ``--questions``, the
+``syncKey`` otherwise; slots themselves move when the bank changes.
+
+Usage:
+    python -m question_bank.item_stats attempts.jsonl [--out stats.json]
+    python -m question_bank.item_stats attempts.jsonl --questions questions.jsonl
+    python -m question_bank.item_stats attempts.jsonl --question <syncKey or _id>
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from question_bank import REPO_ROOT
+from question_bank.answer_key import GradeError, iter_answer_blocks, load_key
+from question_bank.columnar import BANK_PATHS, ColumnarBank
+
+DEFAULT_OUT = os.path.join(REPO_ROOT, '.cache', 'leben-item-stats.json')
+N_OPTIONS = 4
+# Same cut-offs as the analytics endpoints.
+MOST_INCORRECT_LIMIT = 10
+IMPROVEMENT_THRESHOLD = 40
+
+
+class ItemStats:
+    def __init__(self, key):
+        self.key = key
+        self.n_questions = n_questions = len(key)
+        self.attempts = 0
+        self.answered = np.zeros(n_questions, dtype=np.int64)
+        self.correct = np.zeros(n_questions, dtype=np.int64)
+        self.options = np.zeros((n_questions, N_OPTIONS + 1), dtype=np.int64)
+
+    def add(self, qids, chosen, hits, n_attempts):
+        """Fold one block of flat answer arrays into the counters."""
+        n = self.n_questions
+        self.attempts += n_attempts
+        self.answered += np.bincount(qids, minlength=n)
+        self.correct += np.bincount(qids[hits], minlength=n)
+        slot = np.where((chosen >= 0) & (chosen < N_OPTIONS), chosen, N_OPTIONS)
+        self.options += np.bincount(qids * (N_OPTIONS + 1) + slot,
+                                    minlength=n * (N_OPTIONS + 1)).reshape(n, N_OPTIONS + 1)
+
+    @classmethod
+    def from_attempts(cls, lines, key):
+        stats = cls(key)
+        for names, _, qids, chosen in iter_answer_blocks(lines, key):
+            stats.add(qids, chosen, key.hits(qids, chosen), len(names))
+        return stats
+
+    def success_rate(self):
+        """Percent correct per question, NaN where nobody answered."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.correct / self.answered * 100
+
+    def _entry(self, qid, rate, bank):
+        return {
+            'questionId': self.key.question_id(qid),
+            'syncKey': self.key.keys[qid],
+            'questionPrompt': bank.prompt(qid) if bank is not None else None,
+            'totalAnswers': int(self.answered[qid]),
+            'wrongAnswers': int(self.answered[qid] - self.correct[qid]),
+            'successRate': round(float(rate[qid]), 2),
+        }
+
+    def most_incorrect(self, bank=None, limit=MOST_INCORRECT_LIMIT):
+        """getMostIncorrectQuestions: most wrong answers first, then lowest success rate."""
+        rate = self.success_rate()
+        ids = np.flatnonzero(self.answered > 0)
+        wrong = self.answered[ids] - self.correct[ids]
+        order = np.lexsort((rate[ids], -wrong))[:limit]
+        return [self._entry(qid, rate, bank) for qid in ids[order]]
+
+    def needing_improvement(self, bank=None, threshold=IMPROVEMENT_THRESHOLD):
+        """getQuestionsNeedingImprovement: success rate below ``threshold`` percent."""
+        rate = self.success_rate()
+        ids = np.flatnonzero((self.answered > 0) & (rate < threshold))
+        wrong = self.answered[ids] - self.correct[ids]
+        order = np.lexsort((-wrong, rate[ids]))
+        return [self._entry(qid, rate, bank) for qid in ids[order]]
+
+    def question(self, qid, bank=None):
+        """getQuestionAnalytics for the question in slot ``qid`` (every Leben item is worth 1 point)."""
+        total = int(self.answered[qid])
+        correct = int(self.correct[qid])
+        rate = correct / total if total else 0
+        return {
+            'questionId': self.key.question_id(qid),
+            'syncKey': self.key.keys[qid],
+            'questionPrompt': bank.prompt(qid) if bank is not None else None,
+            'totalAttempts': total,
+            'correctAttempts': correct,
+            'accuracyRate': round(rate * 100, 2),
+            'averageScore': round(rate, 2),
+            'maxScore': 1,
+            'options': self.options[qid, :N_OPTIONS].tolist(),
+            'unanswered': int(self.options[qid, N_OPTIONS]),
+        }
+
+    def to_dict(self, bank=None):
+        return {
+            'sources': bank.sources if bank is not None else None,
+            'attempts': self.attempts,
+            'answers': int(self.answered.sum()),
+            'bank': self.key.fingerprint,
+            'items': {
+                'syncKeys': self.key.keys,
+                # Mongo _ids where a questions export was given, else null.
+                'ids': self.key.ids,
+                'answered': self.answered.tolist(),
+                'correct': self.correct.tolist(),
+                # Picks of options A-D, then unanswered.
+                'options': self.options.tolist(),
+            },
+            'mostIncorrect': self.most_incorrect(bank),
+            'needingImprovement': self.needing_improvement(bank),
+        }
+
+    def save(self, path, bank=None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(bank), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-question statistics from an attempts JSONL export.')
+    parser.add_argument('attempts')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='stats artifact (default: %(default)s)')
+    parser.add_argument('--bank', action='append', help='bank file (repeatable, default: both Leben banks)')
+    parser.add_argument('--questions', metavar='EXPORT',
+                        help='questions export (JSON or JSONL) to map question _ids to the bank')
+    parser.add_argument('--question', metavar='ID',
+                        help='print the analytics of one question (syncKey or _id) instead')
+    args = parser.parse_args(argv)
+
+    paths = tuple(args.bank or BANK_PATHS)
+    try:
+        key = load_key(paths, questions=args.questions)
+        with open(args.attempts, 'r', encoding='utf-8') as f:
+            stats = ItemStats.from_attempts(f, key)
+    except GradeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    bank = ColumnarBank.from_files(paths)
+
+    if args.question is not None:
+        slot = key.slots.get(args.question)
+        if slot is None:
+            print(f"Error: Unknown question ID {args.question!r}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(stats.question(slot, bank), ensure_ascii=False, indent=2))
+        return
+
+    stats.save(args.out, bank)
+    print(f"{stats.attempts} attempts, {int(stats.answered.sum())} answers, "
+          f"{int((stats.answered > 0).sum())} questions seen")
+    print(f"{len(stats.needing_improvement())} questions below {IMPROVEMENT_THRESHOLD}% success")
+    print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
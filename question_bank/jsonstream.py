@@ -0,0 +1,303 @@
+"""Incremental reading and writing of ``{"questions": [...]}`` bank files.
+
+``iter_bank_questions`` yields one question dict at a time. The file is read
+in chunks and each element is decoded with ``json.JSONDecoder.raw_decode``
+as soon as it is complete, so peak memory is bounded by the largest single
+question (plus one read chunk), not by the size of the bank.
+
+``write_bank`` is the other direction: questions are serialized one at a
+time into a temporary file next to the bank, which is fsynced and then
+``os.replace``d over it. A crash mid-write leaves the old bank intact, and
+the bytes are identical to ``json.dump(data, f, ensure_ascii=False,
+indent=2)``. ``dump_bank`` writes the same bytes to an open file such as
+stdout.
+
+``iter_array`` reads a file that is one top-level array the way
+``iter_bank_questions`` reads a bank.
+
+Usage: python -m question_bank.jsonstream BANK.json [...]   (prints counts)
+"""
+import argparse
+import json
+import math
+import os
+import re
+import tempfile
+
+_decoder = json.JSONDecoder()
+_encode_str = json.encoder.encode_basestring
+_WHITESPACE = ' \t\n\r'
+DEFAULT_CHUNK_CHARS = 1 << 16
+# Characters a JSON number can continue with.
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+
+class _Reader:
+    """A sliding text window over a file with raw_decode on top."""
+
+    def __init__(self, f, chunk_chars):
+        self.f = f
+        self.chunk_chars = chunk_chars
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        # Drop what has been consumed before growing the window.
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(max(self.chunk_chars, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), '' at EOF."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in bank file, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A scalar that runs to the end of the window might continue in
+            # the next chunk; so might a number cut after "1." or "1e",
+            # which raw_decode reads as 1 and leaves the rest unread.
+            if (not self.eof and self.buf[self.pos] not in '{["'
+                    and _NUMBER_TAIL.match(self.buf, end)):
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_bank_questions(path_or_file, key='questions', chunk_chars=DEFAULT_CHUNK_CHARS):
+    """Yield the elements of the top-level ``key`` array one at a time.
+
+    Other top-level keys are decoded and skipped.
+    """
+    if isinstance(path_or_file, str):
+        with open(path_or_file, 'r', encoding='utf-8') as f:
+            yield from iter_bank_questions(f, key, chunk_chars)
+        return
+
+    reader = _Reader(path_or_file, chunk_chars)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            reader.expect('[')
+            yield from _iter_elements(reader, key)
+        else:
+            reader.value()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == '}':
+            return
+        if sep != ',':
+            raise ValueError(f"Expected ',' or '}}' in bank file, found {sep!r}")
+
+
+def iter_array(path_or_file, chunk_chars=DEFAULT_CHUNK_CHARS):
+    """Yield the elements of a file whose top-level value is an array."""
+    if isinstance(path_or_file, str):
+        with open(path_or_file, 'r', encoding='utf-8') as f:
+            yield from iter_array(f, chunk_chars)
+        return
+    reader = _Reader(path_or_file, chunk_chars)
+    reader.expect('[')
+    yield from _iter_elements(reader, 'top-level')
+
+
+def _iter_elements(reader, name):
+    """Elements of an array whose '[' has been consumed, through its ']'."""
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == ']':
+            return
+        if sep != ',':
+            raise ValueError(f"Expected ',' or ']' in {name!r} array, found {sep!r}")
+
+
+def dumps_question(question, level=2):
+    """One array element exactly as json.dump(indent=2) nests it at ``level``."""
+    pad = '  ' * level
+    try:
+        return pad + _dumps_indented(question, pad)
+    except _Unsupported:
+        return pad + json.dumps(question, ensure_ascii=False, indent=2).replace('\n', '\n' + pad)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _dumps_indented(value, pad):
+    """``json.dumps(value, ensure_ascii=False, indent=2)`` nested at ``pad``.
+
+    With ``indent`` set, json encodes in pure Python through a chain of
+    generators; this does the same for the plain types a bank holds (str
+    keys, str, int, float, bool, None, dict, list) with the C string
+    encoder, and raises _Unsupported for anything else.
+    """
+    kind = type(value)
+    if kind is str:
+        return _encode_str(value)
+    if kind is dict:
+        if not value:
+            return '{}'
+        inner = pad + '  '
+        parts = []
+        for key, item in value.items():
+            if type(key) is not str:
+                raise _Unsupported
+            parts.append(_encode_str(key) + ': ' + _dumps_indented(item, inner))
+        return '{\n' + inner + (',\n' + inner).join(parts) + '\n' + pad + '}'
+    if kind is list:
+        if not value:
+            return '[]'
+        inner = pad + '  '
+        return ('[\n' + inner + (',\n' + inner).join([_dumps_indented(item, inner) for item in value])
+                + '\n' + pad + ']')
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value is None:
+        return 'null'
+    if kind is int:
+        return int.__repr__(value)
+    if kind is float and math.isfinite(value):
+        return float.__repr__(value)
+    raise _Unsupported
+
+
+def write_bank(path, questions, key='questions'):
+    """Atomically replace ``path`` with ``{key: questions}``.
+
+    ``questions`` may be any iterable, e.g. a generator over another bank.
+    Returns the number of questions written.
+    """
+    count = 0
+
+    def write(f):
+        nonlocal count
+        count = dump_bank(questions, f, key)
+
+    replace_file(path, write, binary=False)
+    return count
+
+
+def dump_bank(questions, f, key='questions'):
+    """Write ``{key: questions}`` to the text file ``f`` one question at a time.
+
+    Returns the number of questions written.
+    """
+    count = 0
+    f.write('{\n  ' + json.dumps(key, ensure_ascii=False) + ': [')
+    for question in questions:
+        f.write(',\n' if count else '\n')
+        f.write(dumps_question(question))
+        count += 1
+    f.write('\n  ]\n}' if count else ']\n}')
+    return count
+
+
+def replace_file(path, write, binary=True):
+    """Atomically replace ``path`` with what ``write(f)`` writes.
+
+    ``f`` is a temporary file next to ``path``. It is fsynced and then
+    ``os.replace``d over ``path`` with ``path``'s permissions; if ``write``
+    raises, ``path`` is left untouched.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        if binary:
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        with f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o666 & ~_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _fsync_dir(directory):
+    # Makes the rename itself durable; not supported on every platform.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def count_questions(path):
+    return sum(1 for _ in iter_bank_questions(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Count questions in bank files without loading them whole.')
+    parser.add_argument('banks', nargs='+')
+    args = parser.parse_args(argv)
+    for path in args.banks:
+        print(f"{path}: {count_questions(path)} questions")
+
+
+if __name__ == '__main__':
+    main()
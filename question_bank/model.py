@@ -0,0 +1,163 @@
+"""Compact in-memory model for bank questions.
+
+A bank question as a dict carries nine or more keys, a list of option dicts
+and its own copy of every repeated value. ``Question`` and ``McqOption`` use
+``__slots__`` instead, intern the enum-like string fields, share one tuple per
+distinct tag set and one tuple per distinct key order, which roughly halves
+the memory per question compared to the dict form.
+
+``Question.from_dict`` / ``to_dict`` round-trip losslessly to the shape
+``scripts/import-300-questions.ts`` reads, including key order, so a bank
+loaded through the model serializes byte-for-byte the same.
+"""
+import sys
+
+from question_bank.jsonstream import iter_bank_questions, write_bank
+
+# JSON key -> attribute name, for the fields the model knows about.
+FIELDS = (
+    ('prompt', 'prompt'),
+    ('qType', 'q_type'),
+    ('options', 'options'),
+    ('provider', 'provider'),
+    ('mainSkill', 'main_skill'),
+    ('usageCategory', 'usage_category'),
+    ('state', 'state'),
+    ('level', 'level'),
+    ('status', 'status'),
+    ('tags', 'tags'),
+    ('media', 'media'),
+    ('images', 'images'),
+)
+_ATTR = dict(FIELDS)
+# Low-cardinality fields whose strings are interned.
+_INTERNED = ('qType', 'provider', 'mainSkill', 'usageCategory', 'state', 'level', 'status')
+
+_tag_tuples = {}
+_key_orders = {}
+
+
+def shared_tags(tags):
+    """One shared tuple per distinct tag list."""
+    key = tuple(sys.intern(t) for t in tags)
+    return _tag_tuples.setdefault(key, key)
+
+
+def _shared_order(keys):
+    key = tuple(keys)
+    return _key_orders.setdefault(key, key)
+
+
+class McqOption:
+    __slots__ = ('text', 'is_correct')
+
+    def __init__(self, text, is_correct=False):
+        self.text = text
+        self.is_correct = is_correct
+
+    def __eq__(self, other):
+        return (isinstance(other, McqOption)
+                and self.text == other.text and self.is_correct == other.is_correct)
+
+    def __repr__(self):
+        return f'McqOption({self.text!r}, {self.is_correct!r})'
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['text'], d['isCorrect'])
+
+    def to_dict(self):
+        return {'text': self.text, 'isCorrect': self.is_correct}
+
+
+class Question:
+    """One bank question. ``extra`` holds keys the model does not know.
+
+    The serialized key order is fixed when the question is built.
+    """
+
+    __slots__ = tuple(attr for _, attr in FIELDS) + ('extra', '_order')
+
+    def __init__(self, prompt, q_type='mcq', options=(), provider=None, main_skill=None,
+                 usage_category=None, state=None, level=None, status=None, tags=(),
+                 media=None, images=None, extra=None, _order=None):
+        self.prompt = prompt
+        self.q_type = q_type if q_type is None else sys.intern(q_type)
+        self.options = tuple(options)
+        self.provider = provider if provider is None else sys.intern(provider)
+        self.main_skill = main_skill if main_skill is None else sys.intern(main_skill)
+        self.usage_category = usage_category if usage_category is None else sys.intern(usage_category)
+        self.state = state if state is None else sys.intern(state)
+        self.level = level if level is None else sys.intern(level)
+        self.status = status if status is None else sys.intern(status)
+        self.tags = shared_tags(tags)
+        self.media = media
+        self.images = images
+        self.extra = extra or None
+        if _order is None:
+            _order = [key for key, attr in FIELDS
+                      if getattr(self, attr) not in (None, ()) or key in ('prompt', 'qType')]
+            _order += list(self.extra or ())
+        self._order = _shared_order(_order)
+
+    def __eq__(self, other):
+        return isinstance(other, Question) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f'Question({self.prompt[:40]!r}, q_type={self.q_type!r})'
+
+    @property
+    def correct_index(self):
+        """Index of the first correct option, or -1."""
+        for i, opt in enumerate(self.options):
+            if opt.is_correct:
+                return i
+        return -1
+
+    @classmethod
+    def from_dict(cls, d):
+        kwargs = {'q_type': None}
+        extra = {}
+        for key, value in d.items():
+            attr = _ATTR.get(key)
+            if attr is None:
+                extra[key] = value
+            elif key == 'options' and isinstance(value, list) and all(
+                    isinstance(o, dict) and o.keys() == {'text', 'isCorrect'} for o in value):
+                kwargs[attr] = [McqOption(o['text'], o['isCorrect']) for o in value]
+            elif key == 'tags' and isinstance(value, list) and all(isinstance(t, str) for t in value):
+                kwargs[attr] = value
+            elif key in _INTERNED and isinstance(value, str):
+                kwargs[attr] = value
+            elif key in ('prompt', 'media', 'images'):
+                kwargs[attr] = value
+            else:
+                # Unexpected shape (null tags, odd options, ...): keep it as is.
+                extra[key] = value
+        if 'prompt' not in kwargs:
+            raise ValueError("Question has no prompt")
+        return cls(extra=extra, _order=d.keys(), **kwargs)
+
+    def to_dict(self):
+        d = {}
+        extra = self.extra or {}
+        for key in self._order:
+            attr = _ATTR.get(key)
+            if attr is None or key in extra:
+                d[key] = extra[key]
+            elif key == 'options':
+                d[key] = [o.to_dict() for o in self.options]
+            elif key == 'tags':
+                d[key] = list(self.tags)
+            else:
+                d[key] = getattr(self, attr)
+        return d
+
+
+def load_bank(path):
+    """All questions of a bank file as ``Question`` objects."""
+    return [Question.from_dict(q) for q in iter_bank_questions(path)]
+
+
+def dump_bank(questions, path):
+    write_bank(path, (q.to_dict() for q in questions))
@@ -0,0 +1,262 @@
+"""Diff-based sync of the Leben banks into the Mongo ``questions`` collection.
+
+``scripts/import-300-questions.ts`` and ``import-state-questions.ts``
+delete every document in their scope and insert the whole bank again. Every
+refresh rewrites all documents and gives them new ``_id``s, which breaks
+references from attempts. This tool applies only the difference.
+
+Each bank question gets two fields:
+
+* ``syncKey``  - SHA-1 of its scope, state and normalized prompt (see
+  ``question_bank.dedupe.normalize``), so case, punctuation and whitespace
+  fixes keep the key. The n-th repeat of the same key gets ``#n`` appended.
+* ``syncHash`` - SHA-1 of the document fields this tool owns (the same
+  fields the TypeScript import writes).
+
+Only ``_id``, ``syncKey`` and ``syncHash`` are read from the collection.
+A new key becomes an insert, a changed hash an update (``$set`` of the owned
+fields, so ``media``/``images`` added by other scripts stay), and a key that
+is no longer in the bank a delete. Documents written by the old import have
+no ``syncKey`` yet. They are adopted by prompt on the first run, which
+updates each of them once and keeps their ``_id``. The operations go out in
+unordered ``bulk_write`` batches.
+
+Writing needs ``pymongo`` (see ``question_bank/requirements.txt``); it is
+imported only where operations are built or a client is opened, so
+``to_document`` and the key and hash helpers work without it. ``sync``
+takes any collection object with the pymongo API, e.g. a ``mongomock``
+collection or one on a local ``mongod``; ``question_bank/tests`` checks it
+against ``mongomock``.
+
+Usage:
+    python -m question_bank.mongo_sync [--bank common|state] [--dry-run]
+    MONGO_URI=mongodb://host/quiz python -m question_bank.mongo_sync
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+
+from question_bank.columnar import BANK_PATHS
+from question_bank.dedupe import normalize
+from question_bank.jsonstream import iter_bank_questions
+
+DEFAULT_URI = 'mongodb://localhost:27017/quiz'
+DEFAULT_BATCH = 1000
+PROVIDER = 'leben_in_deutschland'
+MAIN_SKILL = 'leben_test'
+
+# Bank name -> (file, usageCategory), in the same scopes as the TypeScript imports.
+BANKS = {
+    'common': (BANK_PATHS[0], 'common'),
+    'state': (BANK_PATHS[1], 'state_specific'),
+}
+
+# usageCategory -> tags of a question without any, as each TypeScript import writes them.
+DEFAULT_TAGS = {
+    'common': ('300-Fragen',),
+    'state_specific': (),
+}
+
+SyncPlan = namedtuple('SyncPlan', 'inserts updates deletes unchanged')
+
+
+class SyncError(ValueError):
+    pass
+
+
+def scope_filter(usage_category):
+    return {'provider': PROVIDER, 'mainSkill': MAIN_SKILL, 'usageCategory': usage_category}
+
+
+def to_document(q, usage_category):
+    """The fields of the collection document that the sync owns, as the TypeScript import builds them."""
+    options = [{'text': o.get('text'), 'isCorrect': o.get('isCorrect') or False}
+               for o in q.get('options') or ()]
+    correct = next((o['text'] for o in options if o['isCorrect']), None)
+    doc = {
+        'prompt': q.get('prompt'),
+        'text': q.get('prompt'),
+        'qType': q.get('qType'),
+        'options': options,
+        'correctAnswer': correct or '',
+        'provider': q.get('provider'),
+        'mainSkill': q.get('mainSkill') or MAIN_SKILL,
+        'usageCategory': q.get('usageCategory') or usage_category,
+        'level': q.get('level') or 'A1',
+        'status': q.get('status') or 'published',
+        # ``q.tags || [...]`` in TypeScript: only a missing list gets the default.
+        'tags': q['tags'] if q.get('tags') is not None else list(DEFAULT_TAGS[usage_category]),
+    }
+    if usage_category == 'state_specific':
+        doc['state'] = q.get('state') or ''
+    return doc
+
+
+def content_hash(doc):
+    data = json.dumps(doc, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def sync_key(usage_category, state, prompt):
+    """``syncKey`` of a question before repeats are numbered."""
+    data = '\0'.join((usage_category, state or '', normalize(prompt)))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def assign_keys(items):
+    """``syncKey`` per ``(usageCategory, state, prompt)`` item; repeats get ``#2``, ``#3``, ..."""
+    seen = Counter()
+    keys = []
+    for item in items:
+        key = sync_key(*item)
+        seen[key] += 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def document_keys(docs):
+    """``syncKey`` of each ``to_document`` result, in order."""
+    return assign_keys((d['usageCategory'], d.get('state'), d['prompt']) for d in docs)
+
+
+def bank_keys(paths=BANK_PATHS):
+    """``syncKey`` of every question of ``paths``, in bank order.
+
+    A path that is not one of ``BANKS`` is keyed in the common scope.
+    """
+    scopes = {os.path.abspath(path): usage_category for path, usage_category in BANKS.values()}
+    keys = []
+    for path in paths:
+        usage_category = scopes.get(os.path.abspath(path), 'common')
+        keys += document_keys([to_document(q, usage_category) for q in iter_bank_questions(path)])
+    return keys
+
+
+def keys_fingerprint(keys):
+    """SHA-1 of the keys in order; changes when questions are added, removed or moved."""
+    return hashlib.sha1('\n'.join(keys).encode('utf-8')).hexdigest()
+
+
+def bank_documents(path, usage_category):
+    """``{syncKey: document}`` for one bank file, documents carrying their ``syncHash``."""
+    docs = [to_document(q, usage_category) for q in iter_bank_questions(path)]
+    keys = document_keys(docs)
+    out = {}
+    for key, doc in zip(keys, docs):
+        doc['syncKey'] = key
+        doc['syncHash'] = content_hash(doc)
+        out[key] = doc
+    return out
+
+
+def existing_keys(collection, usage_category):
+    """``{syncKey: (_id, syncHash)}`` in scope, adopting documents without a key by prompt.
+
+    Returns the mapping and the ``_id``s of keyed repeats (two documents with
+    one key), which are deleted.
+    """
+    scope = scope_filter(usage_category)
+    found = {}
+    extra_ids = []
+    for doc in collection.find({**scope, 'syncKey': {'$exists': True}},
+                               {'_id': 1, 'syncKey': 1, 'syncHash': 1}):
+        if doc['syncKey'] in found:
+            extra_ids.append(doc['_id'])
+        else:
+            found[doc['syncKey']] = (doc['_id'], doc.get('syncHash'))
+    # One-time migration of documents from the old delete-and-insert import.
+    legacy = list(collection.find({**scope, 'syncKey': {'$exists': False}},
+                                  {'_id': 1, 'prompt': 1, 'state': 1}).sort('_id', 1))
+    keys = assign_keys((usage_category, d.get('state'), d.get('prompt') or '') for d in legacy)
+    for key, doc in zip(keys, legacy):
+        if key in found:
+            extra_ids.append(doc['_id'])
+        else:
+            found[key] = (doc['_id'], None)
+    return found, extra_ids
+
+
+def plan_sync(collection, path, usage_category):
+    """The minimal SyncPlan turning the collection scope into the bank at ``path``."""
+    wanted = bank_documents(path, usage_category)
+    if any(doc['usageCategory'] != usage_category for doc in wanted.values()):
+        raise SyncError(f"{path} has questions outside usageCategory={usage_category!r}")
+    found, extra_ids = existing_keys(collection, usage_category)
+    inserts, updates = [], []
+    unchanged = 0
+    for key, doc in wanted.items():
+        current = found.pop(key, None)
+        if current is None:
+            inserts.append(doc)
+        elif current[1] != doc['syncHash']:
+            updates.append((current[0], doc))
+        else:
+            unchanged += 1
+    deletes = extra_ids + [_id for _id, _ in found.values()]
+    return SyncPlan(inserts, updates, deletes, unchanged)
+
+
+def apply_plan(collection, plan, batch=DEFAULT_BATCH, now=None):
+    """Write ``plan`` with unordered bulk_write batches; returns the number of operations."""
+    from pymongo import DeleteMany, InsertOne, UpdateOne
+
+    now = now or datetime.now(timezone.utc)
+    ops = [InsertOne({**doc, 'createdAt': now, 'updatedAt': now}) for doc in plan.inserts]
+    ops += [UpdateOne({'_id': _id}, {'$set': {**doc, 'updatedAt': now}}) for _id, doc in plan.updates]
+    ops += [DeleteMany({'_id': {'$in': plan.deletes[i:i + batch]}})
+            for i in range(0, len(plan.deletes), batch)]
+    for i in range(0, len(ops), batch):
+        collection.bulk_write(ops[i:i + batch], ordered=False)
+    return len(ops)
+
+
+def sync(collection, banks=tuple(BANKS), dry_run=False, batch=DEFAULT_BATCH):
+    """Sync the named banks; returns ``{bank: SyncPlan}``."""
+    plans = {}
+    for name in banks:
+        path, usage_category = BANKS[name]
+        plans[name] = plan = plan_sync(collection, path, usage_category)
+        if not dry_run:
+            apply_plan(collection, plan, batch)
+    return plans
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sync the Leben question banks into MongoDB by diff.')
+    parser.add_argument('--bank', action='append', choices=sorted(BANKS),
+                        help='bank to sync (repeatable, default: all)')
+    parser.add_argument('--uri', default=os.environ.get('MONGO_URI') or os.environ.get('MONGODB_URI') or DEFAULT_URI,
+                        help='connection string (default: $MONGO_URI, $MONGODB_URI or %(default)s)')
+    parser.add_argument('--collection', default='questions')
+    parser.add_argument('--dry-run', action='store_true', help='only report the changes')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH)
+    args = parser.parse_args(argv)
+
+    try:
+        from pymongo import MongoClient
+        from pymongo.errors import PyMongoError
+    except ImportError:
+        print("Error: pymongo is not installed (pip install -r question_bank/requirements.txt)",
+              file=sys.stderr)
+        sys.exit(1)
+    client = MongoClient(args.uri)
+    try:
+        collection = client.get_default_database('quiz')[args.collection]
+        plans = sync(collection, args.bank or tuple(BANKS), args.dry_run, args.batch)
+    except (SyncError, PyMongoError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+    verb = 'Would apply' if args.dry_run else 'Applied'
+    for name, plan in plans.items():
+        print(f"{name}: {verb} {len(plan.inserts)} inserts, {len(plan.updates)} updates, "
+              f"{len(plan.deletes)} deletes; {plan.unchanged} unchanged")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Incremental parsing of "Aufgabe N:" sources backed by an on-disk cache.
+
+Every block is hashed together with its number, the parser settings and the
+source code of the parser and ``question_bank.reconcile``, and the parsed
+result (plus any warnings it produced) is kept in a SQLite file. A re-run only parses blocks whose text
+changed and replays the stored result for the rest, warnings included.
+
+The cache is bounded: after each run the least recently used entries beyond
+``max_entries`` are evicted.
+
+Usage: python -m question_bank.parse_cache SOURCE.txt [--out OUT.json] [--no-cache]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from question_bank import REPO_ROOT, aufgabe, reconcile
+from question_bank.jsonstream import write_bank
+
+DEFAULT_CACHE_PATH = os.path.join(REPO_ROOT, '.cache', 'aufgabe-blocks.sqlite')
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Lookups are batched so a large source does not turn into one query per block.
+_BATCH = 500
+
+
+def _parser_fingerprint():
+    h = hashlib.blake2b(digest_size=16)
+    for module in (aufgabe, reconcile):
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.digest()
+
+
+class ParseCache:
+    """SQLite-backed map from block hash to parsed question and warnings."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS blocks ('
+            ' key BLOB PRIMARY KEY, result TEXT NOT NULL, used REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)')
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.evict()
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def evict(self):
+        count = self.conn.execute('SELECT COUNT(*) FROM blocks').fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                'DELETE FROM blocks WHERE key IN '
+                '(SELECT key FROM blocks ORDER BY used LIMIT ?)',
+                (count - self.max_entries,))
+
+    def clear(self):
+        self.conn.execute('DELETE FROM blocks')
+        self.conn.commit()
+
+    def _lookup(self, keys):
+        found = {}
+        for i in range(0, len(keys), _BATCH):
+            batch = keys[i:i + _BATCH]
+            marks = ','.join('?' * len(batch))
+            found.update(self.conn.execute(
+                f'SELECT key, result FROM blocks WHERE key IN ({marks})', batch))
+        return found
+
+    def iter_questions(self, source, defaults=None, warn=print, append_unmatched_answer=False):
+        """Same contract as ``aufgabe.iter_questions``, reusing cached blocks."""
+        settings = json.dumps([defaults, append_unmatched_answer], sort_keys=True).encode('utf-8')
+        salt = hashlib.blake2b(_parser_fingerprint() + settings, digest_size=32).digest()
+        blocks = aufgabe.iter_blocks(source)
+        while True:
+            batch = []
+            for number, body in blocks:
+                key = hashlib.blake2b(b'%d:' % number + body.encode('utf-8'),
+                                      digest_size=20, key=salt).digest()
+                batch.append((number, body, key))
+                if len(batch) == _BATCH:
+                    break
+            if not batch:
+                return
+            yield from self._parse_batch(batch, defaults, warn, append_unmatched_answer)
+
+    def _parse_batch(self, batch, defaults, warn, append_unmatched_answer):
+        found = self._lookup([key for _, _, key in batch])
+        now = time.time()
+        inserts, touched = [], []
+        for number, body, key in batch:
+            cached = found.get(key)
+            if cached is not None:
+                self.hits += 1
+                touched.append((now, key))
+                result = json.loads(cached)
+            else:
+                self.misses += 1
+                warnings = []
+                question = aufgabe.parse_block(number, body, defaults, warnings.append,
+                                               append_unmatched_answer)
+                result = {'question': question, 'warnings': warnings}
+                inserts.append((key, json.dumps(result, ensure_ascii=False), now))
+            for message in result['warnings']:
+                warn(message)
+            if result['question'] is not None:
+                yield number, result['question']
+        self.conn.executemany('UPDATE blocks SET used = ? WHERE key = ?', touched)
+        self.conn.executemany('INSERT OR REPLACE INTO blocks VALUES (?, ?, ?)', inserts)
+        self.conn.commit()
+
+
+def parse_questions(text, defaults=None, warn=print, append_unmatched_answer=False,
+                    use_cache=True, cache_path=DEFAULT_CACHE_PATH):
+    """Drop-in for ``aufgabe.parse_questions`` that goes through the cache."""
+    if not use_cache:
+        return aufgabe.parse_questions(text, defaults, warn, append_unmatched_answer)
+    with ParseCache(cache_path) as cache:
+        return [q for _, q in cache.iter_questions(text, defaults, warn, append_unmatched_answer)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parse an "Aufgabe N:" source, reusing unchanged blocks.')
+    parser.add_argument('source', help='UTF-8 text file with "Aufgabe N:" blocks')
+    parser.add_argument('--out', help='write {"questions": [...]} here instead of stdout')
+    parser.add_argument('--no-cache', action='store_true', help='parse everything and leave the cache alone')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='cache file (default: %(default)s)')
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument('--clear', action='store_true', help='empty the cache before parsing')
+    args = parser.parse_args(argv)
+
+    def warn(msg):
+        print(msg, file=sys.stderr)
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        if args.no_cache:
+            questions = [q for _, q in aufgabe.iter_questions(f, warn=warn)]
+        else:
+            with ParseCache(args.cache, args.max_entries) as cache:
+                if args.clear:
+                    cache.clear()
+                questions = [q for _, q in cache.iter_questions(f, warn=warn)]
+                print(f"Cache: {cache.hits} reused, {cache.misses} parsed", file=sys.stderr)
+
+    data = {'questions': questions}
+    if args.out:
+        write_bank(args.out, questions)
+        print(f"Parsed {len(questions)} questions into {args.out}")
+    else:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Exact probability that a learner passes the Leben test (17 of 33).
+
+An exam is 30 questions drawn without replacement from the common pool and
+3 from the learner's state pool (``question_bank.exam_draw``). Given a
+success probability p_j for every pool question, the score is a sum of
+Bernoulli variables over a uniformly random subset, and its distribution
+can be computed exactly.
+
+For one pool (N questions, k drawn) the probability generating function is
+e_k(q_1 .. q_N) / C(N, k), with q_j(x) = (1 - p_j) + p_j x. Writing
+q_j = A(x) + d_j (x - 1), with A(x) = (1 - m) + m x for the learner's mean
+probability m and d_j = p_j - m, it expands to
+
+    sum_t  C(N - t, k - t) / C(N, k) * e_t(d) * A(x)^(k - t) * (x - 1)^t
+
+The expansion needs the scalar elementary symmetric sums e_t(d) for
+t <= k, an O(N k) recurrence, and a Horner-style pass for the polynomial.
+Centering on m keeps the alternating (x - 1)^t terms small, so the result
+matches a full (drawn, correct) dynamic programme to about 1e-15. The two
+pools are then convolved. Every step is vectorized over a batch of
+learners.
+
+p_j comes from the learner's history: (correct + w * prior) / (seen + w),
+where prior is the learner's overall smoothed accuracy and w is
+``PRIOR_WEIGHT``. Unseen questions get the prior.
+
+Input is JSONL, one learner per line::
+
+    {"learner": "...", "state": "Bayern", "history": {"12": [2, 3], "40": [0, 1]}}
+
+where ``[2, 3]`` means 2 correct out of 3 answers to question ID 12.
+
+Usage: python -m question_bank.pass_probability learners.jsonl [--out results.jsonl]
+"""
+import argparse
+import json
+import sys
+import time
+from math import comb
+
+import numpy as np
+
+from question_bank.answer_key import PASS_SCORE
+from question_bank.exam_draw import COMMON_COUNT, STATE_COUNT, ExamDraw, ExamDrawError
+
+PRIOR_WEIGHT = 2.0
+DEFAULT_BATCH = 4096
+
+
+def draw_score_distribution(p, k):
+    """Distribution of correct answers among ``k`` of ``N`` questions drawn without replacement.
+
+    ``p`` is an (L, N) array of per-question success probabilities; returns
+    an (L, k + 1) array whose row l is P(score = s) for learner l.
+    """
+    n_learners, n = p.shape
+    k = min(k, n)
+    m = p.mean(axis=1) if n else np.zeros(n_learners)
+    d = p - m[:, None]
+
+    # e_t(d) for t <= k.
+    e = np.zeros((n_learners, k + 1))
+    e[:, 0] = 1
+    for j in range(n):
+        e[:, 1:] += e[:, :-1] * d[:, j, None]
+    scale = np.asarray([comb(n - t, k - t) / comb(n, k) for t in range(k + 1)])
+    c = e * scale
+
+    # Coefficients of (x - 1)^t, constant across learners.
+    w_pow = np.zeros((k + 1, k + 1))
+    w_pow[0, 0] = 1
+    for t in range(1, k + 1):
+        w_pow[t, 1:] = w_pow[t - 1, :-1]
+        w_pow[t] -= w_pow[t - 1]
+
+    # R_t = R_{t-1} * A + c_t (x - 1)^t; R_k is the generating function.
+    r = np.zeros((n_learners, k + 1))
+    r[:, 0] = c[:, 0]
+    for t in range(1, k + 1):
+        shifted = r[:, :-1] * m[:, None]
+        r *= (1 - m)[:, None]
+        r[:, 1:] += shifted
+        r += c[:, t, None] * w_pow[t]
+    # Remove rounding noise below zero.
+    return np.clip(r, 0, None)
+
+
+def learner_probabilities(history, n_questions, prior_weight=PRIOR_WEIGHT):
+    """Per-question success probability for one learner, from ``{qid: [correct, seen]}``."""
+    qids = np.fromiter((int(q) for q in history), dtype=np.int64, count=len(history))
+    counts = np.asarray(list(history.values()), dtype=np.float64).reshape(-1, 2)
+    if len(qids) and (qids.min() < 0 or qids.max() >= n_questions):
+        raise ValueError(f"Question ID out of range 0-{n_questions - 1}")
+    correct, seen = counts[:, 0], counts[:, 1]
+    if (correct < 0).any() or (correct > seen).any():
+        raise ValueError("History entries must be [correct, seen] with 0 <= correct <= seen")
+    prior = (correct.sum() + 1) / (seen.sum() + 2)
+    p = np.full(n_questions, prior)
+    p[qids] = (correct + prior_weight * prior) / (seen + prior_weight)
+    return p
+
+
+class PassCalculator:
+    def __init__(self, draw, prior_weight=PRIOR_WEIGHT):
+        self.draw = draw
+        self.prior_weight = prior_weight
+
+    def score_distribution(self, p, state_codes):
+        """(L, 34) score distribution for probability rows ``p`` over all question IDs."""
+        common = draw_score_distribution(p[:, self.draw.common], COMMON_COUNT)
+        out = np.zeros((len(p), common.shape[1] + STATE_COUNT))
+        for code in np.unique(state_codes):
+            rows = np.flatnonzero(state_codes == code)
+            pool = self.draw.state_ids[self.draw.state_offsets[code]:self.draw.state_offsets[code + 1]]
+            local = draw_score_distribution(p[np.ix_(rows, pool)], STATE_COUNT)
+            for s in range(local.shape[1]):
+                out[rows, s:s + common.shape[1]] += common[rows] * local[:, s, None]
+        return out
+
+    def evaluate(self, learners):
+        """``[(learner, state, pass_probability, expected_score)]`` for a batch of records."""
+        n = len(self.draw)
+        p = np.empty((len(learners), n))
+        codes = np.empty(len(learners), dtype=np.int64)
+        for i, record in enumerate(learners):
+            state = record.get('state')
+            if state not in self.draw.state_names:
+                raise ExamDrawError(f"No published state questions for {state!r}")
+            codes[i] = self.draw.state_names.index(state)
+            p[i] = learner_probabilities(record.get('history') or {}, n, self.prior_weight)
+        dist = self.score_distribution(p, codes)
+        passed = dist[:, PASS_SCORE:].sum(axis=1)
+        expected = dist @ np.arange(dist.shape[1])
+        return [(r.get('learner'), r.get('state'), float(pp), float(ex))
+                for r, pp, ex in zip(learners, passed, expected)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exact Leben test pass probability per learner.')
+    parser.add_argument('learners', help='JSONL with learner, state and history per line')
+    parser.add_argument('--out', help='write results as JSONL here (default: stdout)')
+    parser.add_argument('--prior-weight', type=float, default=PRIOR_WEIGHT,
+                        help='pseudo-answers pulling each question towards the learner average')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH)
+    args = parser.parse_args(argv)
+
+    calc = PassCalculator(ExamDraw.load(), args.prior_weight)
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    count = 0
+    start = time.perf_counter()
+    try:
+        with open(args.learners, 'r', encoding='utf-8') as f:
+            batch = []
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except ValueError as e:
+                    raise ExamDrawError(f"Line {lineno}: {e}") from None
+                if len(batch) == args.batch:
+                    count += _write_results(out, calc.evaluate(batch))
+                    batch = []
+            if batch:
+                count += _write_results(out, calc.evaluate(batch))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"{count} learners in {elapsed:.2f}s", file=sys.stderr)
+
+
+def _write_results(out, results):
+    for learner, state, passed, expected in results:
+        out.write(json.dumps({'learner': learner, 'state': state,
+                              'passProbability': round(passed, 6),
+                              'expectedScore': round(expected, 3)}, ensure_ascii=False) + '\n')
+    return len(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Replacement question payloads, loaded lazily from data files.
+
+The payloads used to live as Python literals inside the replace scripts and
+were pulled out with ``exec`` on half of another script. They are now plain
+bank-format JSON files under ``questions/replacements/`` and are exposed as
+module attributes that are only parsed on first access::
+
+    from question_bank.payloads import new_questions_152_200
+
+Parsed payloads are pickled under ``questions/replacements/.cache/``. A cache
+entry is reused while the source file's mtime and size are unchanged; if only
+the mtime moved, the source is re-hashed and the entry is kept when the
+SHA-256 still matches.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+from question_bank import REPO_ROOT
+
+PAYLOAD_DIR = os.path.join(REPO_ROOT, 'questions', 'replacements')
+CACHE_DIR = os.path.join(PAYLOAD_DIR, '.cache')
+
+PAYLOADS = {
+    'new_questions_152_200': 'leben-in-deutschland-152-200.json',
+    'new_questions_291_300': 'leben-in-deutschland-291-300.json',
+}
+
+_CACHE_VERSION = 1
+_loaded = {}
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_path(path):
+    return os.path.join(CACHE_DIR, os.path.basename(path) + '.pickle')
+
+
+def _read_cache(path, st):
+    try:
+        with open(_cache_path(path), 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None, None
+    if entry.get('version') != _CACHE_VERSION or entry.get('size') != st.st_size:
+        return None, None
+    if entry.get('mtime_ns') == st.st_mtime_ns:
+        return entry['questions'], None
+    digest = _sha256(path)
+    if entry.get('sha256') == digest:
+        # Touched but not edited: keep the entry and refresh its mtime.
+        _write_cache(path, st, digest, entry['questions'])
+        return entry['questions'], digest
+    return None, digest
+
+
+def _write_cache(path, st, digest, questions):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = _cache_path(path) + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'version': _CACHE_VERSION,
+                'mtime_ns': st.st_mtime_ns,
+                'size': st.st_size,
+                'sha256': digest,
+                'questions': questions,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _cache_path(path))
+    except OSError:
+        # A read-only checkout still works, just without the cache.
+        pass
+
+
+def load_payload(path, use_cache=True):
+    """Return the ``questions`` list of a bank-format JSON file."""
+    st = os.stat(path)
+    digest = None
+    if use_cache:
+        questions, digest = _read_cache(path, st)
+        if questions is not None:
+            return questions
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    questions = data['questions'] if isinstance(data, dict) else data
+    if use_cache:
+        _write_cache(path, st, digest or _sha256(path), questions)
+    return questions
+
+
+def __getattr__(name):
+    if name not in PAYLOADS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _loaded:
+        _loaded[name] = load_payload(os.path.join(PAYLOAD_DIR, PAYLOADS[name]))
+    return _loaded[name]
+
+
+def __dir__():
+    return sorted(list(globals()) + list(PAYLOADS))
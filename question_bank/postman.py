@@ -0,0 +1,178 @@
+"""Extract question payloads from Postman collections into a bank file.
+
+Grammar questions are kept as request bodies, e.g. in
+``Grammar_A1_Questions.postman_collection.json`` (collection v2.1,
+``request.body.raw`` strings) and ``examples_grammar_a1_questions.json`` (a
+plain list of items with ``request.body`` objects). Posting them means one
+HTTP call per question. This tool reads the collection with
+``question_bank.jsonstream``, one top-level item at a time. It takes the
+bodies of ``POST .../questions`` requests (and each element of
+``POST .../questions/bulk`` bodies), checks them against the
+``question.schema.ts`` rules with ``question_bank.validate`` and writes the
+valid ones as one ``{"questions": [...]}`` file. That file is the body of a single
+``POST /questions/bulk``.
+
+Several files may carry the same questions (the two grammar A1 files hold
+the same 18). A payload whose ``content_key`` was already written is
+skipped and counted as a duplicate, so the bulk insert gets each question
+once.
+
+Files without question requests (e.g. the exam bodies in
+``grammar-exam-postman.json``) yield nothing and are reported.
+
+Usage:
+    python -m question_bank.postman Grammar_A1_Questions.postman_collection.json --out grammar-a1.json
+    python -m question_bank.postman *.json             (report only)
+"""
+import argparse
+import json
+import sys
+
+from question_bank.jsonstream import iter_array, iter_bank_questions, write_bank
+from question_bank.validate import validate_question
+
+
+class PostmanError(ValueError):
+    pass
+
+
+def iter_items(path):
+    """Top-level items of a collection object or an item list, decoded one at a time."""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(64).lstrip('﻿ \t\r\n')[:1]
+        f.seek(0)
+        if first == '[':
+            yield from iter_array(f)
+        elif first == '{':
+            yield from iter_bank_questions(f, key='item')
+        else:
+            raise PostmanError(f"{path} is not a JSON object or array")
+
+
+def _request_path(request):
+    url = request.get('url')
+    if isinstance(url, dict):
+        url = url.get('raw') or '/'.join(url.get('path') or ())
+    return str(url or '').split('?')[0].rstrip('/')
+
+
+def _body(request):
+    body = request.get('body')
+    if isinstance(body, dict) and isinstance(body.get('raw'), str):
+        return json.loads(body['raw'])
+    return body
+
+
+def iter_payloads(items, prefix=''):
+    """Yield ``(name, payload, error)`` for every question request under ``items``.
+
+    ``name`` is the folder path of the request. ``error`` is set (and
+    ``payload`` is None) when a body is not valid JSON.
+    """
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = f"{prefix}{item.get('name') or '?'}"
+        if isinstance(item.get('item'), list):
+            yield from iter_payloads(item['item'], name + ' / ')
+            continue
+        request = item.get('request')
+        if not isinstance(request, dict) or str(request.get('method', '')).upper() != 'POST':
+            continue
+        path = _request_path(request)
+        bulk = path.endswith('/questions/bulk')
+        if not bulk and not path.endswith('/questions'):
+            continue
+        try:
+            body = _body(request)
+        except ValueError as e:
+            yield name, None, f"body is not valid JSON ({e})"
+            continue
+        if bulk:
+            questions = body.get('questions') if isinstance(body, dict) else None
+            for i, question in enumerate(questions or ()):
+                yield f"{name} [{i}]", question, None
+        else:
+            yield name, body, None
+
+
+def payload_errors(q):
+    """The ``question.schema.ts`` checks a payload would fail at insert time."""
+    return [f"{issue.path}: {issue.message}" for issue in validate_question(q)]
+
+
+def content_key(q):
+    """The ``mongo_sync`` key of a payload's prompt and a hash of its other fields.
+
+    Payloads that differ only in the case, punctuation or spacing of the
+    prompt get the same key.
+    """
+    # mongo_sync pulls in numpy through dedupe; sniff and ingest import this
+    # module and must not need it.
+    from question_bank.mongo_sync import content_hash, sync_key
+
+    prompt = q.get('prompt') if isinstance(q.get('prompt'), str) else ''
+    rest = {k: v for k, v in q.items() if k != 'prompt'}
+    return sync_key(str(q.get('usageCategory') or ''), q.get('state'), prompt), content_hash(rest)
+
+
+def iter_questions(paths, report, warn=print, strict=False):
+    """Yield the valid payloads of all ``paths`` in order, each question once.
+
+    ``report[path]`` is set to ``(found, invalid, duplicates)`` as each file
+    finishes; duplicates repeat a payload already yielded from any of the
+    files. With ``strict`` the first invalid payload raises PostmanError
+    instead.
+    """
+    seen = set()
+    for path in paths:
+        found = invalid = duplicates = 0
+        for name, payload, error in iter_payloads(iter_items(path)):
+            found += 1
+            errors = [error] if error else payload_errors(payload)
+            if not errors:
+                key = content_key(payload)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                yield payload
+                continue
+            message = f"{path}: {name}: {'; '.join(errors)}"
+            if strict:
+                raise PostmanError(message)
+            invalid += 1
+            warn(f"Warning: {message}")
+        report[path] = (found, invalid, duplicates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extract question payloads from Postman collections into a bank file.')
+    parser.add_argument('collections', nargs='+')
+    parser.add_argument('--out', help='write the valid questions here as {"questions": [...]}')
+    parser.add_argument('--strict', action='store_true', help='write nothing if any payload is invalid')
+    args = parser.parse_args(argv)
+
+    def warn(msg):
+        print(msg, file=sys.stderr)
+
+    report = {}
+    questions = iter_questions(args.collections, report, warn, args.strict)
+    try:
+        if args.out:
+            count = write_bank(args.out, questions)
+        else:
+            count = sum(1 for _ in questions)
+    except (PostmanError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    for path, (found, invalid, duplicates) in report.items():
+        note = '' if found else ' (no question requests)'
+        print(f"{path}: {found} question payloads, {invalid} invalid, "
+              f"{duplicates} duplicates skipped{note}")
+    if args.out:
+        print(f"Wrote {count} questions to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,618 @@
+"""Persistent full-text index over question prompts and option texts.
+
+Editors used to grep the bank JSON or go through the ``$regex``/``$text``
+filters of ``QuestionsService.buildQuery``. This index answers the same
+questions locally in milliseconds.
+
+Text analysis (the same at index and query time):
+
+* ``fold``: casefold (``ß`` -> ``ss``), strip accents and umlauts
+  (``ä`` -> ``a``), and map the digraphs ``ae``/``oe``/``ue`` to ``a``/``o``/``u``.
+  "Muenchen", "München" and "MUNCHEN" then become the same token.
+* ``stem``: Savoy's light German stemmer (as in Lucene's
+  ``GermanLightStemmer``). It strips inflection endings such as
+  ``-ern``, ``-en``, ``-er``, ``-e``, ``-s`` and ``-st``, so "Wahlen" matches
+  "Wahl".
+
+Queries are whitespace-separated clauses and all of them must match:
+``word`` (stemmed), ``prefix*`` (folded, not stemmed, against the indexed
+word forms) and ``"a phrase"`` (consecutive stems within one field).
+Results are ranked by BM25.
+
+On disk the index is a directory of ``.npy`` arrays that are memory-mapped
+on load. Postings are CSR by term: doc IDs and term frequencies per
+(term, doc), and positions per posting. It holds a base segment for the
+whole bank set and a small delta segment. When ``question_bank.splice``
+replaces a range, the replaced docs are marked deleted, later docs get
+their positions shifted, and only the new questions are analyzed into
+the delta. Once the delta holds ``MERGE_RATIO`` of the live docs,
+everything is rebuilt. Like the other artifacts under ``.cache/``, an index
+whose banks changed any other way is rebuilt on load.
+
+Usage:
+    python -m question_bank.search build
+    python -m question_bank.search query 'bundeskanzl* "an der Macht"'
+    python -m question_bank.search serve [--port 8765]    # GET /search?q=...&limit=10
+"""
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from question_bank import REPO_ROOT
+from question_bank.bank_index import BankIndex
+from question_bank.columnar import BANK_PATHS, stat_banks
+from question_bank.jsonstream import iter_bank_questions
+
+DEFAULT_DIR = os.path.join(REPO_ROOT, '.cache', 'search-index')
+DEFAULT_LIMIT = 10
+DEFAULT_PORT = 8765
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Rebuild from scratch once the delta segment holds this share of the live docs.
+MERGE_RATIO = 0.25
+FORMAT_VERSION = 1
+
+_TOKEN = re.compile(r'[^\W_]+')
+_DIGRAPH = re.compile(r'(?<!q)ue|ae|oe')
+_DIGRAPHS = {'ae': 'a', 'oe': 'o', 'ue': 'u'}
+_COMBINING = dict.fromkeys(range(0x300, 0x370))
+_ST_ENDING = frozenset('bdfghklmnt')
+_CLAUSE = re.compile(r'"([^"]*)"?|(\S+)')
+_SEGMENT_ARRAYS = ('terms', 'term_start', 'post_doc', 'post_tf', 'pos_start', 'positions',
+                   'surface', 'surface_term')
+_DOC_ARRAYS = ('doc_source', 'doc_position', 'doc_len')
+
+
+class SearchIndexError(ValueError):
+    pass
+
+
+def fold(text):
+    """Casefolded text without accents, umlauts or the ae/oe/ue digraphs."""
+    text = unicodedata.normalize('NFKD', text.casefold()).translate(_COMBINING)
+    return _DIGRAPH.sub(lambda m: _DIGRAPHS[m.group()], text)
+
+
+def stem(token):
+    """Light German stemmer (Savoy) for one folded token."""
+    n = len(token)
+    if n > 5 and token.endswith('ern'):
+        n -= 3
+    elif n > 4 and token[n - 2] == 'e' and token[n - 1] in 'mnrs':
+        n -= 2
+    elif n > 3 and token[n - 1] == 'e':
+        n -= 1
+    elif n > 3 and token[n - 1] == 's' and token[n - 2] in _ST_ENDING:
+        n -= 1
+    token = token[:n]
+    if n > 5 and token.endswith('est'):
+        n -= 3
+    elif n > 4 and token[n - 2] == 'e' and token[n - 1] in 'rn':
+        n -= 2
+    elif n > 4 and token.endswith('st') and token[n - 3] in _ST_ENDING:
+        n -= 2
+    return token[:n]
+
+
+def tokenize(text):
+    """Folded word forms of ``text``."""
+    return _TOKEN.findall(fold(text))
+
+
+def question_fields(q):
+    return [q.get('prompt') or ''] + [o.get('text') or '' for o in q.get('options') or ()]
+
+
+class Segment:
+    """Positional postings for a set of docs.
+
+    ``terms`` is the sorted stem vocabulary. Postings of term t are
+    ``term_start[t]:term_start[t + 1]``; posting p is doc ``post_doc[p]``
+    with ``post_tf[p]`` occurrences at ``positions[pos_start[p]:pos_start[p + 1]]``.
+    ``surface``/``surface_term`` map every folded word form to its stem,
+    for prefix queries.
+    """
+
+    def __init__(self, arrays):
+        for name in _SEGMENT_ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(cls, docs):
+        """Analyze ``(doc_id, question)`` pairs; returns the segment and ``{doc_id: length}``."""
+        stems, surfaces = {}, {}
+        term_ids, doc_ids, positions = [], [], []
+        lengths = {}
+        for doc, q in docs:
+            count = len(term_ids)
+            pos = 0
+            for text in question_fields(q):
+                for token in tokenize(text):
+                    sid = surfaces.get(token)
+                    if sid is None:
+                        sid = surfaces[token] = stems.setdefault(stem(token), len(stems))
+                    term_ids.append(sid)
+                    positions.append(pos)
+                    pos += 1
+                # Leave a hole between fields so phrases cannot span them.
+                pos += 1
+            lengths[doc] = len(term_ids) - count
+            doc_ids.extend([doc] * lengths[doc])
+        return cls._from_lists(stems, surfaces, term_ids, doc_ids, positions), lengths
+
+    @classmethod
+    def _from_lists(cls, stems, surfaces, term_ids, doc_ids, positions):
+        names = list(stems)
+        order = sorted(range(len(names)), key=names.__getitem__)
+        rank = np.empty(len(names), dtype=np.int32)
+        rank[order] = np.arange(len(names), dtype=np.int32)
+        t = rank[np.asarray(term_ids, dtype=np.int64)] if term_ids else np.zeros(0, dtype=np.int32)
+        d = np.asarray(doc_ids, dtype=np.int32)
+        p = np.asarray(positions, dtype=np.int32)
+        # Docs arrive in order with increasing positions, so a stable sort by term
+        # leaves every term's entries sorted by (doc, position).
+        by_term = np.argsort(t, kind='stable')
+        t, d, p = t[by_term], d[by_term], p[by_term]
+        first = np.ones(len(t), dtype=bool)
+        first[1:] = (t[1:] != t[:-1]) | (d[1:] != d[:-1])
+        pos_start = np.append(np.flatnonzero(first), len(t)).astype(np.int64)
+        post_term = t[first]
+        surface_names = sorted(surfaces)
+        return cls({
+            'terms': _str_array([names[i] for i in order]),
+            'term_start': np.searchsorted(post_term, np.arange(len(names) + 1)).astype(np.int64),
+            'post_doc': d[first],
+            'post_tf': np.diff(pos_start).astype(np.int32),
+            'pos_start': pos_start,
+            'positions': p,
+            'surface': _str_array(surface_names),
+            'surface_term': rank[[surfaces[s] for s in surface_names]] if surface_names
+            else np.zeros(0, dtype=np.int32),
+        })
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in _SEGMENT_ARRAYS:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory):
+        # Plain ndarray views of the maps: no memmap subclass overhead per operation.
+        return cls({name: np.asarray(np.load(os.path.join(directory, name + '.npy'), mmap_mode='r'))
+                    for name in _SEGMENT_ARRAYS})
+
+    def lookup(self, term):
+        i = int(np.searchsorted(self.terms, term))
+        return i if i < len(self.terms) and self.terms[i] == term else -1
+
+    def postings(self, t):
+        lo, hi = self.term_start[t], self.term_start[t + 1]
+        return self.post_doc[lo:hi], self.post_tf[lo:hi]
+
+    def prefix_postings(self, prefix):
+        """Postings of every stem with a word form starting with ``prefix`` (docs may repeat)."""
+        lo = int(np.searchsorted(self.surface, prefix))
+        hi = int(np.searchsorted(self.surface, prefix + '\U0010ffff'))
+        terms = np.unique(self.surface_term[lo:hi])
+        rows = _ranges(self.term_start[terms], self.term_start[terms + 1])
+        return self.post_doc[rows], self.post_tf[rows]
+
+    def phrase(self, stems):
+        """``(docs, tf)`` of the docs where ``stems`` occur at consecutive positions.
+
+        Starts from the occurrences of the rarest stem and checks the other
+        stems only at the positions those imply.
+        """
+        ids = [self.lookup(term) for term in stems]
+        if min(ids) < 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        ids = np.asarray(ids)
+        counts = self.pos_start[self.term_start[ids + 1]] - self.pos_start[self.term_start[ids]]
+        anchor = int(np.argmin(counts))
+        lo, hi = self.term_start[ids[anchor]], self.term_start[ids[anchor] + 1]
+        starts = self.pos_start[lo:hi + 1]
+        docs = np.repeat(self.post_doc[lo:hi], np.diff(starts))
+        begin = self.positions[starts[0]:starts[-1]].astype(np.int64) - anchor
+        for offset, t in enumerate(ids.tolist()):
+            if offset != anchor and len(docs):
+                hit = self._occurs_at(t, docs, begin + offset)
+                docs, begin = docs[hit], begin[hit]
+        return np.unique(docs, return_counts=True)
+
+    def _occurs_at(self, t, docs, targets):
+        """Whether term ``t`` occurs in ``docs[i]`` at position ``targets[i]``."""
+        lo, hi = self.term_start[t], self.term_start[t + 1]
+        term_docs = self.post_doc[lo:hi]
+        p = np.minimum(np.searchsorted(term_docs, docs), len(term_docs) - 1)
+        found = term_docs[p] == docs
+        first = self.pos_start[lo + p]
+        tf = np.where(found, self.pos_start[lo + p + 1] - first, 0)
+        hit = np.zeros(len(docs), dtype=bool)
+        last = len(self.positions) - 1
+        # Positions within a posting are few; test them one slot at a time.
+        for k in range(int(tf.max()) if len(tf) else 0):
+            hit |= (k < tf) & (self.positions[np.minimum(first + k, last)] == targets)
+        return hit
+
+
+def _ranges(lo, hi):
+    """Concatenation of ``arange(lo[i], hi[i])`` over i."""
+    lengths = hi - lo
+    if not len(lengths):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1]) + np.repeat(lo - (ends - lengths), lengths)
+
+
+def _str_array(values):
+    return np.asarray(values, dtype=str) if values else np.zeros(0, dtype='<U1')
+
+
+def _generation(directory):
+    """Generation number of the index in ``directory``, 0 if there is none.
+
+    Rebuilds continue the numbering so they never overwrite files a reader
+    may still have mapped.
+    """
+    try:
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            return int(json.load(f).get('generation', 0))
+    except (OSError, ValueError):
+        return 0
+
+
+def parse_query(text):
+    """Clauses of a query string: ``('term', stem)``, ``('prefix', form)``, ``('phrase', [stems])``."""
+    clauses = []
+    for phrase, word in _CLAUSE.findall(text):
+        if phrase:
+            tokens = [stem(t) for t in tokenize(phrase)]
+        elif word.endswith('*'):
+            tokens = tokenize(word[:-1])
+            if tokens:
+                clauses.extend(('term', stem(t)) for t in tokens[:-1])
+                clauses.append(('prefix', tokens[-1]))
+            continue
+        else:
+            tokens = [stem(t) for t in tokenize(word)]
+        if len(tokens) == 1:
+            clauses.append(('term', tokens[0]))
+        elif tokens:
+            # "Baden-Württemberg" without quotes is still a phrase.
+            clauses.append(('phrase', tokens))
+    return clauses
+
+
+class SearchIndex:
+    def __init__(self, directory, meta, base, delta, docs):
+        self.directory = directory
+        self.meta = meta
+        self.sources = meta['sources']
+        self.base = base
+        self.delta = delta
+        self.doc_source = docs['doc_source']
+        self.doc_position = docs['doc_position']
+        self.doc_len = docs['doc_len']
+        self._refresh()
+
+    def _refresh(self):
+        self.live = self.doc_position >= 0
+        self.n_live = int(self.live.sum())
+        self.avg_len = float(self.doc_len[self.live].mean()) if self.n_live else 0.0
+
+    def __len__(self):
+        return self.n_live
+
+    # -- building ----------------------------------------------------------
+
+    @classmethod
+    def build(cls, paths=BANK_PATHS, directory=DEFAULT_DIR):
+        sizes, mtimes = stat_banks(paths)
+        sources, positions = [], []
+
+        def docs():
+            doc = 0
+            for code, path in enumerate(paths):
+                for pos, q in enumerate(iter_bank_questions(path)):
+                    sources.append(code)
+                    positions.append(pos)
+                    yield doc, q
+                    doc += 1
+
+        base, lengths = Segment.build(docs())
+        delta, _ = Segment.build(())
+        doc_arrays = {
+            'doc_source': np.asarray(sources, dtype=np.uint8),
+            'doc_position': np.asarray(positions, dtype=np.int32),
+            'doc_len': np.asarray([lengths[d] for d in range(len(sources))], dtype=np.int32),
+        }
+        meta = {'version': FORMAT_VERSION, 'sources': list(paths), 'base_docs': len(sources),
+                'generation': _generation(directory)}
+        index = cls(directory, meta, base, delta, doc_arrays)
+        index._save(sizes, mtimes, write_base=True)
+        return index
+
+    @classmethod
+    def load(cls, directory=DEFAULT_DIR, paths=BANK_PATHS, rebuild=True):
+        """Open the index, rebuilding it when missing or out of date with the banks."""
+        index = cls.open(directory, paths)
+        if index is not None:
+            return index
+        if not rebuild:
+            raise SearchIndexError(f"{directory} is missing or out of date")
+        return cls.build(paths, directory)
+
+    @classmethod
+    def open(cls, directory=DEFAULT_DIR, paths=BANK_PATHS):
+        """The index if it exists and matches the current bank files, else ``None``."""
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != FORMAT_VERSION or meta['sources'] != list(paths):
+                return None
+            sizes, mtimes = stat_banks(paths)
+            if meta['sizes'] != sizes.tolist() or meta['mtimes'] != mtimes.tolist():
+                return None
+            delta_dir = os.path.join(directory, meta['delta'])
+            docs = {name: np.load(os.path.join(delta_dir, name + '.npy')) for name in _DOC_ARRAYS}
+            return cls(directory, meta, Segment.load(os.path.join(directory, meta['base'])),
+                       Segment.load(delta_dir), docs)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, sizes, mtimes, write_base=False):
+        """Write a new generation and switch ``meta.json`` to it atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        generation = self.meta.get('generation', 0) + 1
+        meta = dict(self.meta, generation=generation, sizes=sizes.tolist(), mtimes=mtimes.tolist())
+        if write_base:
+            meta['base'] = f'base-{generation}'
+            self.base.save(os.path.join(self.directory, meta['base']))
+        meta['delta'] = f'delta-{generation}'
+        delta_dir = os.path.join(self.directory, meta['delta'])
+        self.delta.save(delta_dir)
+        for name in _DOC_ARRAYS:
+            np.save(os.path.join(delta_dir, name + '.npy'), getattr(self, name))
+        tmp = os.path.join(self.directory, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.directory, 'meta.json'))
+        self.meta = meta
+        # Earlier generations are no longer referenced (open readers keep their mappings).
+        for name in os.listdir(self.directory):
+            if name.startswith(('base-', 'delta-')) and name not in (meta['base'], meta['delta']):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    # -- incremental updates -------------------------------------------------
+
+    def splice(self, path, ops, questions):
+        """Apply range replacements of one bank file after it was written.
+
+        ``ops`` are ``(start, end, new_count)`` in the old positions, as in
+        ``question_bank.splice``; ``questions`` is the bank's new question list.
+        """
+        code = self.sources.index(path)
+        ops = sorted((start, max(start, end), count) for start, end, count in ops)
+        starts = np.asarray([op[0] for op in ops], dtype=np.int64)
+        ends = np.asarray([op[1] for op in ops], dtype=np.int64)
+        shifts = np.cumsum([count - (end - start) for start, end, count in ops])
+
+        position = np.array(self.doc_position)
+        ids = np.flatnonzero((self.doc_source == code) & (position >= 0))
+        old = position[ids].astype(np.int64)
+        inside = np.searchsorted(starts, old, side='right') - 1
+        removed = (inside >= 0) & (old < ends[np.maximum(inside, 0)])
+        before = np.searchsorted(ends, old, side='right')
+        moved = old + np.where(before > 0, shifts[np.maximum(before - 1, 0)], 0)
+        position[ids] = np.where(removed, -1, moved)
+
+        added = []
+        for i, (start, _, count) in enumerate(ops):
+            new_start = start + (shifts[i - 1] if i else 0)
+            added.extend(range(new_start, new_start + count))
+        self.doc_source = np.concatenate((self.doc_source, np.full(len(added), code, dtype=np.uint8)))
+        self.doc_position = np.concatenate((position, np.asarray(added, dtype=np.int32)))
+        self.doc_len = np.concatenate((np.array(self.doc_len), np.zeros(len(added), dtype=np.int32)))
+
+        delta_ids = np.flatnonzero(self.doc_position[self.meta['base_docs']:] >= 0) + self.meta['base_docs']
+        live = int((self.doc_position >= 0).sum())
+        if len(delta_ids) > MERGE_RATIO * live:
+            rebuilt = SearchIndex.build(self.sources, self.directory)
+            self.__dict__.update(rebuilt.__dict__)
+            return
+
+        banks = {code: questions}
+
+        def texts():
+            for doc in delta_ids.tolist():
+                source = int(self.doc_source[doc])
+                if source not in banks:
+                    banks[source] = list(iter_bank_questions(self.sources[source]))
+                yield doc, banks[source][self.doc_position[doc]]
+
+        self.delta, lengths = Segment.build(texts())
+        for doc, length in lengths.items():
+            self.doc_len[doc] = length
+        self._refresh()
+        self._save(*stat_banks(self.sources))
+
+    # -- queries -------------------------------------------------------------
+
+    def _clause_docs(self, kind, value):
+        """``(docs, tf)`` of one clause over both segments, live docs only."""
+        all_docs, all_tf = [], []
+        for seg in (self.base, self.delta):
+            if kind == 'term':
+                t = seg.lookup(value)
+                if t < 0:
+                    continue
+                docs, tf = seg.postings(t)
+            elif kind == 'prefix':
+                docs, tf = seg.prefix_postings(value)
+            else:
+                docs, tf = seg.phrase(value)
+            all_docs.append(docs)
+            all_tf.append(tf)
+        if not all_docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        docs, tf = np.concatenate(all_docs), np.concatenate(all_tf).astype(np.float64)
+        if kind == 'prefix':
+            # Several stems can hit the same doc.
+            tf = np.bincount(docs, weights=tf, minlength=len(self.live))
+            docs = np.flatnonzero(tf)
+            tf = tf[docs]
+        live = self.live[docs]
+        return docs[live], tf[live]
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """``(total, [(score, source, position), ...])`` for the best ``limit`` matches."""
+        clauses = parse_query(query)
+        if not clauses:
+            raise SearchIndexError("Empty query")
+        scores = np.zeros(len(self.live))
+        matched = np.zeros(len(self.live), dtype=np.int32)
+        for kind, value in clauses:
+            docs, tf = self._clause_docs(kind, value)
+            if not len(docs):
+                return 0, []
+            idf = math.log(1 + (self.n_live - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[docs] / (self.avg_len or 1))
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            matched[docs] += 1
+        docs = np.flatnonzero(matched == len(clauses))
+        scores = scores[docs]
+        total = len(docs)
+        top = np.argpartition(-scores, limit)[:limit] if total > limit else np.arange(total)
+        top = top[np.lexsort((docs[top], -scores[top]))]
+        return total, [(float(scores[i]), int(self.doc_source[docs[i]]), int(self.doc_position[docs[i]]))
+                       for i in top]
+
+
+class _Prompts:
+    """Prompt lookup by (source, position) through the ``.idx`` sidecars."""
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.indexes = {}
+
+    def get(self, source, position):
+        index = self.indexes.get(source)
+        if index is None or os.stat(self.sources[source]).st_mtime_ns != index.mtime_ns:
+            index = self.indexes[source] = BankIndex.load(self.sources[source])
+        return index.read_question(position).get('prompt') or ''
+
+
+def _result_dicts(index, prompts, results):
+    return [{'source': index.sources[source], 'number': position + 1, 'score': round(score, 4),
+             'prompt': prompts.get(source, position)}
+            for score, source, position in results]
+
+
+def serve(paths=BANK_PATHS, directory=DEFAULT_DIR, host='127.0.0.1', port=DEFAULT_PORT):
+    """Answer ``GET /search?q=...&limit=N`` with JSON until interrupted."""
+    state = {'index': SearchIndex.load(directory, paths)}
+    prompts = _Prompts(list(paths))
+
+    def current():
+        index = state['index']
+        sizes, mtimes = stat_banks(paths)
+        if index.meta['sizes'] != sizes.tolist() or index.meta['mtimes'] != mtimes.tolist():
+            index = state['index'] = SearchIndex.load(directory, paths)
+        return index
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/search':
+                self._reply(404, {'error': 'Not found'})
+                return
+            params = parse_qs(url.query)
+            try:
+                limit = int(params.get('limit', [DEFAULT_LIMIT])[0])
+                start = time.perf_counter()
+                index = current()
+                total, results = index.search(params.get('q', [''])[0], limit)
+                took = (time.perf_counter() - start) * 1000
+            except ValueError as e:
+                self._reply(400, {'error': str(e)})
+                return
+            self._reply(200, {'total': total, 'tookMs': round(took, 3),
+                              'results': _result_dicts(index, prompts, results)})
+
+        def _reply(self, status, body):
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving {len(state['index'])} questions on http://{host}:{port}/search?q=...", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Full-text search over the question banks.')
+    parser.add_argument('--index', default=DEFAULT_DIR, help='index directory (default: %(default)s)')
+    parser.add_argument('--bank', action='append', help='bank file (repeatable, default: both Leben banks)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='(re)build the index')
+    p = sub.add_parser('query', help='search and print the best matches')
+    p.add_argument('query')
+    p.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    p.add_argument('--json', action='store_true', help='print the results as JSON')
+    p = sub.add_parser('serve', help='answer GET /search?q=... over HTTP')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    paths = tuple(args.bank or BANK_PATHS)
+    if args.command == 'build':
+        start = time.perf_counter()
+        index = SearchIndex.build(paths, args.index)
+        print(f"Indexed {len(index)} questions ({len(index.base.terms)} stems) "
+              f"in {time.perf_counter() - start:.1f}s into {args.index}")
+        return
+    if args.command == 'serve':
+        serve(paths, args.index, args.host, args.port)
+        return
+
+    index = SearchIndex.load(args.index, paths)
+    start = time.perf_counter()
+    try:
+        total, results = index.search(args.query, args.limit)
+    except SearchIndexError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    took = (time.perf_counter() - start) * 1000
+    rows = _result_dicts(index, _Prompts(list(paths)), results)
+    if args.json:
+        print(json.dumps({'total': total, 'tookMs': round(took, 3), 'results': rows},
+                         ensure_ascii=False, indent=2))
+        return
+    for row in rows:
+        print(f"{row['score']:7.3f}  {row['source']} #{row['number']}: {row['prompt'][:80]}")
+    print(f"{total} matches in {took:.2f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Monte Carlo forecast of Leben test pass rates per state.
+
+Synthetic candidates get an ability theta ~ N(mean, sd) on the IRT scale
+of ``question_bank.irt``. Each sits one exam drawn like
+``startLebenExam`` (``ExamDraw.draw_batch``) and answers question j
+correctly with probability sigmoid(a_j * (theta - b_j)). a_j and b_j are
+the ``irtDiscrimination`` / ``irtDifficulty`` values the calibration job
+wrote into the bank; questions without them use the ``--default-*``
+values.
+
+Everything runs on (batch x 33) arrays, so 10M exams is a few dozen NumPy
+calls per batch. Pass rates come with Wilson score intervals per state.
+
+``--compare`` runs the same candidates and the same draws (common random
+numbers) against a second set of bank files, e.g. the banks from before
+replacing questions 152-200. The change column is the current banks minus
+the compared ones, paired by state, so it shows the effect of the content
+change rather than simulation noise.
+
+Usage:
+    python -m question_bank.simulate 10000000 [--seed 1] [--mean 0.5 --sd 1]
+    python -m question_bank.simulate 1000000 --compare old/300.json old/state.json
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from question_bank.answer_key import EXAM_SIZE, PASS_SCORE
+from question_bank.columnar import BANK_PATHS
+from question_bank.exam_draw import DEFAULT_BATCH, ExamDraw, ExamDrawError
+from question_bank.jsonstream import iter_bank_questions
+
+DEFAULT_DIFFICULTY = 0.0
+DEFAULT_DISCRIMINATION = 1.0
+Z_95 = 1.959963984540054
+
+
+def load_item_parameters(paths=BANK_PATHS, default_b=DEFAULT_DIFFICULTY,
+                         default_a=DEFAULT_DISCRIMINATION):
+    """``(a, b, n_missing)`` per question ID from the calibrated bank fields."""
+    a, b = [], []
+    missing = 0
+    for path in paths:
+        for q in iter_bank_questions(path):
+            difficulty = q.get('irtDifficulty')
+            if difficulty is None:
+                missing += 1
+                difficulty = default_b
+            b.append(difficulty)
+            a.append(q.get('irtDiscrimination') or default_a)
+    return np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32), missing
+
+
+def wilson_interval(passed, total, z=Z_95):
+    """Wilson score interval for a binomial proportion (arrays allowed)."""
+    passed = np.asarray(passed, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = passed / total
+        denom = 1 + z ** 2 / total
+        centre = (p + z ** 2 / (2 * total)) / denom
+        half = z * np.sqrt(p * (1 - p) / total + z ** 2 / (4 * total ** 2)) / denom
+    return centre - half, centre + half
+
+
+class Simulation:
+    """Pass counts per state, accumulated over batches."""
+
+    def __init__(self, state_names):
+        self.state_names = state_names
+        self.exams = np.zeros(len(state_names), dtype=np.int64)
+        self.passed = np.zeros(len(state_names), dtype=np.int64)
+        self.score_sum = np.zeros(len(state_names))
+
+    def add(self, codes, scores):
+        n = len(self.state_names)
+        self.exams += np.bincount(codes, minlength=n)
+        self.passed += np.bincount(codes, weights=scores >= PASS_SCORE, minlength=n).astype(np.int64)
+        self.score_sum += np.bincount(codes, weights=scores, minlength=n)
+
+    def rows(self):
+        """``(state, exams, pass_rate, low, high, mean_score)`` per state, then the total."""
+        low, high = wilson_interval(self.passed, self.exams)
+        out = []
+        for i, name in enumerate(self.state_names):
+            if self.exams[i]:
+                out.append((name, int(self.exams[i]), self.passed[i] / self.exams[i],
+                            low[i], high[i], self.score_sum[i] / self.exams[i]))
+        total, passed = self.exams.sum(), self.passed.sum()
+        if total:
+            lo, hi = wilson_interval(passed, total)
+            out.append(('All states', int(total), passed / total, float(lo), float(hi),
+                        self.score_sum.sum() / total))
+        return out
+
+
+def simulate(draws, params, count, mean=0.0, sd=1.0, states=None, seed=None, batch=DEFAULT_BATCH):
+    """Run ``count`` exams against each ``(ExamDraw, (a, b))`` pair with shared randomness.
+
+    Returns one Simulation per pair. All pairs see the same candidates,
+    state assignment, draw randomness and answer noise.
+    """
+    first = draws[0]
+    names = first.state_names
+    if states:
+        unknown = [st for st in states if st not in names]
+        if unknown:
+            raise ExamDrawError(f"No published state questions for {unknown[0]!r}")
+        cycle = np.asarray([names.index(st) for st in states], dtype=np.int32)
+    # State codes of the first bank set translated into each set's own codes.
+    code_maps = [np.asarray([d.state_names.index(name) for name in names], dtype=np.int32)
+                 for d in draws]
+    results = [Simulation(d.state_names) for d in draws]
+    master = np.random.default_rng(seed)
+    done = 0
+    while done < count:
+        n = min(batch, count - done)
+        draw_seed, noise_seed = master.integers(0, 2 ** 63, 2)
+        if states:
+            codes = cycle[(done + np.arange(n)) % len(cycle)]
+        else:
+            codes = master.integers(0, len(names), n, dtype=np.int32)
+        noise_rng = np.random.default_rng(noise_seed)
+        theta = (mean + sd * noise_rng.standard_normal(n, dtype=np.float32))[:, None]
+        noise = noise_rng.random((n, EXAM_SIZE), dtype=np.float32)
+        for draw, (a, b), code_map, result in zip(draws, params, code_maps, results):
+            local = code_map[codes]
+            ids = draw.draw_batch(local, np.random.default_rng(draw_seed))
+            valid = ids >= 0
+            safe = np.where(valid, ids, 0)
+            p = 1 / (1 + np.exp(-a[safe] * (theta - b[safe])))
+            scores = ((noise < p) & valid).sum(axis=1)
+            result.add(local, scores)
+        done += n
+    return results
+
+
+def format_rows(rows):
+    lines = [f"{'State':<24} {'Exams':>10} {'Pass rate':>10}   {'95% CI':<17} {'Mean':>6}"]
+    for name, exams, rate, low, high, mean in rows:
+        lines.append(f"{name:<24} {exams:>10} {rate * 100:>9.2f}%   "
+                     f"{low * 100:6.2f}-{high * 100:6.2f}%  {mean:>6.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate Leben exams and forecast pass rates per state.')
+    parser.add_argument('count', type=int, help='number of simulated exams')
+    parser.add_argument('--bank', action='append', help='bank file (repeatable, default: both Leben banks)')
+    parser.add_argument('--compare', nargs='+', metavar='BANK', help='second set of bank files to compare against')
+    parser.add_argument('--mean', type=float, default=0.0, help='mean candidate ability (default: %(default)s)')
+    parser.add_argument('--sd', type=float, default=1.0, help='ability standard deviation (default: %(default)s)')
+    parser.add_argument('--state', action='append', help='only these states, in rotation (default: all, random)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH)
+    parser.add_argument('--default-difficulty', type=float, default=DEFAULT_DIFFICULTY)
+    parser.add_argument('--default-discrimination', type=float, default=DEFAULT_DISCRIMINATION)
+    args = parser.parse_args(argv)
+
+    bank_sets = [tuple(args.bank or BANK_PATHS)]
+    if args.compare:
+        bank_sets.append(tuple(args.compare))
+    draws, params = [], []
+    for paths in bank_sets:
+        draws.append(ExamDraw.compile(paths))
+        a, b, missing = load_item_parameters(paths, args.default_difficulty, args.default_discrimination)
+        params.append((a, b))
+        if missing:
+            print(f"{missing} questions in {', '.join(paths)} have no IRT calibration; "
+                  f"using b={args.default_difficulty}, a={args.default_discrimination}", file=sys.stderr)
+    if len(draws) == 2 and sorted(draws[0].state_names) != sorted(draws[1].state_names):
+        print("Error: the compared banks do not cover the same states", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        results = simulate(draws, params, args.count, args.mean, args.sd, args.state,
+                           args.seed, args.batch)
+    except (ExamDrawError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(format_rows(results[0].rows()))
+    if len(results) == 2:
+        print(f"\nCompared with {', '.join(bank_sets[1])}:")
+        print(format_rows(results[1].rows()))
+        # The first set is the banks under test, the second the baseline.
+        baseline = {row[0]: row for row in results[1].rows()}
+        print(f"\n{'State':<24} {'Change vs compared banks':>25}")
+        for row in results[0].rows():
+            other = baseline.get(row[0])
+            change = f"{(row[2] - other[2]) * 100:+.2f}%" if other else 'n/a'
+            print(f"{row[0]:<24} {change:>25}")
+    print(f"\n{args.count} exams x {len(results)} bank sets in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
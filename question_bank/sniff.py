@@ -0,0 +1,261 @@
+"""Detect the layout of a question dump and parse it in one streaming pass.
+
+``sniff`` looks at the first ``SNIFF_CHARS`` characters and names one of:
+
+* ``json``     - a ``{"questions": [...]}`` bank file,
+* ``postman``  - a Postman collection (or a list of Postman-style items)
+  whose ``POST .../questions`` bodies are questions,
+* ``tsv``      - a tab-separated sheet: prompt, options, answer per row,
+  with an optional header row naming the columns,
+* ``lettered`` - numbered questions with ``a) b) c) d)`` options,
+* ``aufgabe``  - "Aufgabe N:" blocks with "•" options (``question_bank.aufgabe``),
+* ``numbered`` - ``1.`` numbered questions with "•", "-" or "*" options.
+
+Text layouts end each question with a "Correct answer:" line (also
+"Answer:", "Antwort:", "Lösung:"). In ``lettered`` and ``tsv`` the answer
+may also be the option letter. The line layouts share one state machine,
+driven by a single precompiled line regex per format. All text formats
+build their questions with the "Aufgabe N:" question factory, so defaults,
+warnings and answer reconciliation are the same everywhere.
+``iter_source`` yields ``(number, question)`` pairs like
+``aufgabe.iter_questions``.
+
+Usage:
+    python -m question_bank.sniff DUMP [DUMP ...]            (print formats)
+    python -m question_bank.sniff DUMP [DUMP ...] --out bank.json
+"""
+import argparse
+import csv
+import re
+import sys
+from collections import Counter
+
+from question_bank import aufgabe, postman
+from question_bank.jsonstream import iter_bank_questions, write_bank
+
+SNIFF_CHARS = 4096
+FORMATS = ('json', 'postman', 'tsv', 'lettered', 'aufgabe', 'numbered')
+
+_ANSWER = r'(?:Correct answer|Richtige Antwort|Answer|Antwort|Lösung)\s*:\s*(?P<answer>.*?)'
+_LINE_RES = {
+    'numbered': re.compile(
+        r'\s*(?:(?P<number>\d+)[.)]\s+(?P<prompt>.*?)'
+        r'|[•*-]\s*(?P<option>.*?)'
+        r'|' + _ANSWER + r')\s*'),
+    'lettered': re.compile(
+        r'\s*(?:(?:(?:Aufgabe|Frage)\s+)?(?P<number>\d+)[.):]\s*(?P<prompt>.*?)'
+        r'|(?P<letter>[a-dA-D])[).]\s+(?P<option>.*?)'
+        r'|' + _ANSWER + r')\s*'),
+}
+_LETTER_RE = re.compile(r'\(?([a-dA-D])[).]?')
+_POSTMAN_RE = re.compile(r'"(?:_postman_id|request)"\s*:')
+_BANK_RE = re.compile(r'^\s*\{\s*"questions"\s*:')
+
+# Header names of TSV columns, casefolded.
+_PROMPT_COLUMNS = {'prompt', 'question', 'frage', 'text'}
+_ANSWER_COLUMNS = {'answer', 'correct', 'correct answer', 'antwort', 'richtige antwort', 'lösung'}
+_NUMBER_COLUMNS = {'#', 'nr', 'nr.', 'no', 'number', 'nummer'}
+_OPTION_COLUMN_RE = re.compile(r'(?:option|choice|antwort)\s*[a-d1-9]|[a-d]', re.IGNORECASE)
+
+
+class SniffError(ValueError):
+    pass
+
+
+def sniff(head):
+    """Format name for the first characters of a dump."""
+    text = head.lstrip('﻿ \t\r\n')
+    if text[:1] in ('{', '['):
+        if _BANK_RE.match(text):
+            return 'json'
+        if _POSTMAN_RE.search(text):
+            return 'postman'
+        raise SniffError("JSON that is neither a question bank nor a Postman collection")
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 1 and len(text) >= SNIFF_CHARS:
+        # The last line may be cut off.
+        lines.pop()
+    counts = {}
+    for name, line_re in _LINE_RES.items():
+        kinds = [m.lastgroup for m in map(line_re.fullmatch, lines) if m]
+        counts[name] = kinds
+    if counts['lettered'].count('option') >= 2:
+        return 'lettered'
+    if aufgabe.HEADER_RE.search(text):
+        return 'aufgabe'
+    # Rows of a sheet share one column count; "•\t" bullets have a single tab.
+    tabs = Counter(line.count('\t') for line in lines)
+    columns, rows = max(tabs.items(), key=lambda item: item[1])
+    if columns >= 2 and rows >= 2 and rows * 2 > len(lines):
+        return 'tsv'
+    if 'prompt' in counts['numbered'] and counts['numbered'].count('option') >= 2:
+        return 'numbered'
+    raise SniffError("Unrecognized question layout")
+
+
+def _resolve_letter(answer, options):
+    """Option text for an answer given as a letter ("b", "b)", "(B)")."""
+    match = _LETTER_RE.fullmatch(answer)
+    if match:
+        index = ord(match.group(1).lower()) - ord('a')
+        if index < len(options) and answer not in options:
+            return options[index]
+    return answer
+
+
+def iter_lines(lines, fmt, factory, letters=False):
+    """State machine over text lines: header, prompt lines, options, answer."""
+    line_re = _LINE_RES[fmt]
+    number = None
+    prompt, options, answer = [], [], None
+
+    def finish():
+        if not prompt:
+            factory.warn(f"Warning: {factory.label} {number} has no prompt")
+        elif answer is None:
+            factory.warn(f"Warning: {factory.label} {number} has no correct answer specified.")
+        else:
+            text = _resolve_letter(answer, options) if letters else answer
+            return factory.build(number, ' '.join(prompt), options, text)
+        return None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = line_re.fullmatch(line)
+        kind = match.lastgroup if match else None
+        if kind == 'prompt' and (number is None or options or answer is not None):
+            if number is not None:
+                question = finish()
+                if question is not None:
+                    yield number, question
+            number = int(match.group('number'))
+            prompt = [match.group('prompt')] if match.group('prompt') else []
+            options, answer = [], None
+        elif number is None:
+            continue
+        elif kind == 'option':
+            options.append(match.group('option'))
+        elif kind == 'answer':
+            answer = match.group('answer')
+        elif answer is not None:
+            continue
+        elif options:
+            # A wrapped option line.
+            options[-1] = f"{options[-1]} {line}"
+        else:
+            prompt.append(line)
+    if number is not None:
+        question = finish()
+        if question is not None:
+            yield number, question
+
+
+def _tsv_columns(header):
+    """``(number, prompt, options, answer)`` column indexes from a header row, or None."""
+    names = [cell.strip().casefold() for cell in header]
+    if not any(name in _PROMPT_COLUMNS for name in names):
+        return None
+    number = next((i for i, n in enumerate(names) if n in _NUMBER_COLUMNS), None)
+    prompt = next(i for i, n in enumerate(names) if n in _PROMPT_COLUMNS)
+    answer = next((i for i, n in enumerate(names) if n in _ANSWER_COLUMNS), None)
+    options = [i for i, n in enumerate(names)
+               if i not in (number, prompt, answer) and _OPTION_COLUMN_RE.fullmatch(n)]
+    return number, prompt, options, answer
+
+
+def iter_tsv(lines, factory):
+    """Rows of prompt, options and answer (last column) unless a header row says otherwise."""
+    reader = csv.reader(lines, delimiter='\t')
+    columns = None
+    for row_number, row in enumerate(reader, 1):
+        if not any(cell.strip() for cell in row):
+            continue
+        if columns is None:
+            columns = _tsv_columns(row)
+            if columns is not None:
+                continue
+            columns = (None, 0, list(range(1, len(row) - 1)), len(row) - 1)
+        number_col, prompt_col, option_cols, answer_col = columns
+        cells = [cell.strip() for cell in row]
+        get = lambda i: cells[i] if i is not None and i < len(cells) else ''
+        number = get(number_col)
+        number = int(number) if number.isdigit() else row_number
+        options = [get(i) for i in option_cols if get(i)]
+        answer = get(answer_col)
+        if not get(prompt_col) or not answer:
+            factory.warn(f"Warning: row {row_number} has no prompt or no answer")
+            continue
+        if answer.isdigit() and 1 <= int(answer) <= len(options) and answer not in options:
+            answer = options[int(answer) - 1]
+        yield number, factory.build(number, get(prompt_col), options, _resolve_letter(answer, options))
+
+
+def _iter_postman(path, warn):
+    number = 0
+    for name, payload, error in postman.iter_payloads(postman.iter_items(path)):
+        errors = [error] if error else postman.payload_errors(payload)
+        if errors:
+            warn(f"Warning: {path}: {name}: {'; '.join(errors)}")
+            continue
+        number += 1
+        yield number, payload
+
+
+def iter_source(path, defaults=None, warn=print, fmt=None):
+    """Yield ``(number, question)`` for every question in the dump at ``path``."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if fmt is None:
+            fmt = sniff(f.read(SNIFF_CHARS))
+            f.seek(0)
+        if fmt == 'json':
+            yield from enumerate(iter_bank_questions(f), 1)
+        elif fmt == 'postman':
+            yield from _iter_postman(path, warn)
+        else:
+            factory = aufgabe.QuestionFactory(defaults, warn, label='Question')
+            if fmt == 'aufgabe':
+                yield from aufgabe.iter_questions(f, defaults, warn)
+            elif fmt == 'tsv':
+                yield from iter_tsv(f, factory)
+            elif fmt in _LINE_RES:
+                yield from iter_lines(f, fmt, factory, letters=fmt == 'lettered')
+            else:
+                raise SniffError(f"Unknown format {fmt!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detect question dump layouts and parse them into one bank.')
+    parser.add_argument('dumps', nargs='+')
+    parser.add_argument('--format', choices=FORMATS, help='skip detection and use this format for all dumps')
+    parser.add_argument('--out', help='write all questions, in dump order, to this bank file')
+    args = parser.parse_args(argv)
+
+    def warn(msg):
+        print(msg, file=sys.stderr)
+
+    if not args.out:
+        failed = 0
+        for path in args.dumps:
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    print(f"{path}: {args.format or sniff(f.read(SNIFF_CHARS))}")
+            except (SniffError, OSError, ValueError) as e:
+                failed += 1
+                print(f"{path}: {e}")
+        if failed:
+            print(f"Error: {failed} of {len(args.dumps)} dumps not recognized", file=sys.stderr)
+            sys.exit(1)
+        return
+    try:
+        questions = (q for path in args.dumps for _, q in iter_source(path, warn=warn, fmt=args.format))
+        count = write_bank(args.out, questions)
+    except (SniffError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {count} questions from {len(args.dumps)} dumps to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
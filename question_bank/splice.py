@@ -0,0 +1,158 @@
+"""Apply several range replacements to a bank in one load and one write.
+
+Each operation is ``(start, end, new_questions)`` with the same meaning as
+``data['questions'][start:end] = new_questions`` against the bank *as it was
+loaded*, so the ranges of a batch never shift each other. Overlapping ranges
+are rejected before anything is read or written.
+
+Usage (ranges are 1-based and inclusive, like the script names):
+    python -m question_bank.splice 101-200=q101_200.txt 291-300=q291_300.json
+    python -m question_bank.splice --bank BANK.json --dry-run 152-200=q.json
+"""
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+from question_bank import payloads
+from question_bank.aufgabe import parse_questions
+from question_bank.bank_index import BANK_PATH
+from question_bank.jsonstream import write_bank
+
+SpliceOp = namedtuple('SpliceOp', 'start end questions')
+OpDiff = namedtuple('OpDiff', 'start end removed added changed unchanged')
+
+
+class SpliceConflictError(ValueError):
+    pass
+
+
+def check_overlaps(ops):
+    """Raise SpliceConflictError if any two operations touch the same slots.
+
+    Two operations starting at the same index also conflict, since their
+    relative order (e.g. two inserts at one position) would be ambiguous.
+    """
+    ordered = sorted(ops, key=lambda op: (op.start, op.end))
+    for prev, op in zip(ordered, ordered[1:]):
+        if op.start < prev.end or op.start == prev.start:
+            raise SpliceConflictError(
+                f"Ranges {prev.start + 1}-{prev.end} and {op.start + 1}-{op.end} overlap")
+    return ordered
+
+
+def _op_diff(old, new, start, end):
+    # Questions are compared position by position inside the range; anything
+    # past the shorter side counts as removed / added.
+    paired = min(len(old), len(new))
+    changed = sum(1 for a, b in zip(old, new) if a != b)
+    return OpDiff(start, end, len(old) - paired, len(new) - paired, changed, paired - changed)
+
+
+def apply_splices(questions, ops):
+    """Splice ``ops`` into ``questions`` in place and return one OpDiff per op."""
+    ops = [SpliceOp(*op) for op in ops]
+    check_overlaps(ops)
+    n = len(questions)
+    diffs = []
+    # Right to left, so earlier ranges keep their original indices.
+    for op in sorted(ops, key=lambda op: op.start, reverse=True):
+        start, end, _ = slice(op.start, op.end).indices(n)
+        end = max(start, end)
+        new = list(op.questions)
+        diffs.append(_op_diff(questions[start:end], new, start, end))
+        questions[start:end] = new
+    diffs.reverse()
+    return diffs
+
+
+def _open_search_index(warn):
+    """The current ``question_bank.search`` index, or None.
+
+    The search index needs numpy, which splicing itself does not, so it is
+    imported here and skipped when it is unavailable.
+    """
+    try:
+        from question_bank.search import SearchIndex
+    except ImportError as e:
+        warn(f"Warning: search index not updated ({e}); it is stale until rebuilt")
+        return None
+    return SearchIndex.open()
+
+
+def splice_bank(ops, bank_path=BANK_PATH, dry_run=False, warn=None):
+    """Load ``bank_path`` once, apply every op, write it back once.
+
+    A ``question_bank.search`` index that was current before the write is
+    updated for the replaced ranges instead of going stale. ``warn`` (stderr
+    by default) reports when the index cannot be loaded.
+
+    Returns ``(diffs, count_before, count_after)``.
+    """
+    ops = [SpliceOp(*op) for op in ops]
+    check_overlaps(ops)
+    with open(bank_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    before = len(data['questions'])
+    # Only an index that matches the bank before the write can be updated in place.
+    index = None if dry_run else _open_search_index(warn or (lambda msg: print(msg, file=sys.stderr)))
+    diffs = apply_splices(data['questions'], ops)
+    if not dry_run:
+        write_bank(bank_path, data['questions'])
+        if index is not None and bank_path in index.sources:
+            index.splice(bank_path, [(d.start, d.end, d.end - d.start - d.removed + d.added)
+                                     for d in diffs], data['questions'])
+    return diffs, before, len(data['questions'])
+
+
+def load_payload(path):
+    """Questions from a bank-style JSON file, a bare JSON list, or an Aufgabe text."""
+    if path.endswith('.json'):
+        return payloads.load_payload(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_questions(f.read())
+
+
+def parse_op(spec):
+    """``"152-200=file"`` -> SpliceOp(151, 200, questions from file)."""
+    rng, _, path = spec.partition('=')
+    first, _, last = rng.partition('-')
+    first = int(first)
+    last = int(last) if last else first
+    if not path or first < 1 or last < first - 1:
+        raise argparse.ArgumentTypeError(f"Bad splice spec {spec!r}, expected FIRST-LAST=FILE")
+    return SpliceOp(first - 1, last, load_payload(path))
+
+
+def format_report(diffs, before, after):
+    lines = []
+    for d in diffs:
+        lines.append(
+            f"  {d.start + 1}-{d.end}: {d.changed} changed, {d.unchanged} unchanged, "
+            f"{d.added} added, {d.removed} removed")
+    totals = [sum(getattr(d, field) for d in diffs) for field in ('changed', 'unchanged', 'added', 'removed')]
+    lines.append(
+        f"Net: {totals[0]} changed, {totals[1]} unchanged, {totals[2]} added, {totals[3]} removed "
+        f"({before} -> {after} questions)")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply several range replacements to a question bank at once.')
+    parser.add_argument('ops', nargs='+', type=parse_op, metavar='FIRST-LAST=FILE')
+    parser.add_argument('--bank', default=BANK_PATH)
+    parser.add_argument('--dry-run', action='store_true', help='report the diff without writing')
+    args = parser.parse_args(argv)
+
+    try:
+        diffs, before, after = splice_bank(args.ops, args.bank, dry_run=args.dry_run)
+    except SpliceConflictError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(format_report(diffs, before, after))
+    if args.dry_run:
+        print("Dry run, nothing written.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""Convert question banks to a SQLite database and back.
+
+``to-sqlite`` streams bank files into normalized tables:
+
+* ``banks``     - one row per source file,
+* ``questions`` - scalar fields (prompt, qType, provider, state, ...),
+* ``options``   - one row per option, ``is_correct`` as 0/1,
+* ``media``     - the ``media`` object and each ``images`` entry,
+* ``tags``      - one row per tag,
+
+plus ``questions_fts``, an FTS5 index over the prompts (diacritics
+folded). Rows go in with ``executemany`` in blocks, all inside one
+transaction. The database is written to a temporary file and renamed into
+place, so it can ship as the offline bundle of the mobile app.
+
+Ad-hoc questions become indexed SQL, e.g. state questions with images and
+no description::
+
+    SELECT q.id, q.state, q.prompt FROM questions q
+    WHERE q.usage_category = 'state_specific' AND EXISTS (
+        SELECT 1 FROM media m WHERE m.question_id = q.id AND m.field = 'images'
+        AND m.description IS NULL);
+
+``to-json`` streams the tables back with one ordered cursor per table and
+writes every bank with ``write_bank``. Each row keeps its original key order
+(``keys``), and values without a column of the right type (e.g. ``irtDifficulty``)
+are kept in ``extra`` as JSON. The output is therefore byte-identical to
+the input banks.
+
+Usage:
+    python -m question_bank.sqlite_bank to-sqlite bank.db [BANK.json ...]
+    python -m question_bank.sqlite_bank to-json bank.db [--out-dir DIR]
+    python -m question_bank.sqlite_bank fts bank.db 'Bundeskanzler*'
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from question_bank.columnar import BANK_PATHS
+from question_bank.jsonstream import iter_bank_questions, write_bank
+
+SCHEMA_VERSION = 1
+BLOCK = 10000
+
+# JSON key -> column, per table. Values of another type go to ``extra``.
+QUESTION_COLUMNS = {
+    'prompt': 'prompt', 'qType': 'q_type', 'provider': 'provider', 'mainSkill': 'main_skill',
+    'usageCategory': 'usage_category', 'state': 'state', 'level': 'level', 'status': 'status',
+}
+OPTION_COLUMNS = {'text': 'text', 'isCorrect': 'is_correct'}
+MEDIA_COLUMNS = {
+    'type': 'type', 'key': 'key', 'mime': 'mime', 'provider': 'provider',
+    'url': 'url', 'description': 'description',
+}
+SCHEMA = f"""
+CREATE TABLE banks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY,
+    bank_id INTEGER NOT NULL REFERENCES banks(id),
+    position INTEGER NOT NULL,
+    {', '.join(f'{col} TEXT' for col in QUESTION_COLUMNS.values())},
+    keys TEXT NOT NULL,
+    extra TEXT,
+    UNIQUE (bank_id, position)
+);
+CREATE TABLE options (
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    position INTEGER NOT NULL,
+    text TEXT,
+    is_correct INTEGER,
+    keys TEXT NOT NULL,
+    extra TEXT,
+    PRIMARY KEY (question_id, position)
+) WITHOUT ROWID;
+CREATE TABLE media (
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    field TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    {', '.join(f'{col} TEXT' for col in MEDIA_COLUMNS.values())},
+    keys TEXT NOT NULL,
+    extra TEXT,
+    PRIMARY KEY (question_id, field, position)
+) WITHOUT ROWID;
+CREATE TABLE tags (
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (question_id, position)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE questions_fts USING fts5(
+    prompt, content='questions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+# Created after the bulk insert, which is cheaper than maintaining them row by row.
+INDEXES = (
+    'CREATE INDEX questions_category_state ON questions(usage_category, state)',
+    'CREATE INDEX questions_state ON questions(state)',
+    'CREATE INDEX questions_type_level ON questions(q_type, level)',
+    'CREATE INDEX questions_status ON questions(status)',
+    'CREATE INDEX options_correct ON options(is_correct, question_id)',
+    'CREATE INDEX media_key ON media(key)',
+    'CREATE INDEX tags_tag ON tags(tag, question_id)',
+)
+
+
+class SqliteBankError(ValueError):
+    pass
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _key_order(obj, _cache={}):
+    keys = tuple(obj)
+    try:
+        return _cache[keys]
+    except KeyError:
+        return _cache.setdefault(keys, _dumps(keys))
+
+
+def _split(obj, columns, bool_columns=()):
+    """``(column values, keys JSON, extra JSON)`` of one JSON object."""
+    values = dict.fromkeys(columns.values())
+    extra = {}
+    for key, value in obj.items():
+        column = columns.get(key)
+        wanted = bool if column in bool_columns else str
+        if column is not None and (value is None or type(value) is wanted):
+            values[column] = value
+        else:
+            extra[key] = value
+    return list(values.values()), _key_order(obj), _dumps(extra) if extra else None
+
+
+def _is_list_of(value, kind):
+    return type(value) is list and all(type(v) is kind for v in value)
+
+
+def question_rows(qid, bank_id, position, q):
+    """Rows of one question for the questions, options, media and tags tables."""
+    children = {}
+    rest = {}
+    for key, value in q.items():
+        if (key in ('options', 'images') and _is_list_of(value, dict)) \
+                or (key == 'media' and type(value) is dict) \
+                or (key == 'tags' and _is_list_of(value, str)):
+            children[key] = value
+        else:
+            rest[key] = value
+    values, _, extra = _split(rest, QUESTION_COLUMNS)
+    question = (qid, bank_id, position, *values, _key_order(q), extra)
+    options = []
+    for i, option in enumerate(children.get('options', ())):
+        values, keys, extra = _split(option, OPTION_COLUMNS, ('is_correct',))
+        options.append((qid, i, *values, keys, extra))
+    media = []
+    if 'media' in children:
+        media.append((qid, 'media', 0, *_flat(children['media'])))
+    for i, image in enumerate(children.get('images', ())):
+        media.append((qid, 'images', i, *_flat(image)))
+    tags = [(qid, i, tag) for i, tag in enumerate(children.get('tags', ()))]
+    return question, options, media, tags
+
+
+def _flat(obj):
+    values, keys, extra = _split(obj, MEDIA_COLUMNS)
+    return (*values, keys, extra)
+
+
+def to_sqlite(db_path, paths=BANK_PATHS, block=BLOCK):
+    """Write ``paths`` into a new database at ``db_path``; returns the question count."""
+    tmp = db_path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp, isolation_level=None)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript(SCHEMA)
+        conn.execute('BEGIN')
+        q_sql = (f"INSERT INTO questions VALUES ({', '.join('?' * (len(QUESTION_COLUMNS) + 5))})")
+        m_sql = f"INSERT INTO media VALUES ({', '.join('?' * (len(MEDIA_COLUMNS) + 5))})"
+        qid = 0
+        for bank_id, path in enumerate(paths, 1):
+            conn.execute('INSERT INTO banks VALUES (?, ?)', (bank_id, path))
+            rows = ([], [], [], [])
+            for position, q in enumerate(iter_bank_questions(path)):
+                if type(q) is not dict:
+                    raise SqliteBankError(f"{path}: question {position + 1} is not an object")
+                qid += 1
+                question, options, media, tags = question_rows(qid, bank_id, position, q)
+                rows[0].append(question)
+                rows[1].extend(options)
+                rows[2].extend(media)
+                rows[3].extend(tags)
+                if len(rows[0]) == block:
+                    _insert(conn, q_sql, m_sql, rows)
+                    rows = ([], [], [], [])
+            _insert(conn, q_sql, m_sql, rows)
+        for statement in INDEXES:
+            conn.execute(statement)
+        conn.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+        conn.execute('COMMIT')
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+    return qid
+
+
+def _insert(conn, q_sql, m_sql, rows):
+    questions, options, media, tags = rows
+    conn.executemany(q_sql, questions)
+    conn.executemany('INSERT INTO options VALUES (?, ?, ?, ?, ?, ?)', options)
+    conn.executemany(m_sql, media)
+    conn.executemany('INSERT INTO tags VALUES (?, ?, ?)', tags)
+
+
+def _rebuild(keys, extra, columns, row, offset, bool_columns=(), children=None):
+    """JSON object from a row: ``keys`` order, values from ``extra``, the columns or ``children``."""
+    extra = json.loads(extra) if extra else {}
+    obj = {}
+    for key in _parse_keys(keys):
+        if key in extra:
+            obj[key] = extra[key]
+        elif key in columns:
+            value = row[offset + columns[key]]
+            if key in bool_columns and value is not None:
+                value = bool(value)
+            obj[key] = value
+        else:
+            # Child table rows; a list without rows was empty.
+            obj[key] = children.get(key, [])
+    return obj
+
+
+def _parse_keys(keys, _cache={}):
+    try:
+        return _cache[keys]
+    except KeyError:
+        return _cache.setdefault(keys, json.loads(keys))
+
+
+def _positions(columns):
+    return {key: i for i, key in enumerate(columns)}
+
+
+class _Children:
+    """Rows of one child table, consumed in ``question_id`` order alongside the questions."""
+
+    def __init__(self, cursor):
+        self.rows = iter(cursor)
+        self.head = next(self.rows, None)
+
+    def take(self, qid):
+        out = []
+        while self.head is not None and self.head[0] == qid:
+            out.append(self.head)
+            self.head = next(self.rows, None)
+        return out
+
+
+def iter_questions(conn, bank_id):
+    """Yield the questions of one bank in order, exactly as they were imported."""
+    where = 'WHERE question_id IN (SELECT id FROM questions WHERE bank_id = ?)'
+    options = _Children(conn.execute(
+        f'SELECT * FROM options {where} ORDER BY question_id, position', (bank_id,)))
+    media = _Children(conn.execute(
+        f"SELECT * FROM media {where} ORDER BY question_id, field = 'images', position", (bank_id,)))
+    tags = _Children(conn.execute(
+        f'SELECT question_id, tag FROM tags {where} ORDER BY question_id, position', (bank_id,)))
+    q_cols, o_cols, m_cols = _positions(QUESTION_COLUMNS), _positions(OPTION_COLUMNS), _positions(MEDIA_COLUMNS)
+    for row in conn.execute('SELECT * FROM questions WHERE bank_id = ? ORDER BY position', (bank_id,)):
+        qid = row[0]
+        children = {'options': [_rebuild(r[4], r[5], o_cols, r, 2, ('isCorrect',))
+                                for r in options.take(qid)]}
+        for r in media.take(qid):
+            obj = _rebuild(r[-2], r[-1], m_cols, r, 3)
+            if r[1] == 'media':
+                children['media'] = obj
+            else:
+                children.setdefault('images', []).append(obj)
+        children['tags'] = [r[1] for r in tags.take(qid)]
+        yield _rebuild(row[-2], row[-1], q_cols, row, 3, children=children)
+
+
+def to_json(db_path, out_dir=None):
+    """Write every bank in the database back to JSON; returns ``[(path, count)]``."""
+    if not os.path.exists(db_path):
+        raise SqliteBankError(f"{db_path} does not exist")
+    conn = sqlite3.connect(db_path)
+    try:
+        (version,) = conn.execute('PRAGMA user_version').fetchone()
+        if version != SCHEMA_VERSION:
+            raise SqliteBankError(f"{db_path} has schema version {version}, expected {SCHEMA_VERSION}")
+        written = []
+        for bank_id, path in conn.execute('SELECT id, path FROM banks ORDER BY id').fetchall():
+            target = path
+            if out_dir:
+                # Absolute source paths are recreated below ``out_dir`` too.
+                target = os.path.join(out_dir, os.path.relpath(path, os.sep) if os.path.isabs(path) else path)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            written.append((target, write_bank(target, iter_questions(conn, bank_id))))
+        return written
+    finally:
+        conn.close()
+
+
+def fts_search(db_path, query, limit=20):
+    """``[(path, number, prompt)]`` for an FTS5 MATCH query, best first."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            'SELECT b.path, q.position + 1, q.prompt FROM questions_fts f '
+            'JOIN questions q ON q.id = f.rowid JOIN banks b ON b.id = q.bank_id '
+            'WHERE questions_fts MATCH ? ORDER BY f.rank LIMIT ?', (query, limit)).fetchall()
+    except sqlite3.OperationalError as e:
+        raise SqliteBankError(f"Invalid full-text query {query!r}: {e}") from None
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert question banks to SQLite and back.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('to-sqlite', help='write bank files into a new database')
+    p.add_argument('db')
+    p.add_argument('banks', nargs='*', default=list(BANK_PATHS))
+    p = sub.add_parser('to-json', help='write the banks in a database back to JSON')
+    p.add_argument('db')
+    p.add_argument('--out-dir', help='write under this directory instead of the original paths')
+    p = sub.add_parser('fts', help='full-text search over the prompts')
+    p.add_argument('db')
+    p.add_argument('query')
+    p.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        if args.command == 'to-sqlite':
+            count = to_sqlite(args.db, args.banks)
+            print(f"Wrote {count} questions from {len(args.banks)} files to {args.db} "
+                  f"in {time.perf_counter() - start:.2f}s")
+        elif args.command == 'to-json':
+            for path, count in to_json(args.db, args.out_dir):
+                print(f"Wrote {count} questions to {path}")
+        else:
+            for path, number, prompt in fts_search(args.db, args.query, args.limit):
+                print(f"{path} #{number}: {prompt}")
+    except (SqliteBankError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
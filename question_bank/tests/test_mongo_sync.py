@@ -0,0 +1,88 @@
+"""mongo_sync against a mongomock collection.
+
+Run from the repository root:
+    python -m unittest discover -s question_bank/tests -t .
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from question_bank.jsonstream import write_bank
+from question_bank.mongo_sync import apply_plan, plan_sync, to_document
+
+try:
+    import mongomock
+    import pymongo  # noqa: F401  (bulk_write takes pymongo operations)
+except ImportError:
+    mongomock = None
+
+
+def _question(n):
+    return {
+        'prompt': f"Frage {n}: Was gilt in Deutschland?",
+        'qType': 'mcq',
+        'options': [{'text': f"Antwort {n}{c}", 'isCorrect': c == 'a'} for c in 'abcd'],
+        'provider': 'leben_in_deutschland',
+        'mainSkill': 'leben_test',
+        'usageCategory': 'common',
+        'level': 'A1',
+        'status': 'published',
+        'tags': ['300-Fragen'],
+    }
+
+
+@unittest.skipIf(mongomock is None, 'needs mongomock and pymongo')
+class SyncTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.questions = [_question(n) for n in range(1, 4)]
+        write_bank(self.path, self.questions)
+        self.collection = mongomock.MongoClient().db.questions
+        # What scripts/import-300-questions.ts leaves behind: no sync fields.
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.legacy_ids = self.collection.insert_many(
+            [{**to_document(q, 'common'), 'createdAt': now, 'updatedAt': now}
+             for q in self.questions]).inserted_ids
+
+    def sync(self):
+        plan = plan_sync(self.collection, self.path, 'common')
+        apply_plan(self.collection, plan)
+        return plan
+
+    def test_first_sync_adopts_legacy_documents(self):
+        plan = self.sync()
+        self.assertEqual((len(plan.inserts), len(plan.updates), len(plan.deletes), plan.unchanged),
+                         (0, 3, 0, 0))
+        docs = list(self.collection.find().sort('_id', 1))
+        self.assertEqual([d['_id'] for d in docs], self.legacy_ids)
+        self.assertTrue(all(d.get('syncKey') and d.get('syncHash') for d in docs))
+
+    def test_resync_is_a_no_op(self):
+        self.sync()
+        before = list(self.collection.find())
+        plan = self.sync()
+        self.assertEqual((len(plan.inserts), len(plan.updates), len(plan.deletes), plan.unchanged),
+                         (0, 0, 0, 3))
+        self.assertEqual(list(self.collection.find()), before)
+
+    def test_one_question_edit_is_one_update(self):
+        self.sync()
+        self.collection.update_one({'_id': self.legacy_ids[1]}, {'$set': {'images': ['map.png']}})
+        self.questions[1]['options'][0]['text'] = 'Antwort 2a, korrigiert'
+        write_bank(self.path, self.questions)
+        plan = self.sync()
+        self.assertEqual((len(plan.inserts), len(plan.updates), len(plan.deletes), plan.unchanged),
+                         (0, 1, 0, 2))
+        doc = self.collection.find_one({'_id': self.legacy_ids[1]})
+        self.assertEqual(doc['options'][0]['text'], 'Antwort 2a, korrigiert')
+        self.assertEqual(doc['correctAnswer'], 'Antwort 2a, korrigiert')
+        self.assertEqual(doc['images'], ['map.png'])
+        self.assertEqual(self.collection.count_documents({}), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,602 @@
+"""Validate question files against the rules of ``question.schema.ts``.
+
+Mongo only rejects a bad question at insert time, one document at a time.
+This runs the same rules over whole files first:
+
+* field rules from the ``@Prop`` declarations: required fields, enums,
+  value types and minimums, including the nested option, media, blank,
+  reorder part and reading card schemas,
+* the per-``qType`` rules of the ``pre('validate')`` hook (MCQ options,
+  TRUE_FALSE, FILL, FREE_TEXT and INTERACTIVE_TEXT blanks and reorder).
+
+The rules are compiled once into tables: ``FIELD_CHECKS`` maps a field name
+to its rule, ``TYPE_CHECKS`` a qType to its hook rules. Each field rule has
+an exact check of one value and a column check over all values of that
+field in a bank, built from ``map``/``set`` passes. A bank is first checked
+column by column; only columns that fail are gone through value by value,
+and only the questions found that way go through ``validate_question``. Each
+problem is reported with its JSON path, e.g.
+``questions[12].interactiveBlanks[2].id``. Unlike the hook, which stops at
+the first error, all problems are collected.
+
+Files are validated in parallel in a ``ProcessPoolExecutor``. A file is
+either a ``{"questions": [...]}`` bank or a single question object (like
+``questions/example-interactive-text-*.json``).
+
+Usage: python -m question_bank.validate [FILE ...] [--workers N] [--limit 50]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, compress, repeat
+from operator import eq, is_not
+
+from question_bank import REPO_ROOT
+
+Issue = namedtuple('Issue', 'path message')
+
+QUESTION_TYPES = ('mcq', 'fill', 'true_false', 'match', 'reorder', 'listen',
+                  'free_text', 'speaking', 'interactive_text')
+STATUSES = ('draft', 'published', 'archived')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+CATEGORIES = ('general', 'state')
+CARDS_LAYOUTS = ('horizontal', 'vertical')
+PROVIDERS = ('goethe', 'telc', 'oesd', 'ecl', 'dtb', 'dtz', 'Deutschland-in-Leben',
+             'leben_in_deutschland', 'Grammatik', 'Grammatik-Training', 'Wortschatz')
+SKILLS = ('hoeren', 'lesen', 'schreiben', 'sprechen', 'sprachbausteine', 'mixed', 'misc',
+          'leben_test', 'grammar')
+MEDIA_TYPES = ('audio', 'image', 'video')
+MEDIA_PROVIDERS = ('s3', 'cloudinary')
+BLANK_TYPES = ('dropdown', 'select', 'textInput')
+MIN_BLANKS, MAX_BLANKS = 3, 10
+
+_BLANK_ID_RE = re.compile(r'[a-z]')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_blank(value):
+    return not isinstance(value, str) or not value.strip()
+
+
+def _has_items(value):
+    return isinstance(value, list) and len(value) > 0
+
+
+# A field rule is compiled into two checks:
+#
+# * ``check(value)`` - the exact check of one present value. It returns None
+#   when the value is fine, otherwise ``(suffix, message)`` pairs where
+#   ``suffix`` extends the field's path (e.g. ``[2].text``). Paths are only
+#   formatted for values that fail.
+# * ``column(values)`` - True if every value of a column (missing fields
+#   are None) passes ``check``. It runs on whole columns with ``map``,
+#   ``set`` and ``in`` instead of a Python call per value. It may reject a
+#   column that is fine, never the other way round.
+Rule = namedtuple('Rule', 'check column')
+
+_not_none = partial(is_not, None)
+_NONE = type(None)
+_STRING_TYPES = frozenset((str, _NONE))
+_BOOLEAN_TYPES = frozenset((bool, _NONE))
+_NUMBER_TYPES = frozenset((int, float, _NONE))
+_LIST_TYPES = frozenset((list, _NONE))
+_DICT_TYPES = frozenset((dict, _NONE))
+
+
+def _types_within(values, types):
+    return set(map(type, values)) <= types
+
+
+def _get_column(objects, name):
+    return list(map(dict.get, objects, repeat(name)))
+
+
+def _fails(message):
+    return (('', message),)
+
+
+def _exact_column(check):
+    return lambda values: not any(map(check, values))
+
+
+def _scalar(types, message):
+    failed = _fails(message)
+
+    def check(value):
+        return None if type(value) in types else failed
+    return Rule(check, lambda values: _types_within(values, types))
+
+
+_string = _scalar(_STRING_TYPES, 'must be a string')
+_boolean = _scalar(_BOOLEAN_TYPES, 'must be a boolean')
+
+
+def _enum(values):
+    allowed = frozenset(values)
+    expected = ', '.join(values)
+
+    def check(value):
+        if value is not None and (not isinstance(value, str) or value not in allowed):
+            return _fails(f"must be one of {expected}, found {value!r}")
+        return None
+
+    def column(values):
+        if not _types_within(values, _STRING_TYPES):
+            return False
+        found = set(values)
+        found.discard(None)
+        return found <= allowed
+    return Rule(check, column)
+
+
+def _number(minimum):
+    not_number, too_small = _fails('must be a number'), _fails(f"must be >= {minimum}")
+
+    def check(value):
+        if value is None:
+            return None
+        if not _is_number(value):
+            return not_number
+        return too_small if value < minimum else None
+
+    def column(values):
+        return (_types_within(values, _NUMBER_TYPES)
+                and min(filter(_not_none, values), default=minimum) >= minimum)
+    return Rule(check, column)
+
+
+def _check_strings(value):
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        return _fails('must be an array of strings')
+    for item in value:
+        if not isinstance(item, str):
+            return [(f"[{i}]", 'must be a string')
+                    for i, item in enumerate(value) if not isinstance(item, str)]
+    return None
+
+
+def _strings_column(values):
+    return (_types_within(values, _LIST_TYPES)
+            and _types_within(chain.from_iterable(filter(None, values)), {str}))
+
+
+_strings = Rule(_check_strings, _strings_column)
+_string_or_strings = Rule(
+    lambda value: None if isinstance(value, str) else _check_strings(value),
+    lambda values: _strings_column([v for v in values if type(v) is not str]))
+
+
+def _objects(item_rule):
+    check_one = item_rule.check
+
+    def check(value):
+        if value is None:
+            return None
+        if not isinstance(value, list):
+            return _fails('must be an array')
+        problems = None
+        for i, item in enumerate(value):
+            found = check_one(item)
+            if found:
+                if problems is None:
+                    problems = []
+                problems.extend((f"[{i}]{suffix}", message) for suffix, message in found)
+        return problems
+
+    def column(values):
+        return (_types_within(values, _LIST_TYPES)
+                and item_rule.column(list(chain.from_iterable(filter(None, values)))))
+    return Rule(check, column)
+
+
+def _object(fields, required=()):
+    """Rule for a subdocument with ``{name: rule}`` fields and required names."""
+    get_field = fields.get
+    not_object = _fails('must be an object')
+
+    def check(value):
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            return not_object
+        problems = None
+        for name in required:
+            item = value.get(name)
+            if item is None or item == '':
+                problems = problems or []
+                problems.append((f".{name}", 'is required'))
+        for name, item in value.items():
+            field = get_field(name)
+            if field is not None:
+                found = field.check(item)
+                if found:
+                    problems = problems or []
+                    problems.extend((f".{name}{suffix}", message) for suffix, message in found)
+        return problems
+
+    def column(values):
+        types = set(map(type, values))
+        if not types <= _DICT_TYPES:
+            return False
+        objects = list(filter(_not_none, values)) if _NONE in types else values
+        columns = {}
+        for name in required:
+            # Rejects more than None and '', which is fine for a column pass.
+            items = columns[name] = _get_column(objects, name)
+            if not all(items):
+                return False
+        # Large schemas (the question itself) only check the fields that occur.
+        names = fields if len(fields) <= 8 else set(chain.from_iterable(objects)).intersection(fields)
+        for name in names:
+            items = columns.get(name)
+            if items is None:
+                items = _get_column(objects, name)
+            if not fields[name].column(items):
+                return False
+        return True
+    return Rule(check, column)
+
+
+_option = _object({'text': _string, 'isCorrect': _boolean}, required=('text',))
+_media = _object({'type': _enum(MEDIA_TYPES), 'key': _string, 'url': _string, 'mime': _string,
+                  'provider': _enum(MEDIA_PROVIDERS), 'description': _string},
+                 required=('type', 'key'))
+_blank = _object({'id': _string, 'type': _enum(BLANK_TYPES), 'correctAnswers': _strings,
+                  'choices': _strings, 'options': _strings, 'hint': _string},
+                 required=('id', 'type', 'correctAnswers'))
+_reorder_part = _object({'id': _string, 'text': _string, 'order': _number(1)},
+                        required=('id', 'text', 'order'))
+_reorder = _object({'parts': _objects(_reorder_part)}, required=('parts',))
+_card = _object({'title': _string, 'content': _string, 'color': _string},
+                required=('title', 'content'))
+
+
+def _check_match_pairs(value):
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        return _fails('must be an array of [left, right] pairs')
+    return [(f"[{i}]", 'must be a [left, right] pair of strings')
+            for i, pair in enumerate(value)
+            if not isinstance(pair, list) or len(pair) != 2
+            or not all(isinstance(x, str) for x in pair)] or None
+
+
+_match_pairs = Rule(_check_match_pairs, _exact_column(_check_match_pairs))
+
+FIELD_CHECKS = {
+    'prompt': _string,
+    'text': _string,
+    'qType': _enum(QUESTION_TYPES),
+    'options': _objects(_option),
+    'correctAnswer': _string,
+    'explanation': _string,
+    'difficulty': _enum(DIFFICULTIES),
+    'answerKeyBoolean': _boolean,
+    'fillExact': _string_or_strings,
+    'regexList': _strings,
+    'answerKeyMatch': _match_pairs,
+    'matchRightOptions': _strings,
+    'answerKeyReorder': _strings,
+    'sampleAnswer': _string,
+    'minWords': _number(0),
+    'maxWords': _number(1),
+    'modelAnswerText': _string,
+    'minSeconds': _number(0),
+    'maxSeconds': _number(1),
+    'interactiveText': _string,
+    'interactiveBlanks': _objects(_blank),
+    'interactiveReorder': _reorder,
+    'provider': _enum(PROVIDERS),
+    'section': _string,
+    'level': _string,
+    'tags': _strings,
+    'status': _enum(STATUSES),
+    'media': _media,
+    'images': _objects(_media),
+    'audioUrl': _string,
+    'readingPassage': _string,
+    'readingPassageBgColor': _string,
+    'readingCards': _objects(_card),
+    'cardsLayout': _enum(CARDS_LAYOUTS),
+    'contentOnly': _boolean,
+    'mainSkill': _enum(SKILLS),
+    'category': _enum(CATEGORIES),
+    'usageCategory': _string,
+    'state': _string,
+    'sectionTitle': _string,
+}
+
+# The whole question as one subdocument, for the column pass over a bank.
+_question = _object(FIELD_CHECKS, required=('prompt', 'qType'))
+
+
+# Hook rules: ``check(q)`` for the question's qType, returning None or
+# ``(suffix, message)`` pairs relative to the question's path.
+
+def _no_answer_fields(label):
+    def check(q):
+        problems = []
+        if _has_items(q.get('options')):
+            problems.append(('.options', f"{label} should not include options"))
+        if q.get('answerKeyBoolean') is not None:
+            problems.append(('.answerKeyBoolean', f"{label} should not have answerKeyBoolean"))
+        if q.get('fillExact') or _has_items(q.get('regexList')):
+            problems.append(('', f"{label} should not have fillExact or regexList"))
+        return problems
+    return check
+
+
+_MCQ_TOO_FEW = (('.options', 'MCQ requires at least 2 options'),)
+_MCQ_NONE_CORRECT = (('.options', 'MCQ must have at least one correct option'),)
+
+
+def _mcq(q):
+    if q.get('contentOnly'):
+        return None
+    options = q.get('options')
+    if not isinstance(options, list) or len(options) < 2:
+        return _MCQ_TOO_FEW
+    for o in options:
+        if isinstance(o, dict) and o.get('isCorrect'):
+            return None
+    return _MCQ_NONE_CORRECT
+
+
+def _true_false(q):
+    problems = []
+    if not isinstance(q.get('answerKeyBoolean'), bool):
+        problems.append(('.answerKeyBoolean', 'TRUE_FALSE requires boolean answerKeyBoolean'))
+    if _has_items(q.get('options')):
+        problems.append(('.options', 'TRUE_FALSE should not include options'))
+    return problems
+
+
+def _fill(q):
+    exact = q.get('fillExact')
+    has_exact = ((isinstance(exact, str) and exact.strip())
+                 or (isinstance(exact, list) and any(item and str(item).strip() for item in exact)))
+    if not has_exact and not _has_items(q.get('regexList')):
+        return _fails('FILL requires fillExact or regexList')
+    return None
+
+
+def _free_text_words(q):
+    low, high = q.get('minWords'), q.get('maxWords')
+    if _is_number(low) and _is_number(high) and low > high:
+        return (('.minWords', 'FREE_TEXT minWords must be less than or equal to maxWords'),)
+    return None
+
+
+def _interactive_text(q):
+    blanks = q.get('interactiveBlanks')
+    parts = q.get('interactiveReorder')
+    parts = parts.get('parts') if isinstance(parts, dict) else None
+    has_blanks, has_reorder = _has_items(blanks), _has_items(parts)
+    if not has_blanks and not has_reorder:
+        return _fails('INTERACTIVE_TEXT requires either interactiveBlanks or interactiveReorder')
+    if has_blanks and has_reorder:
+        return _fails('INTERACTIVE_TEXT cannot have both interactiveBlanks and interactiveReorder')
+    if has_blanks:
+        return _interactive_blanks(q.get('text'), blanks)
+    return [(f".interactiveReorder.parts{suffix}", message)
+            for suffix, message in _interactive_reorder(parts)]
+
+
+def _interactive_blanks(text, blanks):
+    problems = []
+    if not isinstance(text, str) or '{{' not in text:
+        problems.append(('.text', 'INTERACTIVE_TEXT with blanks requires text field with {{id}} placeholders'))
+        text = ''
+    if not MIN_BLANKS <= len(blanks) <= MAX_BLANKS:
+        problems.append(('.interactiveBlanks',
+                         f"INTERACTIVE_TEXT blanks must be between {MIN_BLANKS} and {MAX_BLANKS}"))
+    seen = set()
+    for i, blank in enumerate(blanks):
+        if not isinstance(blank, dict):
+            continue
+        blank_id = blank.get('id')
+        if type(blank_id) is not str or len(blank_id) != 1 or not _BLANK_ID_RE.match(blank_id):
+            problems.append((f".interactiveBlanks[{i}].id",
+                             f"INTERACTIVE_TEXT blank id must be a single lowercase letter (a-z), found: {blank_id}"))
+        elif blank_id in seen:
+            problems.append((f".interactiveBlanks[{i}].id", f"INTERACTIVE_TEXT duplicate blank id: {blank_id}"))
+        else:
+            seen.add(blank_id)
+        blank_type = blank.get('type')
+        if ((blank_type == 'dropdown' or blank_type == 'select')
+                and not _has_items(blank.get('options')) and not _has_items(blank.get('choices'))):
+            problems.append((f".interactiveBlanks[{i}]", f"INTERACTIVE_TEXT blank {blank_id} of type {blank_type} "
+                                                         f"requires options or choices array"))
+        if not _has_items(blank.get('correctAnswers')):
+            problems.append((f".interactiveBlanks[{i}].correctAnswers",
+                             f"INTERACTIVE_TEXT blank {blank_id} requires at least one correctAnswer"))
+        if text and type(blank_id) is str and '{{' + blank_id + '}}' not in text:
+            problems.append(('.text', f"INTERACTIVE_TEXT text must contain placeholder {{{{{blank_id}}}}}"))
+    return problems
+
+
+def _interactive_reorder(parts):
+    problems = []
+    if len(parts) < 2:
+        problems.append(('', 'INTERACTIVE_TEXT reorder must have at least 2 parts'))
+    ids, orders = set(), set()
+    for i, part in enumerate(parts):
+        if not isinstance(part, dict):
+            continue
+        where = f"[{i}]"
+        part_id = part.get('id')
+        if _is_blank(part_id):
+            problems.append((f"{where}.id", 'INTERACTIVE_TEXT reorder part must have an id'))
+        elif part_id in ids:
+            problems.append((f"{where}.id", f"INTERACTIVE_TEXT reorder duplicate part id: {part_id}"))
+        else:
+            ids.add(part_id)
+        if _is_blank(part.get('text')):
+            problems.append((f"{where}.text", f"INTERACTIVE_TEXT reorder part {part_id} must have text"))
+        order = part.get('order')
+        if not _is_number(order) or order < 1:
+            problems.append((f"{where}.order", f"INTERACTIVE_TEXT reorder part {part_id} must have order >= 1"))
+        elif order in orders:
+            problems.append((f"{where}.order", f"INTERACTIVE_TEXT reorder duplicate order: {order}"))
+        else:
+            orders.add(order)
+    if sorted(orders) != list(range(1, len(orders) + 1)):
+        problems.append(('', 'INTERACTIVE_TEXT reorder orders must be sequential starting from 1'))
+    return problems
+
+
+TYPE_CHECKS = {
+    'mcq': (_mcq,),
+    'true_false': (_true_false,),
+    'fill': (_fill,),
+    'free_text': (_no_answer_fields('FREE_TEXT'), _free_text_words),
+    'interactive_text': (_interactive_text, _no_answer_fields('INTERACTIVE_TEXT')),
+}
+
+
+def validate_question(q, path='$', out=None):
+    """Append an Issue for every rule ``q`` breaks; returns the list."""
+    if out is None:
+        out = []
+    if not isinstance(q, dict):
+        out.append(Issue(path, 'must be an object'))
+        return out
+    prompt = q.get('prompt')
+    if prompt is None or prompt == '':
+        out.append(Issue(f"{path}.prompt", 'is required'))
+    q_type = q.get('qType')
+    if q_type is None:
+        out.append(Issue(f"{path}.qType", 'is required'))
+    get_rule = FIELD_CHECKS.get
+    for name, value in q.items():
+        rule = get_rule(name)
+        if rule is not None:
+            found = rule.check(value)
+            if found:
+                out.extend(Issue(f"{path}.{name}{suffix}", message) for suffix, message in found)
+    for check in TYPE_CHECKS.get(q_type, ()) if isinstance(q_type, str) else ():
+        found = check(q)
+        if found:
+            out.extend(Issue(f"{path}{suffix}", message) for suffix, message in found)
+    return out
+
+
+def _failing(values, check):
+    """Positions of the values ``check`` finds a problem with."""
+    return [i for i, problems in enumerate(map(check, values)) if problems]
+
+
+def _suspects(questions):
+    """Positions of the questions that may break a rule.
+
+    Each field is checked as one column over all questions; only a column
+    that fails is gone through value by value to find its questions.
+    """
+    suspects = set()
+    columns = {name: _get_column(questions, name) for name in ('prompt', 'qType')}
+    for values in columns.values():
+        if None in values or '' in values:
+            suspects.update(i for i, value in enumerate(values) if value is None or value == '')
+    for name in set(chain.from_iterable(questions)).intersection(FIELD_CHECKS):
+        rule = FIELD_CHECKS[name]
+        values = columns.get(name)
+        if values is None:
+            values = _get_column(questions, name)
+        if not rule.column(values):
+            suspects.update(_failing(values, rule.check))
+    q_types = columns['qType']
+    for q_type, checks in TYPE_CHECKS.items():
+        positions = list(compress(range(len(questions)), map(eq, q_types, repeat(q_type))))
+        members = [questions[i] for i in positions]
+        for check in checks:
+            if any(map(check, members)):
+                suspects.update(positions[i] for i in _failing(members, check))
+    return suspects
+
+
+def validate_questions(questions, prefix='questions', out=None):
+    """Issues of a list of questions, in question order.
+
+    The column pass finds the questions that may break a rule; only those
+    go through ``validate_question``, so a clean bank never formats a path.
+    """
+    if out is None:
+        out = []
+    positions = [i for i, q in enumerate(questions) if type(q) is dict]
+    if len(positions) == len(questions):
+        suspects = _suspects(questions)
+    else:
+        suspects = {positions[i] for i in _suspects([questions[i] for i in positions])}
+        suspects.update(set(range(len(questions))).difference(positions))
+    for i in sorted(suspects):
+        validate_question(questions[i], f"{prefix}[{i}]", out)
+    return out
+
+
+def validate_data(data):
+    """Issues of a decoded file: a ``{"questions": [...]}`` bank or one question."""
+    if isinstance(data, dict) and isinstance(data.get('questions'), list):
+        return len(data['questions']), validate_questions(data['questions'])
+    return 1, validate_question(data)
+
+
+def validate_file(path):
+    """``(path, question count, issues)``; unreadable files give one issue at ``$``."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return path, 0, [Issue('$', f"cannot read file: {e}")]
+    count, issues = validate_data(data)
+    return path, count, issues
+
+
+def validate_files(paths, workers=None):
+    """``[(path, count, issues)]`` in ``paths`` order, files spread over worker processes."""
+    if workers == 1 or len(paths) < 2:
+        return [validate_file(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(validate_file, paths))
+
+
+def default_paths():
+    return sorted(glob.glob(os.path.join(REPO_ROOT, 'questions', '**', '*.json'), recursive=True))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate question files against question.schema.ts.')
+    parser.add_argument('files', nargs='*', help='bank or question files (default: questions/**/*.json)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--limit', type=int, default=50, help='issues to print per file (0: all)')
+    args = parser.parse_args(argv)
+
+    paths = args.files or default_paths()
+    results = validate_files(paths, args.workers)
+    total = 0
+    for path, count, issues in results:
+        total += len(issues)
+        status = 'ok' if not issues else f"{len(issues)} issues"
+        print(f"{os.path.relpath(path)}: {count} questions, {status}")
+        for issue in issues[:args.limit or None]:
+            print(f"  {issue.path}: {issue.message}")
+        if args.limit and len(issues) > args.limit:
+            print(f"  ... {len(issues) - args.limit} more")
+    if total:
+        print(f"Error: {total} issues in {sum(1 for r in results if r[2])} files", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,17 @@
 import json
 
+from question_bank.payloads import new_questions_152_200
+from question_bank.jsonstream import write_bank
+
 # قراءة الملف
 with open('questions/leben-in-deutschland-300-questions.json', 'r', encoding='utf-8') as f:
     data = json.load(f)
 
-# قراءة وتعريف الأسئلة من السكربت الآخر
-exec(compile(open('complete_replace_151_200.py', encoding='utf-8').read().split('# استبدال الأسئلة من 152 إلى 200')[0], '<string>', 'exec'))
-
 # استبدال الأسئلة
 data['questions'][151:200] = new_questions_152_200
 
 # حفظ الملف
-with open('questions/leben-in-deutschland-300-questions.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+write_bank('questions/leben-in-deutschland-300-questions.json', data['questions'])
 
 print("Done!")
 
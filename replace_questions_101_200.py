@@ -1,5 +1,9 @@
 import json
-import re
+import sys
+
+# Unchanged "Aufgabe" blocks are reused from .cache/; pass --no-cache to reparse everything.
+from question_bank.parse_cache import parse_questions
+from question_bank.jsonstream import write_bank
 
 # الأسئلة الجديدة من 101 إلى 200
 questions_text = """
@@ -1004,84 +1008,9 @@ Welches heutige deutsche Bundesland gehörte früher zum Gebiet der DDR?
 Correct answer: Mecklenburg-Vorpommern
 """
 
-def parse_questions(text):
-    questions = []
-    parts = re.split(r'Aufgabe \d+:', text)
-    
-    for idx, part in enumerate(parts[1:], 1):
-        try:
-            lines = [l.strip() for l in part.strip().split('\n') if l.strip()]
-            if not lines:
-                print(f"Warning: Aufgabe {idx} has no content")
-                continue
-                
-            prompt_lines = []
-            i = 0
-            while i < len(lines) and not lines[i].startswith('•'):
-                if not lines[i].startswith('Correct answer'):
-                    prompt_lines.append(lines[i])
-                i += 1
-            
-            prompt = ' '.join(prompt_lines).strip()
-            if not prompt:
-                print(f"Warning: Aufgabe {idx} has no prompt")
-                continue
-            
-            options = []
-            while i < len(lines) and lines[i].startswith('•'):
-                option_text = lines[i][1:].strip()
-                if option_text:
-                    options.append(option_text)
-                i += 1
-            
-            if len(options) != 4:
-                print(f"Warning: Aufgabe {idx} has {len(options)} options instead of 4")
-            
-            correct_answer_text = ""
-            while i < len(lines):
-                if 'Correct answer:' in lines[i]:
-                    correct_answer_text = lines[i].split('Correct answer:')[1].strip()
-                    break
-                i += 1
-            
-            if not correct_answer_text:
-                print(f"Warning: Aufgabe {idx} has no correct answer specified.")
-                continue
-
-            formatted_options = []
-            found_correct = False
-            for opt_text in options:
-                is_correct = (opt_text == correct_answer_text)
-                if is_correct:
-                    found_correct = True
-                formatted_options.append({"text": opt_text, "isCorrect": is_correct})
-            
-            if not found_correct:
-                print(f"Warning: Correct answer '{correct_answer_text}' for Aufgabe {idx} not found in options.")
-                formatted_options.append({"text": correct_answer_text, "isCorrect": True})
-
-            questions.append({
-                "prompt": prompt,
-                "qType": "mcq",
-                "options": formatted_options,
-                "provider": "leben_in_deutschland",
-                "mainSkill": "leben_test",
-                "usageCategory": "common",
-                "level": "A1",
-                "status": "published",
-                "tags": ["300-Fragen"]
-            })
-        except Exception as e:
-            print(f"Error parsing Aufgabe {idx}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
-    
-    return questions
-
 try:
     print("Parsing questions...")
-    new_questions = parse_questions(questions_text)
+    new_questions = parse_questions(questions_text, use_cache='--no-cache' not in sys.argv)
     print(f"Parsed {len(new_questions)} questions")
     
     if len(new_questions) != 100:
@@ -1098,8 +1027,7 @@ try:
     data['questions'][100:200] = new_questions
     
     print("Writing updated file...")
-    with open('questions/leben-in-deutschland-300-questions.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_bank('questions/leben-in-deutschland-300-questions.json', data['questions'])
     
     print(f"Successfully replaced questions 101-200. Total questions: {len(data['questions'])}")
 except Exception as e:
@@ -1,5 +1,9 @@
 import json
-import re
+import sys
+
+# Unchanged "Aufgabe" blocks are reused from .cache/; pass --no-cache to reparse everything.
+from question_bank.parse_cache import parse_questions
+from question_bank.jsonstream import write_bank
 
 questions_data_201_300 = """
 Aufgabe 201: 
@@ -1003,92 +1007,9 @@ Aus welchem Land kamen die ersten Gastarbeiterinnen und Gastarbeiter in die Bund
 Correct answer: Italien
 """
 
-def parse_questions(text):
-    questions = []
-    # Split by "Aufgabe X:"
-    parts = re.split(r'Aufgabe (\d+):', text)
-    
-    # Process in pairs (number, content)
-    for i in range(1, len(parts), 2):
-        task_number = int(parts[i].strip())
-        part_content = parts[i+1].strip()
-        
-        try:
-            lines = [l.strip() for l in part_content.split('\n') if l.strip()]
-            if not lines:
-                print(f"Warning: Aufgabe {task_number} has no content")
-                continue
-            
-            # Extract prompt
-            prompt_lines = []
-            j = 0
-            while j < len(lines) and not lines[j].startswith('•'):
-                if not lines[j].startswith('Correct answer'):
-                    prompt_lines.append(lines[j])
-                j += 1
-            
-            prompt = ' '.join(prompt_lines).strip()
-            if not prompt:
-                print(f"Warning: Aufgabe {task_number} has no prompt")
-                continue
-            
-            # Extract options
-            options = []
-            while j < len(lines) and lines[j].startswith('•'):
-                option_text = lines[j][1:].strip()
-                if option_text:
-                    options.append(option_text)
-                j += 1
-            
-            if len(options) != 4:
-                print(f"Warning: Aufgabe {task_number} has {len(options)} options instead of 4")
-            
-            # Extract correct answer
-            correct_answer_text = ""
-            while j < len(lines):
-                if 'Correct answer:' in lines[j]:
-                    correct_answer_text = lines[j].split('Correct answer:')[1].strip()
-                    break
-                j += 1
-            
-            if not correct_answer_text:
-                print(f"Warning: Aufgabe {task_number} has no correct answer specified.")
-                continue
-            
-            # Format options
-            formatted_options = []
-            found_correct = False
-            for opt_text in options:
-                is_correct = (opt_text == correct_answer_text)
-                if is_correct:
-                    found_correct = True
-                formatted_options.append({"text": opt_text, "isCorrect": is_correct})
-            
-            if not found_correct:
-                print(f"Warning: Correct answer '{correct_answer_text}' for Aufgabe {task_number} not found in options.")
-            
-            questions.append({
-                "prompt": prompt,
-                "qType": "mcq",
-                "options": formatted_options,
-                "provider": "leben_in_deutschland",
-                "mainSkill": "leben_test",
-                "usageCategory": "common",
-                "level": "A1",
-                "status": "published",
-                "tags": ["300-Fragen"]
-            })
-        except Exception as e:
-            print(f"Error parsing Aufgabe {task_number}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
-    
-    return questions
-
 try:
     print("Parsing questions 201-300...")
-    new_questions_201_300 = parse_questions(questions_data_201_300)
+    new_questions_201_300 = parse_questions(questions_data_201_300, use_cache='--no-cache' not in sys.argv)
     print(f"Parsed {len(new_questions_201_300)} questions for range 201-300")
     
     if len(new_questions_201_300) != 100:
@@ -1109,8 +1030,7 @@ try:
         data['questions'] = data['questions'][:200] + new_questions_201_300 + data['questions'][300:]
     
     print("Writing updated file...")
-    with open('questions/leben-in-deutschland-300-questions.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_bank('questions/leben-in-deutschland-300-questions.json', data['questions'])
     
     print(f"Successfully replaced questions 201-300. Total questions: {len(data['questions'])}")
 except Exception as e: